@@ -0,0 +1,212 @@
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different prompts share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class AudioCache:
+    """
+    Content-addressed on-disk cache for synthesized audio.
+
+    Entries are keyed on a hash of (engine, model, voice, normalized text) and
+    evicted least-recently-used once the cache exceeds `max_bytes`, or when an
+    entry is older than `max_age_seconds`. Writes go to a temp file in the
+    cache directory and are moved into place with os.replace, so readers never
+    see a partially written file.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, max_age_seconds: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # filename -> (size, last_access)
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_existing()
+
+    @staticmethod
+    def make_key(engine: str, model: str, voice: Optional[str], text: str) -> str:
+        raw = "\x1f".join([engine, model or "", voice or "", normalize_text(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load_existing(self):
+        """Rebuild the LRU index from files left by a previous run (oldest first)."""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp"):
+                # Leftover from an interrupted write
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue  # e.g. prefork workers' own cache directories
+            found.append((st.st_mtime, name, st.st_size))
+
+        with self._lock:
+            for mtime, name, size in sorted(found):
+                self._entries[name] = (size, mtime)
+                self._total_bytes += size
+            self._evict_locked()
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.cache_dir, filename)
+
+    def _is_expired(self, last_access: float, now: float) -> bool:
+        return bool(self.max_age_seconds) and now - last_access > self.max_age_seconds
+
+    def get(self, key: str, ext: str) -> Optional[str]:
+        """Return the cached file path for `key`, or None on a miss."""
+        filename = f"{key}.{ext}"
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is None:
+                entry = self._adopt_locked(filename)
+            if entry is None or self._is_expired(entry[1], now) or not os.path.exists(self._path(filename)):
+                if entry is not None:
+                    self._drop_locked(filename)
+                self.misses += 1
+                return None
+            self._entries[filename] = (entry[0], now)
+            self._entries.move_to_end(filename)
+            self.hits += 1
+
+        try:
+            # Persist recency so the LRU order survives restarts
+            os.utime(self._path(filename), (now, now))
+        except OSError:
+            pass
+        return self._path(filename)
+
+    def get_bytes(self, key: str, ext: str) -> Optional[bytes]:
+        """
+        Like get(), but returns the cached audio itself. A file evicted (or
+        removed by another process) between the lookup and the read counts as
+        a miss, rather than leaving the caller with a path that no longer exists.
+        """
+        path = self.get(key, ext)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            filename = os.path.basename(path)
+            with self._lock:
+                if filename in self._entries:
+                    self._drop_locked(filename)
+                self.hits -= 1
+                self.misses += 1
+            return None
+
+    def temp_path(self, ext: str) -> str:
+        """Reserve a temp file inside the cache dir for a synthesizer to write into."""
+        fd, path = tempfile.mkstemp(dir=self.cache_dir, suffix=f".{ext}.tmp")
+        os.close(fd)
+        return path
+
+    def put_file(self, key: str, ext: str, src_path: str) -> str:
+        """Atomically move a fully written file (ideally from temp_path) into the cache."""
+        filename = f"{key}.{ext}"
+        dest = self._path(filename)
+        os.replace(src_path, dest)
+        self._register(filename, os.path.getsize(dest))
+        return dest
+
+    def put_bytes(self, key: str, ext: str, data: bytes) -> str:
+        """Atomically write `data` into the cache."""
+        tmp = self.temp_path(ext)
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+        except Exception:
+            os.remove(tmp)
+            raise
+        return self.put_file(key, ext, tmp)
+
+    def discard(self, path: str):
+        """Remove a temp file that never made it into the cache."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _register(self, filename: str, size: int):
+        with self._lock:
+            if filename in self._entries:
+                self._total_bytes -= self._entries[filename][0]
+            self._entries[filename] = (size, time.time())
+            self._entries.move_to_end(filename)
+            self._total_bytes += size
+            self._evict_locked(keep=filename)
+
+    def _adopt_locked(self, filename: str):
+        """
+        Index a file written behind our back by another process using the same
+        directory (e.g. uvicorn --workers; prefork workers each have their own).
+        The budget is enforced as if we had written it ourselves.
+        """
+        try:
+            st = os.stat(self._path(filename))
+        except OSError:
+            return None
+        entry = self._entries[filename] = (st.st_size, st.st_mtime)
+        self._total_bytes += st.st_size
+        self._evict_locked(keep=filename)
+        return entry
+
+    def _drop_locked(self, filename: str):
+        size, _ = self._entries.pop(filename)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(filename))
+        except OSError:
+            pass
+
+    def _evict_locked(self, keep: Optional[str] = None):
+        now = time.time()
+        while self._entries:
+            oldest, (size, last_access) = next(iter(self._entries.items()))
+            if oldest == keep:
+                break
+            if self._total_bytes <= self.max_bytes and not self._is_expired(last_access, now):
+                break
+            self._drop_locked(oldest)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
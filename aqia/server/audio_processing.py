@@ -0,0 +1,178 @@
+import io
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from audio_utils import encode_wav
+
+MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "opus": "audio/ogg",
+}
+
+# Opus only encodes at these rates; other requests are rounded up to the next one
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+# Bitrate range each codec spans between libsndfile compression levels 1.0 and 0.0
+_BITRATE_RANGE_KBPS = {
+    "opus": (6, 256),
+    "mp3": (8, 320),
+}
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+class OutputSpec(NamedTuple):
+    """What the client wants back. Hashable, so it can be part of a cache or batch key."""
+    format: str = "wav"
+    sample_rate: Optional[int] = None
+    bitrate_kbps: Optional[int] = None
+    normalize: bool = True
+    trim_silence: bool = True
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.format]
+
+    def cache_tag(self) -> str:
+        return f"{self.format}:{self.sample_rate or 'native'}:{self.bitrate_kbps or 'default'}:" \
+               f"{int(self.normalize)}{int(self.trim_silence)}"
+
+
+def _soundfile():
+    try:
+        import soundfile
+        return soundfile
+    except ImportError:
+        return None
+
+
+def _probe_formats() -> frozenset:
+    formats = {"wav"}
+    sf = _soundfile()
+    if sf is not None:
+        if "OPUS" in sf.available_subtypes("OGG"):
+            formats.add("opus")
+        if "MP3" in sf.available_formats():
+            formats.add("mp3")
+    return frozenset(formats)
+
+
+# The installed libsndfile can't change while we run, so it is probed once
+_SUPPORTED_FORMATS = _probe_formats()
+
+
+def supported_formats() -> frozenset:
+    """Output formats this server can encode itself."""
+    return _SUPPORTED_FORMATS
+
+
+def resample(wav: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """
+    Band-limited linear resampling. When downsampling, a windowed-sinc low-pass
+    at the new Nyquist frequency runs first so speech sibilants don't alias.
+    """
+    if src_rate == dst_rate or wav.size == 0:
+        return wav
+    if dst_rate < src_rate:
+        cutoff = dst_rate / src_rate / 2  # In cycles per input sample
+        taps = 63
+        n = np.arange(taps) - (taps - 1) / 2
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+        kernel /= kernel.sum()
+        wav = np.convolve(wav, kernel.astype(np.float32), mode="same")
+
+    duration = wav.size / src_rate
+    dst_len = max(1, int(round(duration * dst_rate)))
+    positions = np.arange(dst_len, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(wav.size), wav).astype(np.float32)
+
+
+def trim_silence(wav: np.ndarray, sample_rate: int, threshold_db: float = -45.0,
+                 frame_ms: float = 10.0, pad_ms: float = 40.0) -> np.ndarray:
+    """Drop leading/trailing frames whose RMS is below `threshold_db` (dBFS), keeping a short pad."""
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = wav.size // frame
+    if n_frames == 0:
+        return wav
+    frames = wav[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    loud = np.flatnonzero(rms > 10 ** (threshold_db / 20))
+    if loud.size == 0:
+        return wav
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, loud[0] * frame - pad)
+    end = min(wav.size, (loud[-1] + 1) * frame + pad)
+    return wav[start:end]
+
+
+def normalize_loudness(wav: np.ndarray, target_dbfs: float = -20.0, peak_dbfs: float = -1.0) -> np.ndarray:
+    """
+    Scale to a target RMS level (a cheap loudness proxy that works for short
+    utterances), limited so the peak never exceeds `peak_dbfs`.
+    """
+    if wav.size == 0:
+        return wav
+    rms = float(np.sqrt(np.mean(wav.astype(np.float64) ** 2)))
+    peak = float(np.max(np.abs(wav)))
+    if rms == 0.0 or peak == 0.0:
+        return wav
+    gain = min(10 ** (target_dbfs / 20) / rms, 10 ** (peak_dbfs / 20) / peak)
+    return (wav * gain).astype(np.float32)
+
+
+def _compression_level(fmt: str, bitrate_kbps: int) -> float:
+    low, high = _BITRATE_RANGE_KBPS[fmt]
+    bitrate_kbps = min(max(bitrate_kbps, low), high)
+    return 1.0 - (bitrate_kbps - low) / (high - low)
+
+
+def encode(wav: np.ndarray, sample_rate: int, fmt: str, bitrate_kbps: Optional[int] = None) -> bytes:
+    if fmt == "wav":
+        return encode_wav(wav, sample_rate)
+    if fmt not in supported_formats():
+        raise UnsupportedFormatError(f"Audio format '{fmt}' is not available on this server")
+
+    sf = _soundfile()
+    buf = io.BytesIO()
+    if fmt == "opus":
+        kwargs = {"format": "OGG", "subtype": "OPUS"}
+    else:
+        kwargs = {"format": "MP3", "subtype": "MPEG_LAYER_III"}
+    if bitrate_kbps:
+        kwargs["compression_level"] = _compression_level(fmt, bitrate_kbps)
+    try:
+        sf.write(buf, wav, sample_rate, **kwargs)
+    except TypeError:
+        # soundfile < 0.13 has no compression_level; fall back to the codec default
+        kwargs.pop("compression_level", None)
+        buf = io.BytesIO()
+        sf.write(buf, wav, sample_rate, **kwargs)
+    return buf.getvalue()
+
+
+def target_sample_rate(spec: OutputSpec, native_rate: int) -> int:
+    rate = spec.sample_rate or native_rate
+    if spec.format == "opus" and rate not in OPUS_SAMPLE_RATES:
+        rate = next((r for r in OPUS_SAMPLE_RATES if r >= rate), OPUS_SAMPLE_RATES[-1])
+    return rate
+
+
+def process(wav: np.ndarray, sample_rate: int, spec: OutputSpec, trim: Optional[bool] = None):
+    """Apply the post-processing stage (trim, normalize, resample) and return (wav, sample_rate)."""
+    wav = np.asarray(wav, dtype=np.float32)
+    if spec.trim_silence if trim is None else trim:
+        wav = trim_silence(wav, sample_rate)
+    if spec.normalize:
+        wav = normalize_loudness(wav)
+    rate = target_sample_rate(spec, sample_rate)
+    return resample(wav, sample_rate, rate), rate
+
+
+def render(wav: np.ndarray, sample_rate: int, spec: OutputSpec) -> bytes:
+    """Post-process a waveform and encode it in the requested output format."""
+    wav, rate = process(wav, sample_rate, spec)
+    return encode(wav, rate, spec.format, spec.bitrate_kbps)
@@ -0,0 +1,69 @@
+import io
+import struct
+import wave
+from typing import Optional
+
+import numpy as np
+
+WAV_HEADER_SIZE = 44
+
+
+def wav_header(sample_rate: int, data_size: Optional[int] = None, channels: int = 1,
+               bits_per_sample: int = 16) -> bytes:
+    """
+    RIFF/WAVE header for PCM audio. With `data_size=None` the size fields are set
+    to the maximum value, which browsers and most decoders treat as "read until
+    EOF" - what we want for a stream of unknown length.
+    """
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    riff_size = 0xFFFFFFFF if data_size is None else 36 + data_size
+    data_size = 0xFFFFFFFF if data_size is None else data_size
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def float_to_pcm16(wav: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert float samples in [-1, 1] to int16, optionally writing into `out`."""
+    scaled = np.clip(wav, -1.0, 1.0)
+    scaled *= 32767
+    if out is None:
+        return scaled.astype("<i2")
+    np.copyto(out, scaled, casting="unsafe")
+    return out
+
+
+def encode_wav(wav: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Encode a mono float waveform as a 16-bit WAV file in memory. Samples are
+    converted straight into the output buffer, after the header, so the only
+    full-size copy is the final bytes() the HTTP layer needs.
+    """
+    wav = np.asarray(wav, dtype=np.float32)
+    data_size = wav.size * 2
+    buf = bytearray(WAV_HEADER_SIZE + data_size)
+    buf[:WAV_HEADER_SIZE] = wav_header(sample_rate, data_size)
+    float_to_pcm16(wav, out=np.frombuffer(buf, dtype="<i2", offset=WAV_HEADER_SIZE))
+    return bytes(buf)
+
+
+def decode_wav(data: bytes):
+    """Decode a 16-bit PCM WAV file into (float32 mono waveform, sample_rate)."""
+    with wave.open(io.BytesIO(data)) as f:
+        if f.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV is supported")
+        channels = f.getnchannels()
+        sample_rate = f.getframerate()
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return (samples / 32768.0).astype(np.float32), sample_rate
+
+
+def wav_pcm(data: bytes):
+    """Split a PCM WAV file into (sample_rate, raw frame bytes), e.g. to re-stream it after a header."""
+    with wave.open(io.BytesIO(data)) as f:
+        return f.getframerate(), f.readframes(f.getnframes())
@@ -1,4 +1,6 @@
 from datetime import datetime, timedelta
+from typing import Optional
+import time
 import bcrypt
 from jose import JWTError, jwt
 import os
@@ -20,12 +22,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except Exception:
         return False
 
-def get_password_hash(password: str) -> str:
+def get_password_hash(password: str, rounds: int = 12) -> str:
     # bcrypt requires bytes, and has a 72-byte limit
     pwd_bytes = password.encode('utf-8')[:72]
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds)
     return bcrypt.hashpw(pwd_bytes, salt).decode('utf-8')
 
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Work factor of a stored bcrypt hash ("$2b$12$..." -> 12), or None if it isn't one."""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 16) -> int:
+    """
+    Highest work factor whose hash takes at most `target_ms` on this machine
+    (never below `min_rounds`). Each extra round doubles the cost, so one
+    timing at `min_rounds` is enough to extrapolate.
+    """
+    salt = bcrypt.gensalt(rounds=min_rounds)
+    elapsed = min(_time_hash(salt) for _ in range(3))
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed * 2 * 1000 <= target_ms:
+        rounds += 1
+        elapsed *= 2
+    return rounds
+
+def _time_hash(salt: bytes) -> float:
+    started = time.perf_counter()
+    bcrypt.hashpw(b"calibration-password", salt)
+    return time.perf_counter() - started
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
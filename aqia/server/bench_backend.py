@@ -0,0 +1,370 @@
+"""
+Offline load and latency benchmark for the backend.
+
+By default this starts the app in-process (uvicorn on a loopback socket, in a
+background thread) against a fresh SQLite database, with FakeGoogleTTS
+standing in for Cloud Text-to-Speech and FakeCoquiTTS for the Coqui model, so
+it needs no credentials, model download or network. It seeds synthetic users
+and interview history through the API, then drives each scenario with
+`--concurrency` requests in flight:
+
+  tts         POST /tts (WAV)                 model stub or real Coqui (--coqui real)
+  google-tts  POST /google-tts (WAV)          fake Google with --google-latency-ms per call
+  login       POST /api/login                 bcrypt at --bcrypt-rounds
+  interviews  GET /api/interviews?limit=20    first page of a seeded user's history
+  dashboard   GET /api/dashboard              a seeded user's dashboard
+
+For each scenario it reports throughput, p50/p95/p99 latency and status codes,
+and for the TTS scenarios the real-time factor (request latency / seconds of
+audio returned; < 1 is faster than real time). Results are written as JSON
+together with the commit, machine and settings. Pass --compare with an
+earlier result to print the change per scenario. The audio cache is off and
+TTS texts are numbered, so every TTS request is a real synthesis.
+
+--url points the same scenarios at an already running server instead (which
+then uses whatever engines and database it was started with).
+
+Usage:
+    python bench_backend.py --out bench.json
+    python bench_backend.py --scenarios tts google-tts --concurrency 32 --requests 500 --compare bench.json
+"""
+import argparse
+import asyncio
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from collections import Counter
+
+import httpx
+import numpy as np
+
+SCENARIOS = ("tts", "google-tts", "login", "interviews", "dashboard")
+PASSWORD = "benchmark-password"
+
+PROMPTS = [
+    "Tell me about yourself.",
+    "Can you walk me through a project you are proud of, and what you would do differently?",
+    "How do you handle disagreements with a teammate about a technical decision?",
+    "Describe a time you had to learn a new technology quickly.",
+    "What is the difference between a process and a thread?",
+    "Thanks for your time today. Do you have any questions for us?",
+]
+CATEGORIES = ["Frontend Developer", "Backend Developer", "Data Scientist", "DevOps Engineer", "Product Manager"]
+
+
+# --- In-process server ---
+
+class InProcessServer:
+    """The app on a loopback port, with fake engines, for the length of a `with` block."""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.TemporaryDirectory(prefix="aqia-bench-")
+        self.url = None
+        self._fake_loop = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        from fake_google_tts import FakeGoogleTTS
+
+        # The fake Google server gets its own loop so it doesn't compete with the app's
+        self._fake_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._fake_loop.run_forever, name="fake-google", daemon=True).start()
+        fake = FakeGoogleTTS(latency=self.args.google_latency_ms / 1000)
+        asyncio.run_coroutine_threadsafe(fake.start(), self._fake_loop).result()
+        self.fake_google = fake
+
+        # main reads its configuration at import time
+        os.environ.update({
+            "DATABASE_URL": f"sqlite:///{os.path.join(self.workdir.name, 'bench.db')}",
+            "SECRET_KEY": os.getenv("SECRET_KEY", "benchmark-secret"),
+            "GOOGLE_TTS_ENDPOINT": fake.endpoint,
+            "COQUI_EXECUTOR": "thread",
+            "TTS_CACHE_MAX_MB": "0",
+            "BCRYPT_ROUNDS": str(self.args.bcrypt_rounds),
+            "TTS_PRELOAD": "1",
+        })
+        import uvicorn
+        import main
+
+        if self.args.coqui == "stub":
+            from fake_coqui_tts import FakeCoquiTTS
+            main.tts_service = FakeCoquiTTS(rtf=self.args.coqui_rtf)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        config = uvicorn.Config(main.app, log_level="warning", backlog=4096)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]}, name="bench-app")
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("The app failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=30)
+        if self._fake_loop is not None:
+            asyncio.run_coroutine_threadsafe(self.fake_google.stop(), self._fake_loop).result()
+            self._fake_loop.call_soon_threadsafe(self._fake_loop.stop)
+        self.workdir.cleanup()
+
+
+# --- Seeding ---
+
+def synthetic_interview(rng: random.Random, index: int) -> dict:
+    started = datetime.datetime(2025, 1, 1) + datetime.timedelta(hours=7 * index + rng.randint(0, 6))
+    return {
+        "job_category": rng.choice(CATEGORIES),
+        "overall_score": rng.randint(30, 100),
+        "started_at": started.isoformat(),
+        "completed_at": (started + datetime.timedelta(minutes=rng.randint(10, 40))).isoformat(),
+        "questions": [
+            {"question_asked": rng.choice(PROMPTS), "user_answer": "An answer. " * rng.randint(5, 40),
+             "ai_feedback": "Feedback. " * rng.randint(2, 10), "score": rng.randint(0, 10)}
+            for _ in range(10)
+        ],
+        "analytics_scores": {"Communication": rng.randint(40, 100), "Technical": rng.randint(40, 100),
+                             "Problem Solving": rng.randint(40, 100)},
+    }
+
+
+async def seed(client: httpx.AsyncClient, args, rng: random.Random) -> list:
+    """Register `args.users` users with `args.interviews` interviews each; returns [(email, token)]."""
+    run_id = f"{int(time.time())}-{rng.randrange(1 << 30)}"
+
+    async def user(n: int):
+        email = f"bench-{run_id}-{n}@example.com"
+        response = await client.post("/api/register", json={"email": email, "password": PASSWORD, "name": f"User {n}"})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for start in range(0, args.interviews, 500):
+            batch = [synthetic_interview(rng, i) for i in range(start, min(start + 500, args.interviews))]
+            (await client.post("/api/interviews/batch", json=batch, headers=headers)).raise_for_status()
+        return email, token
+
+    semaphore = asyncio.Semaphore(8)
+
+    async def limited(n: int):
+        async with semaphore:
+            return await user(n)
+
+    return await asyncio.gather(*(limited(n) for n in range(args.users)))
+
+
+async def wait_until_ready(client: httpx.AsyncClient, scenarios: list, timeout: float):
+    """The TTS scenarios need their engine warmed up first."""
+    needed = {"coqui"} if "tts" in scenarios else set()
+    if "google-tts" in scenarios:
+        needed.add("google")
+    deadline = time.monotonic() + timeout
+    while True:
+        engines = (await client.get("/api/ready")).json()["engines"]
+        failed = [name for name in needed if engines[name]["status"] == "failed"]
+        if failed:
+            raise RuntimeError(f"TTS engine failed to start: {', '.join(failed)} ({engines[failed[0]]['error']})")
+        if all(engines[name]["status"] == "ready" for name in needed):
+            return
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"TTS engines not ready after {timeout:.0f}s: {engines}")
+        await asyncio.sleep(0.2)
+
+
+# --- Load ---
+
+def audio_seconds(wav_bytes: bytes) -> float:
+    with wave.open(io.BytesIO(wav_bytes)) as w:
+        return w.getnframes() / w.getframerate()
+
+
+def request_factory(scenario: str, users: list, rng: random.Random):
+    """Returns make(i) -> (method, path, httpx kwargs) for one scenario."""
+    def auth():
+        return {"Authorization": f"Bearer {rng.choice(users)[1]}"}
+
+    if scenario in ("tts", "google-tts"):
+        path = "/tts" if scenario == "tts" else "/google-tts"
+        # Numbered so neither the audio cache nor request coalescing can answer
+        return lambda i: ("POST", path, {"json": {"text": f"{PROMPTS[i % len(PROMPTS)]} Question {i}.",
+                                                  "format": "wav"}})
+    if scenario == "login":
+        return lambda i: ("POST", "/api/login", {"json": {"email": rng.choice(users)[0], "password": PASSWORD}})
+    if scenario == "interviews":
+        return lambda i: ("GET", "/api/interviews", {"params": {"limit": 20}, "headers": auth()})
+    if scenario == "dashboard":
+        return lambda i: ("GET", "/api/dashboard", {"headers": auth()})
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, users: list, args, rng: random.Random) -> dict:
+    make = request_factory(scenario, users, rng)
+    measure_rtf = scenario in ("tts", "google-tts")
+
+    async def load(count: int, offset: int):
+        latencies, rtfs, statuses = [], [], Counter()
+        next_index = iter(range(offset, offset + count))
+
+        async def worker():
+            for i in next_index:
+                method, path, kwargs = make(i)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                statuses[str(response.status_code)] += 1
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+                    if measure_rtf:
+                        rtfs.append(elapsed / audio_seconds(response.content))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return latencies, rtfs, statuses, time.perf_counter() - started
+
+    await load(args.warmup, 1_000_000)
+    latencies, rtfs, statuses, elapsed = await load(args.requests, 0)
+
+    result = {
+        "requests": args.requests,
+        "ok": len(latencies),
+        "statuses": dict(sorted(statuses.items())),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": summarize(np.asarray(latencies) * 1000, digits=1),
+    }
+    if measure_rtf:
+        result["rtf"] = summarize(np.asarray(rtfs), digits=4)
+    return result
+
+
+def summarize(values: np.ndarray, digits: int) -> dict:
+    if values.size == 0:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {key: round(float(value), digits) for key, value in
+            {"p50": p50, "p95": p95, "p99": p99, "mean": values.mean(), "max": values.max()}.items()}
+
+
+# --- Reporting ---
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(scenarios: dict, baseline: dict = None):
+    header = f"{'scenario':<11} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rtf p50':>8} {'errors':>7}"
+    if baseline:
+        header += f" {'rps Δ':>8} {'p95 Δ':>8}"
+    print("\n" + header)
+    for name, r in scenarios.items():
+        latency = r["latency_ms"]
+        errors = r["requests"] - r["ok"]
+        rtf = f"{r['rtf']['p50']:>8.3f}" if r.get("rtf") else f"{'-':>8}"
+        line = (f"{name:<11} {r['throughput_rps']:>9.1f} {latency.get('p50', 0):>9.1f} {latency.get('p95', 0):>9.1f} "
+                f"{latency.get('p99', 0):>9.1f} {rtf} {errors:>7}")
+        before = (baseline or {}).get(name)
+        if before:
+            line += f" {change(before['throughput_rps'], r['throughput_rps']):>8}"
+            line += f" {change(before['latency_ms'].get('p95'), latency.get('p95')):>8}"
+        print(line)
+
+
+def change(before, after) -> str:
+    if not before or after is None:
+        return "-"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+async def bench(url: str, args) -> dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency + 8, max_keepalive_connections=args.concurrency + 8)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        await wait_until_ready(client, args.scenarios, args.startup_timeout)
+        print(f"🔄 Seeding {args.users} users x {args.interviews} interviews...")
+        users = await seed(client, args, rng)
+        results = {}
+        for scenario in args.scenarios:
+            print(f"🔄 {scenario}: {args.requests} requests, {args.concurrency} concurrent...")
+            results[scenario] = await run_scenario(client, scenario, users, args, rng)
+        server_stats = {
+            "tts": (await client.get("/api/tts/stats")).json(),
+            "auth": (await client.get("/api/auth/stats")).json(),
+        }
+    return {"scenarios": results, "server_stats": server_stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests before each scenario")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--interviews", type=int, default=40, help="seeded interviews per user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--coqui", choices=("stub", "real"), default="stub")
+    parser.add_argument("--coqui-rtf", type=float, default=0.1, help="real-time factor of the model stub")
+    parser.add_argument("--google-latency-ms", type=float, default=150.0)
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--url", help="benchmark a running server instead of starting one")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--startup-timeout", type=float, default=600.0)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    meta = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+    }
+    if args.url:
+        report = asyncio.run(bench(args.url, args))
+    else:
+        with InProcessServer(args) as server:
+            report = asyncio.run(bench(server.url, args))
+    report = {"meta": meta, **report}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["scenarios"]
+    print_table(report["scenarios"], baseline)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Throughput vs. number of prefork workers (see prefork.py).
+
+For each worker count this starts `prefork.py --workers N` with the audio cache
+off, waits until every worker has warmed up Coqui, then sends `--requests`
+distinct /tts requests with `--concurrency` in flight and reports:
+
+  rps        completed requests per second
+  p50/p95/p99  request latency in milliseconds
+  errors     non-200 responses (503s mean the per-worker queues were full)
+  pss_mb     proportional memory of the launcher and its workers; shared pages
+             are split between the processes that map them, so copy-on-write
+             weights count once
+  rss_mb     the same processes' resident memory summed naively, counting
+             shared pages once per process
+
+Keep the total thread budget fixed (the default gives each worker cores / N
+torch threads) so the curve shows the effect of process parallelism rather
+than of oversubscription. Texts are numbered so neither the cache nor request
+coalescing can answer them.
+
+Usage:
+    python bench_workers.py --workers 1 2 4 --concurrency 16 --requests 200 --out workers.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from compare_inference import PROMPTS
+
+
+def process_tree(pid: int) -> list:
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            for child in f.read().split():
+                pids.extend(process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def memory_mb(pid: int) -> dict:
+    """Summed PSS and RSS (MB) of `pid` and its descendants, from /proc/<pid>/smaps_rollup."""
+    totals = {"Pss": 0, "Rss": 0}
+    for p in process_tree(pid):
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                for line in f:
+                    field, _, value = line.partition(":")
+                    if field in totals:
+                        totals[field] += int(value.split()[0])
+        except OSError:
+            pass
+    return {"pss_mb": round(totals["Pss"] / 1024, 1), "rss_mb": round(totals["Rss"] / 1024, 1)}
+
+
+async def wait_until_ready(client: httpx.AsyncClient, workers: int, timeout: float):
+    """Every worker reports readiness separately, so require a run of ready answers."""
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while streak < workers * 4:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Coqui not ready on {workers} workers after {timeout:.0f}s")
+        try:
+            response = await client.get("/api/ready")
+            ready = response.json()["engines"]["coqui"]["status"] == "ready"
+        except (httpx.HTTPError, ValueError, KeyError):
+            ready = False
+        streak = streak + 1 if ready else 0
+        if not ready:
+            await asyncio.sleep(0.5)
+
+
+async def drive(client: httpx.AsyncClient, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i: int):
+        nonlocal errors
+        text = f"{PROMPTS[i % len(PROMPTS)]} Question {i}."
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/tts", json={"text": text})
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    ms = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "rps": round(len(latencies) / elapsed, 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "errors": errors,
+    }
+
+
+async def measure(workers: int, args) -> dict:
+    env = dict(os.environ, TTS_CACHE_MAX_MB="0", PORT=str(args.port))
+    command = [sys.executable, "prefork.py", "--workers", str(workers)]
+    if args.threads:
+        command += ["--threads", str(args.threads)]
+    if args.fake_rtf:
+        command += ["--fake-rtf", str(args.fake_rtf)]
+    server = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120) as client:
+            await wait_until_ready(client, workers, args.startup_timeout)
+            await drive(client, workers * 2, workers)  # Let every worker serve a request first
+            result = {"workers": workers, **await drive(client, args.requests, args.concurrency)}
+            result.update(memory_mb(server.pid))
+            return result
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=0, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--fake-rtf", type=float, default=0.0,
+                        help="run the workers on FakeCoquiTTS (measures request spreading, not inference)")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for workers in args.workers:
+        print(f"🔄 Measuring {workers} worker(s)...")
+        results.append(asyncio.run(measure(workers, args)))
+
+    print(f"\n{'workers':>7} {'rps':>8} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>6} {'pss MB':>8} {'rss MB':>8}")
+    for r in results:
+        speedup = r["rps"] / results[0]["rps"] if results[0]["rps"] else 0.0
+        print(f"{r['workers']:>7} {r['rps']:>8.2f} {speedup:>7.2f}x {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+              f"{r['p99_ms']:>8.0f} {r['errors']:>6} {r['pss_mb']:>8.0f} {r['rss_mb']:>8.0f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"cpu_count": os.cpu_count(), "concurrency": args.concurrency, "requests": args.requests,
+                       "fake_rtf": args.fake_rtf or None, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Compare Coqui CPU inference modes against the default full-precision model.
+
+For each mode this loads the model, warms it up, synthesizes a fixed set of
+interview prompts and reports:
+
+  rtf                  synthesis seconds / audio seconds (lower is faster; < 1 is faster than real time)
+  load_seconds         time to load (and quantize/export) the model
+  spectral_similarity  correlation of log-mel spectrograms with the default mode (1.0 = identical)
+  duration_ratio       total audio length vs. the default mode
+
+VITS samples noise at inference time, so by default the noise scales are set
+to 0 for every mode, making the outputs deterministic and comparable frame
+by frame. Pass --keep-noise to measure with the production settings instead.
+
+Usage:
+    python compare_inference.py --modes default quantized onnx --threads 4 --out inference_results.json
+"""
+import argparse
+import gc
+import json
+import time
+
+import numpy as np
+
+from tts_service import TTSService, INFERENCE_MODES, WARMUP_TEXT
+
+PROMPTS = [
+    "Tell me about yourself.",
+    "Can you walk me through a project you are proud of, and what you would do differently?",
+    "How do you handle disagreements with a teammate about a technical decision?",
+    "Describe a time you had to learn a new technology quickly.",
+    "What is the difference between a process and a thread?",
+    "Thanks for your time today. Do you have any questions for us?",
+]
+
+
+def log_mel(wav: np.ndarray, sample_rate: int, n_fft: int = 1024, hop: int = 256, n_mels: int = 80) -> np.ndarray:
+    """(frames, n_mels) log-mel spectrogram, numpy only."""
+    if wav.size < n_fft:
+        wav = np.pad(wav, (0, n_fft - wav.size))
+    frames = 1 + (wav.size - n_fft) // hop
+    index = np.arange(n_fft)[None, :] + hop * np.arange(frames)[:, None]
+    spectrum = np.abs(np.fft.rfft(wav[index] * np.hanning(n_fft), axis=1)) ** 2
+
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * 700.0 * (10 ** (mel_points / 2595.0) - 1) / sample_rate).astype(int)
+    filters = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return np.log(spectrum @ filters.T + 1e-10)
+
+
+def spectral_similarity(reference: np.ndarray, candidate: np.ndarray, sample_rate: int,
+                        floor_db: float = 60.0) -> float:
+    """
+    Correlation of the two log-mel spectrograms (over the common length). Both
+    are floored `floor_db` below their peak so near-silent frames, where tiny
+    numerical differences dominate the log, don't swamp the speech.
+    """
+    a, b = log_mel(reference, sample_rate), log_mel(candidate, sample_rate)
+    frames = min(len(a), len(b))
+    floor = floor_db / 10.0 * np.log(10.0)  # dB -> natural-log power units
+    a = np.maximum(a[:frames], a.max() - floor).ravel()
+    b = np.maximum(b[:frames], b.max() - floor).ravel()
+    a, b = a - a.mean(), b - b.mean()
+    return float((a @ b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-10))
+
+
+def run_mode(mode: str, threads: int, runs: int, keep_noise: bool):
+    started = time.perf_counter()
+    service = TTSService(inference_mode=mode, threads=threads)
+    load_seconds = time.perf_counter() - started
+
+    model = service.tts.synthesizer.tts_model
+    if not keep_noise:
+        model.inference_noise_scale = 0.0
+        model.inference_noise_scale_dp = 0.0
+    service.synthesize(WARMUP_TEXT)
+
+    synth_seconds, audio_seconds, waveforms = 0.0, 0.0, []
+    for prompt in PROMPTS:
+        for _ in range(runs):
+            started = time.perf_counter()
+            wav = service.synthesize(prompt)
+            synth_seconds += time.perf_counter() - started
+            audio_seconds += wav.size / service.sample_rate
+        waveforms.append(wav)
+
+    result = {
+        "mode": mode,
+        "threads": threads,
+        "load_seconds": round(load_seconds, 3),
+        "rtf": round(synth_seconds / audio_seconds, 4),
+        "audio_seconds_per_prompt": round(audio_seconds / (len(PROMPTS) * runs), 3),
+    }
+    return result, waveforms, service.sample_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=list(INFERENCE_MODES), choices=INFERENCE_MODES)
+    parser.add_argument("--threads", type=int, default=0, help="torch/ONNX Runtime threads (0 = library default)")
+    parser.add_argument("--runs", type=int, default=3, help="timed syntheses per prompt")
+    parser.add_argument("--keep-noise", action="store_true", help="keep VITS's inference noise (non-deterministic)")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    modes = ["default"] + [m for m in args.modes if m != "default"]
+    results, baseline = [], None
+    for mode in modes:
+        print(f"🔄 Measuring {mode}...")
+        result, waveforms, sample_rate = run_mode(mode, args.threads, args.runs, args.keep_noise)
+        if baseline is None:
+            baseline = waveforms
+        result["spectral_similarity"] = round(float(np.mean([
+            spectral_similarity(ref, wav, sample_rate) for ref, wav in zip(baseline, waveforms)
+        ])), 4)
+        result["duration_ratio"] = round(
+            sum(w.size for w in waveforms) / sum(w.size for w in baseline), 4
+        )
+        results.append(result)
+        gc.collect()
+
+    print(f"\n{'mode':<10} {'rtf':>8} {'speedup':>8} {'similarity':>11} {'duration':>9} {'load s':>8}")
+    for r in results:
+        speedup = results[0]["rtf"] / r["rtf"]
+        print(f"{r['mode']:<10} {r['rtf']:>8.4f} {speedup:>7.2f}x {r['spectral_similarity']:>11.4f} "
+              f"{r['duration_ratio']:>9.4f} {r['load_seconds']:>8.2f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"prompts": PROMPTS, "runs": args.runs, "keep_noise": args.keep_noise, "results": results},
+                      f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
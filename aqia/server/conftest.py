@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# main (and database) connect and sync the schema at import: point them at a
+# scratch database first, so the tests never touch the checked-in aqia_data.db
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="aqia-tests-"), "aqia_test.db")
+
+import models  # noqa: E402
+
+@pytest.fixture
+def session_factory():
+    """Sessions on a fresh in-memory database holding one user, "u1"."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(models.User(id="u1", email="a@b.co", password_hash="x"))
+        db.commit()
+    return factory
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
@@ -1,20 +1,116 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 import os
+import time
+from typing import Optional
 
 # Construct path to the SQLite database file
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./aqia_data.db")
+# Render/Heroku hand out postgres:// URLs, which SQLAlchemy 2 no longer accepts
+if DATABASE_URL.startswith("postgres://"):
+    DATABASE_URL = "postgresql://" + DATABASE_URL[len("postgres://"):]
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+def async_database_url(url: str) -> Optional[str]:
+    """Map a sync DATABASE_URL onto its asyncio driver (aiosqlite / asyncpg); None if there is none."""
+    scheme, rest = url.split("://", 1)
+    if "+" in scheme:
+        scheme = scheme.split("+", 1)[0]
+    driver = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}.get(scheme)
+    if driver is None:
+        return None
+    return f"{driver}://{rest}"
+
+# SQLite connect-time tuning. WAL lets readers proceed while an interview save
+# is writing; NORMAL sync is durable across app crashes in WAL mode; busy_timeout
+# makes writers wait for the lock instead of failing immediately.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": "MEMORY",
+}
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+# Pool sizing for Postgres; the defaults suit a single Render instance. Request
+# handlers use the async engine (DB_POOL_SIZE + DB_MAX_OVERFLOW connections);
+# the sync engine only serves the startup schema sync and the interview
+# write-behind thread (DB_SYNC_POOL_SIZE + DB_SYNC_MAX_OVERFLOW). A process can
+# therefore hold up to the sum of the two, 5 + 10 + 1 + 1 = 17 by default, and
+# every prefork worker is a separate process with its own pools.
+POOL_SIZES = {
+    "async": (int(os.getenv("DB_POOL_SIZE", "5")), int(os.getenv("DB_MAX_OVERFLOW", "10"))),
+    "sync": (int(os.getenv("DB_SYNC_POOL_SIZE", "1")), int(os.getenv("DB_SYNC_MAX_OVERFLOW", "1"))),
+}
+
+def _engine_options(kind: str) -> dict:
+    if IS_SQLITE:
+        # connect_args={"check_same_thread": False} is needed only for SQLite
+        return {"connect_args": {"check_same_thread": False}}
+    pool_size, max_overflow = POOL_SIZES[kind]
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": True,
+    }
 
 # Create SQLAlchemy engine
-# connect_args={"check_same_thread": False} is needed only for SQLite
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = create_engine(DATABASE_URL, **_engine_options("sync"))
+
+# Async engine for request handlers; shares the database (and pragmas) with `engine`.
+# Databases without a known asyncio driver still import (schema sync works), but
+# get_async_db() fails with a clear error.
+ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options("async")) if ASYNC_DATABASE_URL else None
+_engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+
+if IS_SQLITE:
+    for target in _engines:
+        event.listen(target, "connect", _apply_sqlite_pragmas)
 
 # Create a SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Objects stay usable after commit, since async code can't lazy-load expired attributes
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if async_engine is not None else None
+)
+
+def dispose_after_fork():
+    """Drop pooled connections inherited from a parent process without closing the parent's."""
+    for target in _engines:
+        target.dispose(close=False)
+
+# Statement kinds reported by observe_queries(); anything else is "OTHER"
+QUERY_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK", "PRAGMA"}
+
+def observe_queries(observer):
+    """
+    Call observer(kind, seconds) after every statement either engine runs,
+    where kind is the statement's leading keyword (SELECT, INSERT, ...).
+    """
+    def before(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        kind = statement.lstrip()[:8].split(None, 1)[0].upper() if statement else ""
+        observer(kind if kind in QUERY_KINDS else "OTHER", time.perf_counter() - context._query_started)
+
+    for target in _engines:
+        event.listen(target, "before_cursor_execute", before)
+        event.listen(target, "after_cursor_execute", after)
+
 # Base class to inherit from for creating ORM models
 Base = declarative_base()
 
@@ -25,3 +121,58 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        scheme = DATABASE_URL.split("://", 1)[0]
+        raise RuntimeError(f"No asyncio driver is configured for {scheme} databases (supported: sqlite, postgresql)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _make_rollups_unique(conn, inspector):
+    """
+    ix_progress_tracking_user_id predates one-rollup-per-user and was created
+    non-unique. Keep each user's most recently written rollup and rebuild the
+    index as unique. This is the only index ever tightened after deployment.
+    """
+    current = {index["name"]: index for index in inspector.get_indexes("progress_tracking")}
+    index = current.get("ix_progress_tracking_user_id")
+    if index is None or index["unique"]:
+        return
+    rows = conn.execute(text(
+        "SELECT id, user_id FROM progress_tracking "
+        "ORDER BY user_id, date_recorded IS NULL, date_recorded DESC, id DESC"
+    )).all()
+    seen, doomed = set(), []
+    for row_id, user_id in rows:
+        if user_id in seen:
+            doomed.append(row_id)
+        seen.add(user_id)
+    for row_id in doomed:
+        conn.execute(text("DELETE FROM progress_tracking WHERE id = :id"), {"id": row_id})
+    conn.execute(text("DROP INDEX ix_progress_tracking_user_id"))
+    print(f"ℹ️  Made ix_progress_tracking_user_id unique ({len(doomed)} duplicate rollups removed)")
+
+def sync_schema(metadata, bind=None):
+    """
+    Create missing tables, then add columns and indexes introduced after a table
+    was first created (create_all() never alters existing tables). Only nullable
+    columns can be added this way, which is all we ever introduce.
+    """
+    bind = bind or engine
+    metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"ℹ️  Added column {table.name}.{column.name}")
+            if table.name == "progress_tracking":
+                _make_rollups_unique(conn, inspector)
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
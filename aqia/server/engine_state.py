@@ -0,0 +1,65 @@
+import threading
+import time
+from typing import Optional
+
+
+class EngineState:
+    """
+    Lifecycle of a lazily initialized TTS engine, as reported by /api/ready:
+    pending -> loading -> warming -> ready, or failed at any point.
+    """
+
+    PENDING = "pending"
+    LOADING = "loading"
+    WARMING = "warming"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = self.PENDING
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self._started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == self.READY
+
+    @property
+    def is_failed(self) -> bool:
+        return self.status == self.FAILED
+
+    def begin(self) -> bool:
+        """Claim the right to initialize this engine; False if someone already did."""
+        with self._lock:
+            if self.status != self.PENDING:
+                return False
+            self.status = self.LOADING
+            self._started = time.monotonic()
+            return True
+
+    def loaded(self):
+        self.load_seconds = round(time.monotonic() - self._started, 3)
+        self.status = self.WARMING
+
+    def ready(self, warmup_seconds: Optional[float] = None):
+        if self.load_seconds is None:
+            self.load_seconds = round(time.monotonic() - self._started, 3)
+        if warmup_seconds is not None:
+            self.warmup_seconds = round(warmup_seconds, 3)
+        self.status = self.READY
+
+    def failed(self, error: Exception):
+        self.error = str(error)
+        self.status = self.FAILED
+
+    def snapshot(self) -> dict:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+        }
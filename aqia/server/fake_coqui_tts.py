@@ -0,0 +1,63 @@
+import time
+
+import numpy as np
+
+from audio_processing import OutputSpec, render
+from tts_service import WARMUP_TEXT, record_usage
+
+
+class FakeCoquiTTS:
+    """
+    Stand-in for TTSService that needs neither torch nor a model, for tests and
+    benchmarks. Set it as main.tts_service (with COQUI_EXECUTOR=thread) before
+    startup and the Coqui engine uses it instead of loading the real model.
+
+    Each utterance is a quiet tone roughly as long as the text would take to
+    read, produced after sleeping `rtf` times its duration, so the server sees
+    a model with a known real-time factor. Sleeping releases the GIL where
+    real inference mostly would not, so CPU contention is not modelled.
+    """
+
+    def __init__(self, rtf: float = 0.1, sample_rate: int = 22050, seconds_per_char: float = 0.06):
+        self.rtf = rtf
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.calls = 0
+
+    def _seconds(self, text: str) -> float:
+        return max(0.1, len(text) * self.seconds_per_char)
+
+    def _tone(self, text: str) -> np.ndarray:
+        t = np.arange(int(self.sample_rate * self._seconds(text)), dtype=np.float32) / self.sample_rate
+        return 0.1 * np.sin(2 * np.pi * 220.0 * t).astype(np.float32)
+
+    def synthesize(self, text: str, voice=None) -> np.ndarray:
+        self.calls += 1
+        time.sleep(self._seconds(text) * self.rtf)
+        record_usage(self._seconds(text) * self.rtf, self._seconds(text))
+        return self._tone(text)
+
+    def warmup(self) -> float:
+        started = time.perf_counter()
+        self.synthesize(WARMUP_TEXT)
+        return time.perf_counter() - started
+
+    def sample_rate_for(self, voice=None) -> int:
+        return self.sample_rate
+
+    def synthesize_encoded(self, text: str, spec: OutputSpec = OutputSpec(), voice=None) -> bytes:
+        return render(self.synthesize(text, voice), self.sample_rate, spec)
+
+    def synthesize_batch_encoded(self, texts: list, specs: list, voices: list = None) -> list:
+        # Like the real model's padded batch, one call costs about as much as its longest item
+        self.calls += 1
+        inference_seconds = max(self._seconds(text) for text in texts) * self.rtf
+        time.sleep(inference_seconds)
+        record_usage(inference_seconds, sum(self._seconds(text) for text in texts))
+        return [render(self._tone(text), self.sample_rate, spec) for text, spec in zip(texts, specs)]
+
+    def preprocessing_stats(self):
+        return None
+
+    def model_stats(self):
+        return None
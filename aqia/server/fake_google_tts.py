@@ -0,0 +1,76 @@
+import asyncio
+from collections import deque
+
+import grpc
+import numpy as np
+from google.cloud import texttospeech
+
+from audio_utils import encode_wav
+
+_SERVICE = "google.cloud.texttospeech.v1.TextToSpeech"
+
+
+class FakeGoogleTTS:
+    """
+    Local stand-in for the Cloud Text-to-Speech gRPC API, for tests and benchmarks.
+
+    Serves SynthesizeSpeech on 127.0.0.1 in the running event loop; point
+    GoogleTTSService(api_endpoint=fake.endpoint) at it. LINEAR16 requests get
+    a WAV of a quiet tone roughly as long as the text would take to read;
+    other encodings get opaque placeholder bytes. `latency` delays every
+    answer, and `fail_with` queues status codes for the next calls to fail with.
+    """
+
+    def __init__(self, latency: float = 0.0, sample_rate: int = 24000, seconds_per_char: float = 0.06):
+        self.latency = latency
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.fail_with = deque()
+        self.requests = []
+        self._server = None
+        self.port = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    async def start(self) -> "FakeGoogleTTS":
+        handler = grpc.method_handlers_generic_handler(_SERVICE, {
+            "SynthesizeSpeech": grpc.unary_unary_rpc_method_handler(
+                self._synthesize_speech,
+                request_deserializer=texttospeech.SynthesizeSpeechRequest.deserialize,
+                response_serializer=texttospeech.SynthesizeSpeechResponse.serialize,
+            ),
+        })
+        self._server = grpc.aio.server()
+        self._server.add_generic_rpc_handlers((handler,))
+        self.port = self._server.add_insecure_port("127.0.0.1:0")
+        await self._server.start()
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            await self._server.stop(grace=None)
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _synthesize_speech(self, request, context):
+        self.requests.append(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_with:
+            await context.abort(self.fail_with.popleft(), "fake outage")
+
+        config = request.audio_config
+        if config.audio_encoding != texttospeech.AudioEncoding.LINEAR16:
+            return texttospeech.SynthesizeSpeechResponse(audio_content=b"fake-audio:" + request.input.text.encode())
+        rate = config.sample_rate_hertz or self.sample_rate
+        seconds = max(0.1, len(request.input.text) * self.seconds_per_char)
+        t = np.arange(int(rate * seconds), dtype=np.float32) / rate
+        tone = 0.1 * np.sin(2 * np.pi * 220.0 * t).astype(np.float32)
+        return texttospeech.SynthesizeSpeechResponse(audio_content=encode_wav(tone, rate))
@@ -1,8 +1,44 @@
+from google.api_core import exceptions as google_exceptions
 from google.cloud import texttospeech
+from google.cloud.texttospeech_v1.services.text_to_speech.transports import TextToSpeechGrpcAsyncIOTransport
+import asyncio
+import grpc
 import os
+import time
+from typing import Optional
+from audio_processing import OutputSpec, render, supported_formats
+from audio_utils import decode_wav
+
+# Failures worth retrying (and counting against the circuit breaker): the
+# service was unreachable, overloaded or too slow. Anything else (bad voice
+# name, bad credentials) fails the same way on every attempt.
+TRANSIENT_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.Aborted,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+def is_transient_error(e: BaseException) -> bool:
+    return isinstance(e, TRANSIENT_ERRORS)
 
 class GoogleTTSService:
-    def __init__(self, credentials_path: str = "google-credentials.json"):
+    def __init__(self, credentials_path: str = "google-credentials.json", api_endpoint: Optional[str] = None):
+        """
+        `api_endpoint` ("host:port") points the client at a plaintext gRPC
+        server instead of Google, e.g. a local fake for tests and benchmarks.
+        """
+        self.api_endpoint = api_endpoint
+        # observer(rpc_seconds, audio_seconds or None) is called after each successful async synthesis
+        self.observer = None
+        self._async_client = None
+        self._async_client_loop = None
+        if api_endpoint:
+            return
+
         # Handle potential double extension if user made a mistake, or fall back to default
         if not os.path.exists(credentials_path):
              # Try double extension just in case
@@ -10,18 +46,37 @@ class GoogleTTSService:
                  credentials_path = credentials_path + ".json"
         
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
-        self.client = texttospeech.TextToSpeechClient()
 
-    def generate_audio(self, text: str, output_path: str, voice_name: str = "en-US-Neural2-F"):
+    @property
+    def async_client(self):
         """
-        Generates audio from text using Google Cloud TTS.
-        
-        Args:
-            text (str): The text to synthesize.
-            output_path (str): Path to save the wav file.
-            voice_name (str): The Google TTS voice name (e.g., 'en-US-Neural2-F').
+        One asyncio client (and gRPC channel) per event loop, reused across
+        requests. grpc.aio channels are bound to the loop that created them.
         """
-        
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            if self.api_endpoint:
+                transport = TextToSpeechGrpcAsyncIOTransport(channel=grpc.aio.insecure_channel(self.api_endpoint))
+                self._async_client = texttospeech.TextToSpeechAsyncClient(transport=transport)
+            else:
+                self._async_client = texttospeech.TextToSpeechAsyncClient()
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def synthesize_async(self, text: str, voice_name: str = "en-US-Neural2-F",
+                               audio_encoding=texttospeech.AudioEncoding.MP3, sample_rate: int = None,
+                               timeout: Optional[float] = None) -> bytes:
+        """
+        Encoded audio bytes (MP3 by default) for `text`. `timeout` is sent as the
+        gRPC deadline; the library's own retries are off so callers own the retry policy.
+        """
+        response = await self.async_client.synthesize_speech(
+            request=self._request(text, voice_name, audio_encoding, sample_rate), retry=None, timeout=timeout
+        )
+        return response.audio_content
+
+    @staticmethod
+    def _request(text: str, voice_name: str, audio_encoding, sample_rate: Optional[int]):
         synthesis_input = texttospeech.SynthesisInput(text=text)
 
         # Parse language code from voice name (e.g., "en-US")
@@ -33,12 +88,46 @@ class GoogleTTSService:
         )
 
         audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3
+            audio_encoding=audio_encoding,
+            sample_rate_hertz=sample_rate or 0,  # 0 = the voice's native rate
         )
+        return texttospeech.SynthesizeSpeechRequest(input=synthesis_input, voice=voice, audio_config=audio_config)
 
-        response = self.client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
-        )
+    async def synthesize_processed_async(self, text: str, voice_name: str, spec: OutputSpec,
+                                         timeout: Optional[float] = None) -> bytes:
+        """
+        Runs Google output through the same post-processing stage as Coqui.
+
+        Raw LINEAR16 is requested so normalization happens before the single
+        lossy encode; it runs in the default executor. If this server can't
+        encode the requested format itself, Google's native MP3/Opus encoder is
+        used instead (without normalization).
+        """
+        started = time.perf_counter()
+        if spec.format in supported_formats():
+            wav_bytes = await self.synthesize_async(
+                text, voice_name, texttospeech.AudioEncoding.LINEAR16, spec.sample_rate, timeout
+            )
+            rpc_seconds = time.perf_counter() - started
+
+            def render_linear16():
+                wav, sample_rate = decode_wav(wav_bytes)
+                return render(wav, sample_rate, spec), wav.size / sample_rate
+
+            audio, audio_seconds = await asyncio.get_running_loop().run_in_executor(None, render_linear16)
+            self._observe(rpc_seconds, audio_seconds)
+            return audio
+        audio = await self.synthesize_async(text, voice_name, self._native_encoding(spec), spec.sample_rate, timeout)
+        self._observe(time.perf_counter() - started, None)
+        return audio
+
+    def _observe(self, rpc_seconds: float, audio_seconds: Optional[float]):
+        if self.observer is not None:
+            self.observer(rpc_seconds, audio_seconds)
 
-        with open(output_path, "wb") as out:
-            out.write(response.audio_content)
+    @staticmethod
+    def _native_encoding(spec: OutputSpec):
+        return {
+            "mp3": texttospeech.AudioEncoding.MP3,
+            "opus": texttospeech.AudioEncoding.OGG_OPUS,
+        }[spec.format]
@@ -0,0 +1,97 @@
+import datetime
+import gzip
+import hashlib
+import json
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi.responses import Response
+
+# JSON bodies smaller than this aren't worth compressing
+MIN_GZIP_BYTES = 1024
+
+
+def _orjson():
+    try:
+        import orjson
+        return orjson
+    except ImportError:
+        return None
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """Codings the client accepts with a non-zero q value."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def version_etag(*parts) -> str:
+    """
+    Weak ETag for a response derived from `parts` (user, data version, query...).
+    Weak because the bytes differ between the gzip and identity encodings.
+    """
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def http_date(value: datetime.datetime) -> str:
+    """A naive-UTC database timestamp as an HTTP date."""
+    return format_datetime(value.replace(tzinfo=datetime.timezone.utc, microsecond=0), usegmt=True)
+
+
+def not_modified(headers, etag: str, last_modified: Optional[datetime.datetime]) -> bool:
+    """Whether a conditional GET can be answered 304. If-Modified-Since only counts without If-None-Match."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return last_modified.replace(tzinfo=datetime.timezone.utc, microsecond=0) <= since
+    return False
+
+
+def dumps(payload) -> bytes:
+    """Compact JSON: orjson when installed, otherwise the stdlib encoder without whitespace."""
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_response(payload, request_headers, headers: Optional[dict] = None) -> Response:
+    """JSON response for plain dict/list payloads, gzipped when the client accepts it and it's large enough."""
+    body = dumps(payload)
+    headers = dict(headers or {})
+    if len(body) >= MIN_GZIP_BYTES:
+        headers["Vary"] = ", ".join(filter(None, [headers.get("Vary"), "Accept-Encoding"]))
+        if "gzip" in accepted_encodings(request_headers.get("accept-encoding")):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
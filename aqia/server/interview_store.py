@@ -0,0 +1,101 @@
+import datetime
+from typing import Optional
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+import models
+import progress
+from models import generate_uuid
+
+
+def category_scores(analytics_scores) -> dict:
+    return {
+        category: int(score)
+        for category, score in (analytics_scores or {}).items()
+        if score is not None
+    }
+
+
+def _rows(user_id: str, interview, now: datetime.datetime, session_id: Optional[str] = None,
+          idempotency_key: Optional[str] = None):
+    """Plain insert rows for one interview: (session row, question rows, analytics rows)."""
+    session_id = session_id or generate_uuid()
+    started_at = getattr(interview, "started_at", None) or now
+    completed_at = getattr(interview, "completed_at", None) or now
+    session = {
+        "id": session_id,
+        "user_id": user_id,
+        "job_category": interview.job_category,
+        "overall_score": interview.overall_score,
+        "started_at": started_at,
+        "completed_at": completed_at,
+        "idempotency_key": idempotency_key,
+    }
+    questions = [
+        {
+            "id": generate_uuid(),
+            "session_id": session_id,
+            "question_asked": q.question_asked,
+            "user_answer": q.user_answer,
+            "ai_feedback": q.ai_feedback,
+            "score": q.score,
+        }
+        for q in interview.questions
+    ]
+    analytics = [
+        {"id": generate_uuid(), "session_id": session_id, "category": category, "score": score}
+        for category, score in category_scores(interview.analytics_scores).items()
+    ]
+    return session, questions, analytics
+
+
+def _insert_all(db: Session, sessions: list, questions: list, analytics: list):
+    # One executemany per table instead of one ORM object (and statement) per row
+    db.execute(insert(models.InterviewSession), sessions)
+    if questions:
+        db.execute(insert(models.QuestionHistory), questions)
+    if analytics:
+        db.execute(insert(models.AnalyticsScore), analytics)
+
+
+def find_by_idempotency_key(db: Session, user_id: str, idempotency_key: str) -> Optional[str]:
+    """Id of the interview this user already saved under `idempotency_key`, if any."""
+    return db.execute(
+        select(models.InterviewSession.id).where(
+            models.InterviewSession.user_id == user_id,
+            models.InterviewSession.idempotency_key == idempotency_key,
+        )
+    ).scalar()
+
+
+def save_interview(db: Session, user_id: str, interview, session_id: Optional[str] = None,
+                   idempotency_key: Optional[str] = None) -> str:
+    """
+    Insert one interview with its children and update the rollup, in the caller's
+    transaction. `session_id` lets the caller assign the id up front (write-behind
+    saves acknowledge it before the row exists).
+    """
+    session, questions, analytics = _rows(
+        user_id, interview, datetime.datetime.utcnow(), session_id, idempotency_key
+    )
+    _insert_all(db, [session], questions, analytics)
+    progress.record_interview(
+        db, user_id, session["id"], interview.overall_score, category_scores(interview.analytics_scores)
+    )
+    return session["id"]
+
+
+def save_interviews(db: Session, user_id: str, interviews: list) -> list:
+    """
+    Insert many interviews for one user with a single executemany per table,
+    then refresh the user's rollup once. Returns the new session ids in order.
+    """
+    now = datetime.datetime.utcnow()
+    sessions, questions, analytics = [], [], []
+    for interview in interviews:
+        session, q_rows, a_rows = _rows(user_id, interview, now)
+        sessions.append(session)
+        questions.extend(q_rows)
+        analytics.extend(a_rows)
+    _insert_all(db, sessions, questions, analytics)
+    progress.refresh_progress(db, user_id)
+    return [session["id"] for session in sessions]
@@ -0,0 +1,222 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+import interview_store
+from models import generate_uuid
+
+# Marks the end of the queue; everything submitted before it is still written
+_STOP = object()
+
+
+class WriterBusyError(Exception):
+    """Raised when the write-behind queue is full; carries a Retry-After hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Interview write queue is full")
+        self.retry_after = retry_after
+
+
+class _PendingSave:
+    __slots__ = ("user_id", "interview", "session_id", "idempotency_key", "future")
+
+    def __init__(self, user_id: str, interview, session_id: str, idempotency_key: Optional[str]):
+        self.user_id = user_id
+        self.interview = interview
+        self.session_id = session_id
+        self.idempotency_key = idempotency_key
+        self.future = Future()
+
+
+class InterviewWriter:
+    """
+    Write-behind queue for interview saves.
+
+    SQLite allows one writer at a time, so many candidates finishing together
+    contend for the write lock. Instead, `submit()` assigns the session id and
+    returns immediately, and a single writer thread drains the queue, grouping
+    up to `max_batch` saves (collected for at most `max_wait_ms`) into one
+    transaction. A group that fails is retried save by save, so one bad
+    interview doesn't sink its neighbours.
+
+    Acknowledged saves live only in memory until their group commits: `close()`
+    flushes everything queued, but a hard crash loses at most the current
+    queue. `wait_for_user()` gives readers read-your-writes for their own saves.
+    Each save's future resolves to the id it is stored under: normally the one
+    `submit()` returned, but the existing interview's id when its idempotency
+    key turns out to be taken already.
+    """
+
+    def __init__(self, session_factory, max_batch: int = 64, max_wait_ms: float = 50.0,
+                 max_queue: int = 1000):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = {}  # session_id -> _PendingSave, until written (or failed)
+        self._keys = {}  # (user_id, idempotency_key) -> session_id, for saves still pending
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.written = 0
+        self.failed = 0
+        self.transactions = 0
+        self._write_seconds = 0.0
+
+    def submit(self, user_id: str, interview, idempotency_key: Optional[str] = None) -> str:
+        """
+        Queue one interview and return its session id. A save whose idempotency
+        key is already queued returns the queued save's id instead.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Interview writer is closed")
+            if idempotency_key is not None:
+                existing = self._keys.get((user_id, idempotency_key))
+                if existing is not None:
+                    self.deduplicated += 1
+                    return existing
+            if len(self._pending) >= self.max_queue:
+                raise WriterBusyError(self.retry_after())
+
+            item = _PendingSave(user_id, interview, generate_uuid(), idempotency_key)
+            self._pending[item.session_id] = item
+            if idempotency_key is not None:
+                self._keys[(user_id, idempotency_key)] = item.session_id
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="interview-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(item)
+        return item.session_id
+
+    def pending_id(self, user_id: str, idempotency_key: str) -> Optional[str]:
+        with self._lock:
+            return self._keys.get((user_id, idempotency_key))
+
+    async def wait_for_user(self, user_id: str):
+        """Wait until every save this user has queued so far is written (or has failed)."""
+        with self._lock:
+            futures = [item.future for item in self._pending.values() if item.user_id == user_id]
+        if futures:
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True)
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop accepting saves and block until everything already queued is written."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def retry_after(self) -> int:
+        # Rough time to drain the backlog at the observed per-save write cost
+        per_save = self._write_seconds / self.written if self.written else 0.01
+        return max(1, int(len(self._pending) * per_save) + 1)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            window_ends = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = window_ends - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: list):
+        started = time.monotonic()
+        db = self.session_factory()
+        try:
+            try:
+                for item in batch:
+                    self._save(db, item)
+                db.commit()
+                self.transactions += 1
+                outcomes = [(item.session_id, None) for item in batch]
+            except Exception as batch_error:
+                db.rollback()
+                print(f"Interview write batch failed, retrying saves individually: {batch_error}")
+                outcomes = [self._write_one(db, item) for item in batch]
+        finally:
+            db.close()
+            self._write_seconds += time.monotonic() - started
+
+        for item, (stored_id, error) in zip(batch, outcomes):
+            with self._lock:
+                self._pending.pop(item.session_id, None)
+                if item.idempotency_key is not None:
+                    self._keys.pop((item.user_id, item.idempotency_key), None)
+            if error is None:
+                self.written += 1
+                item.future.set_result(stored_id)
+            else:
+                self.failed += 1
+                print(f"Interview {item.session_id} for user {item.user_id} was not saved: {error}")
+                item.future.set_exception(error)
+
+    def _write_one(self, db, item: _PendingSave) -> tuple:
+        """Save one item in its own transaction; returns (id the interview is stored under, error)."""
+        try:
+            self._save(db, item)
+            db.commit()
+            self.transactions += 1
+            return item.session_id, None
+        except IntegrityError as e:
+            db.rollback()
+            # A synchronous save (or an earlier run) already stored this key: the
+            # interview exists, under that save's id rather than the one we handed out
+            stored_id = None
+            if item.idempotency_key is not None:
+                stored_id = interview_store.find_by_idempotency_key(db, item.user_id, item.idempotency_key)
+            if stored_id is None:
+                return None, e
+            print(f"Interview {item.session_id} for user {item.user_id} was already saved as {stored_id}")
+            return stored_id, None
+        except Exception as e:
+            db.rollback()
+            return None, e
+
+    @staticmethod
+    def _save(db, item: _PendingSave):
+        interview_store.save_interview(
+            db, item.user_id, item.interview, session_id=item.session_id, idempotency_key=item.idempotency_key
+        )
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = len(self._pending)
+        return {
+            "queued": queued,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "written": self.written,
+            "failed": self.failed,
+            "transactions": self.transactions,
+            "avg_saves_per_transaction": round(self.written / self.transactions, 3) if self.transactions else 0.0,
+        }
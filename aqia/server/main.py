@@ -1,60 +1,62 @@
 import os
+import sys
+
+if __name__ == "__main__":
+    # `python main.py` (render.yaml) hands over to uvicorn's CLI instead of
+    # serving from this script. Spawned Coqui workers re-import the parent's
+    # __main__ script, which would rerun all of this module's setup (schema
+    # sync, pools, cache indexing, writer) in every worker; uvicorn's
+    # __main__ is skipped.
+    os.execv(sys.executable, [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+        "--host", "0.0.0.0", "--port", os.environ.get("PORT", "8000"),
+    ])
+
 import warnings
 # Suppress FutureWarning from transformers regarding register_pytree_node
 warnings.filterwarnings("ignore", category=FutureWarning, message=".*register_pytree_node.*")
+import hmac
 import uuid
+import asyncio
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, EmailStr, ValidationError
+from sqlalchemy import or_, and_, select, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, List
 from jose import JWTError, jwt
 import datetime
 
-from database import engine, get_db
+from database import SessionLocal, get_async_db, observe_queries, sync_schema
 import models
-from auth_utils import get_password_hash, verify_password, create_access_token
-
-# Monkey patch for coqui-tts compatibility with newer transformers
-import transformers.pytorch_utils as pu
-if not hasattr(pu, "isin_mps_friendly"):
-    def isin_mps_friendly():
-        return False
-    pu.isin_mps_friendly = isin_mps_friendly
+import progress
+import interview_store
+from interview_writer import InterviewWriter, WriterBusyError
+from pagination import encode_cursor, decode_cursor, InvalidCursorError
+from auth_utils import create_access_token
+from password_hashing import PasswordHasher, HasherBusyError
+from user_cache import UserCache, UserPrincipal
+from audio_cache import AudioCache
+from single_flight import SingleFlight
+from http_caching import http_date, json_response, not_modified, version_etag
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry, RequestMetricsMiddleware
+from profiling import ProfilingMiddleware, RequestProfiler, collapsed
 
 # Load env vars
 load_dotenv()
 
-# 1. Set Coqui TOS Agreement
+# Set Coqui TOS Agreement. The heavy Coqui/torch/eSpeak setup happens lazily in
+# tts_service.configure_runtime() when the model is first loaded.
 os.environ["COQUI_TOS_AGREED"] = "1"
 
-# 2. Fix eSpeak Path (if not in system PATH)
-espeak_path = r"C:\Program Files\eSpeak NG\espeak-ng.exe"
-if os.path.exists(espeak_path):
-    print(f"ℹ️  Found eSpeak at default location: {espeak_path}")
-    os.environ["PHONEMIZER_ESPEAK_PATH"] = espeak_path
-    
-    # Also try to set the library path if possible, though phonemizer usually needs the executable
-    # Some versions of phonemizer/coqui might look for the dll
-    espeak_lib = r"C:\Program Files\eSpeak NG\libespeak-ng.dll"
-    if os.path.exists(espeak_lib):
-         os.environ["PHONEMIZER_ESPEAK_LIBRARY"] = espeak_lib
-
-# Force phonemizer to use the espeak backend
-try:
-    from phonemizer.backend import EspeakBackend
-    if 'espeak_lib' in locals():
-        EspeakBackend.set_library(espeak_lib)
-        print("✅ EspeakBackend library set successfully.")
-    else:
-        print("ℹ️  EspeakBackend using default system library (Linux/Mac).")
-except Exception as e:
-    print(f"⚠️  Failed to set EspeakBackend library (Non-critical if using system default): {e}")
-
 # Initialize Database tables
-models.Base.metadata.create_all(bind=engine)
+sync_schema(models.Base.metadata)
 
 # We'll import each service inside its initialization try/except below.
 app = FastAPI()
@@ -66,26 +68,98 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-TTS-Engine", "ETag", "Last-Modified"],
+)
+
+# Prometheus metrics, served at /metrics. Recording costs a lock and a few
+# additions per event and queue depths are only read when scraped, so this
+# stays on in production (METRICS_ENABLED=0 turns recording off).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+metrics = MetricsRegistry()
+http_requests = metrics.counter(
+    "aqia_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_request_seconds = metrics.histogram(
+    "aqia_http_request_duration_seconds", "HTTP request latency, until the last body byte is sent.",
+    ("method", "route"))
+tts_inference_seconds = metrics.histogram(
+    "aqia_tts_inference_seconds", "Time per synthesis call: Coqui model inference or the Google RPC.", ("engine",))
+tts_audio_seconds = metrics.counter(
+    "aqia_tts_audio_seconds_total", "Seconds of audio synthesized.", ("engine",))
+tts_real_time_factor = metrics.histogram(
+    "aqia_tts_real_time_factor", "Synthesis seconds per second of audio produced.", ("engine",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0))
+bcrypt_seconds = metrics.histogram(
+    "aqia_bcrypt_seconds", "bcrypt hash and verify time, including waiting for a hashing thread.", ("op",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0))
+db_query_seconds = metrics.histogram(
+    "aqia_db_query_seconds", "SQL statement execution time by statement kind.", ("kind",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+
+def observe_synthesis(engine: str, inference_seconds: float, audio_seconds: Optional[float]):
+    tts_inference_seconds.observe(inference_seconds, engine)
+    if audio_seconds:
+        tts_audio_seconds.inc(engine, amount=audio_seconds)
+        tts_real_time_factor.observe(inference_seconds / audio_seconds, engine)
+
+if METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware, requests=http_requests, duration=http_request_seconds)
+    observe_queries(lambda kind, seconds: db_query_seconds.observe(seconds, kind))
+
+# Sampled request profiling (see profiling.py). Off unless PROFILING_ENABLED=1 or
+# switched on at runtime through /api/admin/profiling; while on, requests slower
+# than PROFILE_SLOW_MS and a PROFILE_SAMPLE_RATE fraction of the rest keep a profile.
+profiler = RequestProfiler(
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0.01")),
+    slow_ms=float(os.getenv("PROFILE_SLOW_MS", "1000")),
+    interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "10")),
+    keep=int(os.getenv("PROFILE_KEEP", "50")),
+    window_seconds=float(os.getenv("PROFILE_WINDOW_SECONDS", "60")),
 )
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+@app.on_event("startup")
+def start_profiler():
+    # At startup rather than import, so each prefork worker runs its own sampler thread
+    if os.getenv("PROFILING_ENABLED", "0") == "1":
+        profiler.configure(enabled=True)
 
-# We need the service classes imported (assuming they are in tts_service.py and google_tts_service.py which we import implicitly or explicitly)
-# Wait, previous main.py had explicit imports?
-# The view_file previously didn't show them! 
-# But the code uses `GoogleTTSService` and `TTSService`.
-# They must be imported.
-# Let me check the imports in the PREVIOUS versions shown in context.
-# Ah, I missed them in my reconstruction?
-# Let's check the `read_url_content` output again.
-# It didn't show explicit `from server.tts_service import TTSService`.
-# Let me check `server/main.py` imports carefully from previous context log.
-# Ah, I see `from server.tts_service import TTSService` in my memory/logs?
-# Actually, the implementation plan mentioned checking `server/main.py`.
-# Let's assume standard imports.
+@app.on_event("shutdown")
+def stop_profiler():
+    profiler.configure(enabled=False)
+
+import tts_service as coqui_worker
 from tts_service import TTSService
-from google_tts_service import GoogleTTSService
+from voice_registry import MODEL_ALIASES, UnknownVoiceError, Voice, resolve_voice
+from google_tts_service import GoogleTTSService, is_transient_error
+from tts_executor import SynthesisPool, QueueFullError, DeadlineExceededError
+from tts_router import EngineRouter, CircuitBreaker, CircuitOpenError, RouteResult
+from tts_batcher import BatchScheduler
+from speech_stream import split_sentences, pipelined
+from audio_utils import wav_header, wav_pcm
+from audio_processing import OutputSpec, MEDIA_TYPES, supported_formats
+from engine_state import EngineState
+
+# Engines load in a background task after startup (or on first use), so the
+# server answers /api/health immediately and /api/ready reports progress.
+google_engine = EngineState("google")
+coqui_engine = EngineState("coqui")
+google_tts_service = None
+tts_service = None
+
+def build_google_tts_service():
+    # GOOGLE_TTS_ENDPOINT points at a plaintext stand-in (e.g. fake_google_tts) instead of Google
+    endpoint = os.getenv("GOOGLE_TTS_ENDPOINT")
+    if endpoint:
+        print(f"✅ Google TTS Service using endpoint {endpoint}")
+        service = GoogleTTSService(api_endpoint=endpoint)
+    else:
+        service = build_google_tts_client()
+    if METRICS_ENABLED:
+        service.observer = lambda seconds, audio_seconds: observe_synthesis("google", seconds, audio_seconds)
+    return service
+
+def build_google_tts_client():
 
-# Initialize Google TTS Service
-try:
     # Use ENV variable for security
     creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "server/google-credentials.json")
     
@@ -93,27 +167,220 @@ try:
     if not os.path.exists(creds_path) and os.path.exists("google-credentials.json"):
          creds_path = "google-credentials.json"
         
-    google_tts_service = GoogleTTSService(credentials_path=creds_path)
+    service = GoogleTTSService(credentials_path=creds_path)
     print(f"✅ Google TTS Service Initialized using credentials at: {creds_path}")
-except Exception as e:
-    print(f"❌ Failed to init Google TTS: {e}")
-    google_tts_service = None
-
-# Initialize Coqui TTS Service
-try:
-    tts_service = TTSService()
-    print("✅ Coqui TTS Service Globally Initialized")
-except Exception as e:
-    print(f"❌ Failed to init Coqui TTS: {e}")
-    tts_service = None
-
-# Ensure audio directory exists
+    return service
+
+# Synthesis runs in bounded pools so a slow model never blocks the event loop.
+# COQUI_EXECUTOR=process gives each Coqui worker its own model and interpreter;
+# COQUI_EXECUTOR=thread shares a single in-process model.
+COQUI_EXECUTOR = os.getenv("COQUI_EXECUTOR", "process")
+TTS_DEADLINE_SECONDS = float(os.getenv("TTS_DEADLINE_SECONDS", "30"))
+TTS_WARMUP = os.getenv("TTS_WARMUP", "1") == "1"
+
+# Creating the pool is cheap: process workers (and their models) start on first submit
+if COQUI_EXECUTOR == "process":
+    COQUI_WORKERS = int(os.getenv("COQUI_WORKERS", "1"))
+    # Each worker gets its share of the cores unless COQUI_TORCH_THREADS pins a count
+    COQUI_TORCH_THREADS = int(os.getenv("COQUI_TORCH_THREADS", "0")) or max(1, (os.cpu_count() or 1) // COQUI_WORKERS)
+    coqui_pool = SynthesisPool(
+        "coqui",
+        kind="process",
+        max_workers=COQUI_WORKERS,
+        max_queue=int(os.getenv("COQUI_QUEUE_SIZE", "8")),
+        deadline=TTS_DEADLINE_SECONDS,
+        initializer=coqui_worker.init_worker,
+        initargs=(COQUI_TORCH_THREADS,),
+    )
+else:
+    coqui_pool = SynthesisPool(
+        "coqui",
+        kind="thread",
+        max_workers=1,  # One shared model instance is not safe to call concurrently
+        max_queue=int(os.getenv("COQUI_QUEUE_SIZE", "8")),
+        deadline=TTS_DEADLINE_SECONDS,
+    )
+
+# Google calls run on the asyncio client. Each attempt carries an RPC deadline,
+# transient failures are retried with backoff, and a circuit breaker stops
+# calling Google while it keeps failing. When Coqui is up it stands in for
+# Google: on failure, on an open circuit, or (after TTS_HEDGE_DELAY_MS) as a
+# hedge against a slow response, whichever answers first.
+TTS_FALLBACK = os.getenv("TTS_FALLBACK", "1") == "1"
+TTS_HEDGE_DELAY_MS = float(os.getenv("TTS_HEDGE_DELAY_MS", "1500"))
+google_router = EngineRouter(
+    primary_name="google",
+    fallback_name="coqui",
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("GOOGLE_TTS_BREAKER_FAILURES", "5")),
+        reset_seconds=float(os.getenv("GOOGLE_TTS_BREAKER_RESET_SECONDS", "30")),
+    ),
+    attempts=int(os.getenv("GOOGLE_TTS_ATTEMPTS", "3")),
+    attempt_timeout=float(os.getenv("GOOGLE_TTS_TIMEOUT_SECONDS", "5")),
+    deadline=TTS_DEADLINE_SECONDS,
+    backoff=float(os.getenv("GOOGLE_TTS_BACKOFF_SECONDS", "0.2")),
+    hedge_delay=TTS_HEDGE_DELAY_MS / 1000 if TTS_HEDGE_DELAY_MS > 0 else None,
+    max_in_flight=int(os.getenv("GOOGLE_TTS_MAX_IN_FLIGHT", "40")),
+    retryable=is_transient_error,
+)
+
+async def run_coqui(method: str, *args, **kwargs):
+    """Call a TTSService method on whichever Coqui instance the pool owns."""
+    if coqui_pool.kind == "process":
+        result, inference_seconds, audio_seconds = await coqui_pool.run(
+            coqui_worker.call_worker, method, *args, **kwargs
+        )
+    else:
+        result, inference_seconds, audio_seconds = await coqui_pool.run(
+            coqui_worker.measure_call, tts_service, method, *args, **kwargs
+        )
+    if METRICS_ENABLED and method != "warmup":
+        observe_synthesis("coqui", inference_seconds, audio_seconds)
+    return result
+
+async def run_coqui_batch(items: list):
+    texts = [text for text, _, _ in items]
+    specs = [spec for _, spec, _ in items]
+    voices = [voice for _, _, voice in items]
+    return await run_coqui("synthesize_batch_encoded", texts, specs, voices)
+
+# Micro-batching of concurrent /tts requests (COQUI_BATCH_MAX_SIZE=1 disables it)
+COQUI_BATCH_MAX_SIZE = int(os.getenv("COQUI_BATCH_MAX_SIZE", "8"))
+coqui_batcher = None
+if COQUI_BATCH_MAX_SIZE > 1:
+    coqui_batcher = BatchScheduler(
+        run_coqui_batch,
+        max_batch_size=COQUI_BATCH_MAX_SIZE,
+        max_wait_ms=float(os.getenv("COQUI_BATCH_WAIT_MS", "20")),
+        max_batch_chars=int(os.getenv("COQUI_BATCH_MAX_CHARS", "2000")),
+    )
+
+async def synthesize_coqui(text: str, spec: OutputSpec, voice: Voice = None) -> bytes:
+    if coqui_batcher:
+        return await coqui_batcher.submit(text, text, spec, voice)
+    return await run_coqui("synthesize_encoded", text, spec, voice)
+
+async def init_google_engine():
+    global google_tts_service
+    if not google_engine.begin():
+        return
+    try:
+        google_tts_service = await asyncio.get_running_loop().run_in_executor(None, build_google_tts_service)
+        google_engine.ready()
+    except Exception as e:
+        print(f"❌ Failed to init Google TTS: {e}")
+        google_engine.failed(e)
+
+async def init_coqui_engine():
+    global tts_service
+    if not coqui_engine.begin():
+        return
+    try:
+        if coqui_pool.kind == "thread":
+            # prefork.py hands its workers a service it already loaded
+            if tts_service is None:
+                tts_service = await asyncio.get_running_loop().run_in_executor(None, TTSService)
+            coqui_engine.loaded()
+        if not TTS_WARMUP:
+            coqui_engine.ready()
+            return
+        # In process mode the first job also triggers the worker's model load, so
+        # submit one warmup per worker to bring them all up.
+        warmups = coqui_pool.max_workers if coqui_pool.kind == "process" else 1
+        timings = await asyncio.gather(*(
+            run_coqui("warmup", deadline=None) for _ in range(warmups)
+        ))
+        coqui_engine.ready(max(timings))
+        print(f"✅ Coqui TTS warmed up in {max(timings):.2f}s")
+    except Exception as e:
+        print(f"❌ Failed to init Coqui TTS: {e}")
+        coqui_engine.failed(e)
+
+_engine_tasks = []
+
+def ensure_engines_started():
+    """Kick off engine initialization once, from startup or the first TTS request."""
+    if not _engine_tasks:
+        _engine_tasks.append(asyncio.ensure_future(init_google_engine()))
+        _engine_tasks.append(asyncio.ensure_future(init_coqui_engine()))
+
+def require_engine(state: EngineState, detail: str):
+    if state.is_ready:
+        return
+    ensure_engines_started()
+    if state.is_failed:
+        raise HTTPException(status_code=503, detail=detail)
+    raise HTTPException(status_code=503, detail=f"{detail} (warming up)", headers={"Retry-After": "5"})
+
+@app.on_event("startup")
+async def start_engines():
+    if os.getenv("TTS_PRELOAD", "1") == "1":
+        ensure_engines_started()
+
+@app.on_event("shutdown")
+def shutdown_synthesis_pools():
+    if coqui_batcher:
+        coqui_batcher.close()
+    coqui_pool.shutdown(wait=False)
+
+def pool_error_to_http(e: Exception) -> HTTPException:
+    if isinstance(e, (QueueFullError, CircuitOpenError)):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return HTTPException(status_code=504, detail=str(e))
+
+# Audio is synthesized and returned in memory; this directory only holds the cache
 AUDIO_DIR = "generated_audio"
-os.makedirs(AUDIO_DIR, exist_ok=True)
+
+# Content-addressed cache of synthesized audio (set TTS_CACHE_MAX_MB=0 to disable)
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "256"))
+TTS_CACHE_MAX_AGE_HOURS = float(os.getenv("TTS_CACHE_MAX_AGE_HOURS", "168"))
+audio_cache = None
+if TTS_CACHE_MAX_MB > 0:
+    audio_cache = AudioCache(
+        cache_dir=os.getenv("TTS_CACHE_DIR", os.path.join(AUDIO_DIR, "cache")),
+        max_bytes=int(TTS_CACHE_MAX_MB * 1024 * 1024),
+        max_age_seconds=TTS_CACHE_MAX_AGE_HOURS * 3600 if TTS_CACHE_MAX_AGE_HOURS > 0 else None,
+    )
+    print(f"✅ TTS audio cache enabled ({TTS_CACHE_MAX_MB:g} MB budget)")
+
+GOOGLE_TTS_MODEL = "google"
+
+# Identical concurrent syntheses (same engine, voice, text and output) share one
+# model call instead of each running their own
+tts_flights = SingleFlight()
+
+# Post-processing applied to both engines so they sound consistent
+TTS_NORMALIZE = os.getenv("TTS_NORMALIZE", "1") == "1"
+TTS_TRIM_SILENCE = os.getenv("TTS_TRIM_SILENCE", "1") == "1"
+TTS_BITRATE_KBPS = {
+    "mp3": int(os.getenv("TTS_MP3_BITRATE_KBPS", "64")),
+    "opus": int(os.getenv("TTS_OPUS_BITRATE_KBPS", "32")),
+}
 
 class TTSRequest(BaseModel):
     text: str
+    # Google voice name for /google-tts; for /tts a Coqui voice such as "ljspeech" or
+    # "vctk:p225" (see /api/tts/voices). Anything else gets the default Coqui voice.
     voice: str = "en-US-Neural2-F" # Default Google Voice
+    stream: bool = False  # Stream audio sentence by sentence as it is synthesized
+    # Output encoding: "wav", "mp3" or "opus". Defaults to wav for Coqui and mp3 for Google.
+    # Streams are always chunked WAV (Coqui) or MP3 (Google).
+    format: Optional[str] = None
+    sample_rate: Optional[int] = None  # e.g. 16000 for low-rate PCM; defaults to the model's native rate
+
+def output_spec(request: TTSRequest, default_format: str, encodable: set) -> OutputSpec:
+    fmt = (request.format or default_format).lower()
+    if fmt not in MEDIA_TYPES or fmt not in encodable:
+        raise HTTPException(status_code=400, detail=f"Unsupported audio format: {fmt}")
+    if request.sample_rate is not None and not 8000 <= request.sample_rate <= 48000:
+        raise HTTPException(status_code=400, detail="sample_rate must be between 8000 and 48000")
+    return OutputSpec(
+        format=fmt,
+        sample_rate=request.sample_rate,
+        bitrate_kbps=TTS_BITRATE_KBPS.get(fmt),
+        normalize=TTS_NORMALIZE,
+        trim_silence=TTS_TRIM_SILENCE,
+    )
 
 # Health check (API)
 @app.get("/api/health")
@@ -125,34 +392,268 @@ def health_check():
 def health_check_alias():
     return {"status": "ok", "service": "AQIA Backend"}
 
+# Readiness (API) - 200 once at least one TTS engine can serve requests
+@app.get("/api/ready")
+def readiness_check():
+    engines = {"google": google_engine.snapshot(), "coqui": coqui_engine.snapshot()}
+    ready = google_engine.is_ready or coqui_engine.is_ready
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, "engines": engines})
+
+@app.get("/api/tts/stats")
+def tts_stats():
+    return {
+        "cache": audio_cache.stats() if audio_cache else None,
+        "pools": {
+            "coqui": coqui_pool.stats(),
+        },
+        "google": google_router.stats(),
+        "batching": coqui_batcher.stats() if coqui_batcher else None,
+        "single_flight": tts_flights.stats(),
+        # Token cache and loaded models of the in-process service (process workers each keep their own)
+        "text_cache": tts_service.preprocessing_stats() if tts_service else None,
+        "models": tts_service.model_stats() if tts_service else None,
+    }
+
+def queue_depths() -> dict:
+    return {
+        "coqui": coqui_pool.in_flight,
+        "coqui_batch": coqui_batcher.queued if coqui_batcher else None,
+        "google": google_router.in_flight,
+        "bcrypt": password_hasher.in_flight,
+        "interview_writer": interview_writer.queued if interview_writer else None,
+    }
+
+metrics.gauge(
+    "aqia_queue_depth", "Work admitted but not finished (waiting or running) per queue.", queue_depths, ("queue",))
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+async def synthesize_cached(engine: str, model: str, voice: Optional[str], text: str, ext: str,
+                            media_type: str, synthesize) -> Response:
+    """
+    Respond with audio for `text`, serving it from the cache when possible.
+    `synthesize()` is only awaited on a miss and must return the encoded audio
+    bytes (or a RouteResult), which are sent straight from memory; the cache
+    copy is written after the response has gone out. Concurrent misses for the
+    same key share one synthesize() call.
+    """
+    cached = cached_response(engine, model, voice, text, ext, media_type)
+    if cached is not None:
+        return cached
+
+    filename = f"{engine}_{uuid.uuid4()}.{ext}"
+    key = AudioCache.make_key(engine, model, voice, text)
+    leader = not tts_flights.in_flight(key)
+    audio = await tts_flights.run(key, synthesize)
+    served_by = engine
+    if isinstance(audio, RouteResult):
+        audio, served_by = audio.audio, audio.engine
+    # Fallback audio is a different voice, so only the requested engine's output is cached
+    background = None
+    if audio_cache and leader and served_by == engine:
+        background = BackgroundTask(audio_cache.put_bytes, key, ext, audio)
+    return Response(
+        content=audio,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-TTS-Engine": served_by},
+        background=background,
+    )
+
+def cached_response(engine: str, model: str, voice: Optional[str], text: str, ext: str,
+                    media_type: str) -> Optional[Response]:
+    """The cached clip for `text` as a response, or None on a miss."""
+    if not audio_cache:
+        return None
+    cached = audio_cache.get_bytes(AudioCache.make_key(engine, model, voice, text), ext)
+    if cached is None:
+        return None
+    filename = f"{engine}_{uuid.uuid4()}.{ext}"
+    return Response(
+        content=cached,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-TTS-Engine": engine},
+    )
+
+async def cached_sentence(engine: str, model: str, voice: Optional[str], sentence: str, ext: str,
+                          synthesize) -> bytes:
+    """
+    Audio for one streamed sentence. Sentences are cached like whole clips, so
+    a repeated question streams from disk and a single-sentence clip requested
+    either way is synthesized once.
+    """
+    key = AudioCache.make_key(engine, model, voice, sentence)
+    if audio_cache:
+        cached = audio_cache.get_bytes(key, ext)
+        if cached is not None:
+            return cached
+    leader = not tts_flights.in_flight(key)
+    audio = await tts_flights.run(key, synthesize)
+    if audio_cache and leader:
+        await asyncio.to_thread(audio_cache.put_bytes, key, ext, audio)
+    return audio
+
+def require_text(text: str):
+    """Reject blank text up front, so streamed and whole responses fail alike."""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Text must not be empty")
+
+async def coqui_stream_chunks(sentences: list, spec: OutputSpec, voice: Voice = None):
+    """
+    Chunked WAV: a streaming header in front of the first sentence, then raw PCM.
+    Each sentence is rendered as a WAV through the batcher and the cache.
+    Silence is kept so the pauses between sentences stay natural.
+    """
+    voice = voice or resolve_voice(None)
+    spec = spec._replace(format="wav", trim_silence=False)
+    model = f"{voice.model_name}/{spec.cache_tag()}"
+    stream = pipelined(sentences, lambda s: cached_sentence(
+        "coqui", model, voice.speaker, s, "wav", lambda: synthesize_coqui(s, spec, voice)
+    ))
+    first = True
+    try:
+        async for wav in stream:
+            sample_rate, pcm = wav_pcm(wav)
+            yield wav_header(sample_rate) + pcm if first else pcm
+            first = False
+    finally:
+        await stream.aclose()
+
+def google_stream_chunks(sentences: list, voice: str, spec: OutputSpec):
+    # MP3 frames are self-delimiting, so per-sentence MP3s can be concatenated as-is.
+    # Silence is kept so the pauses between sentences stay natural.
+    spec = spec._replace(format="mp3", trim_silence=False)
+    return pipelined(sentences, lambda s: cached_sentence(
+        "google", f"{GOOGLE_TTS_MODEL}/{spec.cache_tag()}", voice, s, "mp3",
+        lambda: google_router.call_primary(
+            lambda timeout: google_tts_service.synthesize_processed_async(s, voice, spec, timeout)
+        ),
+    ))
+
+async def start_stream(chunks, media_type: str, label: str, fallback=None, fallback_after: float = None):
+    """
+    Wait for the first chunk before committing to a 200, so a full queue or a
+    failed first sentence still maps to a proper HTTP error. If that happens,
+    or the first chunk takes longer than `fallback_after` seconds, and
+    `fallback()` is given, the (chunks, media_type) it returns are streamed
+    instead. (A stream can't switch voices midway, so unlike whole-clip
+    requests it is not hedged.)
+    """
+    try:
+        first = await asyncio.wait_for(chunks.__anext__(), fallback_after if fallback else None)
+    except StopAsyncIteration:
+        first = b""
+    except Exception as e:
+        await chunks.aclose()
+        if fallback is not None:
+            print(f"{label} Error, streaming from the fallback engine: {e}")
+            fallback_chunks, fallback_media_type = fallback()
+            return await start_stream(fallback_chunks, fallback_media_type, label)
+        if isinstance(e, (QueueFullError, DeadlineExceededError, CircuitOpenError)):
+            raise pool_error_to_http(e)
+        if isinstance(e, UnknownVoiceError):
+            raise HTTPException(status_code=400, detail=str(e))
+        print(f"{label} Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def body():
+        yield first
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            # Headers are already on the wire, so all we can do is end the stream early
+            print(f"{label} Stream Error: {e}")
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(body(), media_type=media_type)
+
+async def fallback_only(fallback) -> RouteResult:
+    return RouteResult(await fallback(), google_router.fallback_name)
+
+@app.get("/api/tts/voices")
+def list_voices():
+    """Coqui voices: a model alias, or "alias:speaker" for multi-speaker models."""
+    return {"default": resolve_voice(None).name, "models": MODEL_ALIASES}
+
 @app.post("/tts")
 async def generate_speech(request: TTSRequest):
-    if not tts_service:
-        raise HTTPException(status_code=503, detail="TTS Service not available")
+    require_engine(coqui_engine, "TTS Service not available")
+    require_text(request.text)
+
+    spec = output_spec(request, "wav", supported_formats())
+    try:
+        voice = resolve_voice(request.voice)
+    except UnknownVoiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.stream:
+        sentences = split_sentences(request.text)
+        # A clip already cached whole goes out as a single chunk
+        cached = cached_response(
+            "coqui", f"{voice.model_name}/{spec._replace(format='wav').cache_tag()}", voice.speaker,
+            request.text, "wav", "audio/wav",
+        )
+        if cached is not None:
+            return cached
+        return await start_stream(coqui_stream_chunks(sentences, spec, voice), "audio/wav", "TTS")
     
     try:
-        filename = f"{uuid.uuid4()}.wav"
-        filepath = os.path.join(AUDIO_DIR, filename)
-        
-        tts_service.generate_audio(request.text, filepath)
-        
-        return FileResponse(filepath, media_type="audio/wav", filename=filename)
+        return await synthesize_cached(
+            "coqui", f"{voice.model_name}/{spec.cache_tag()}", voice.speaker, request.text,
+            spec.format, spec.media_type,
+            lambda: synthesize_coqui(request.text, spec, voice),
+        )
+    except (QueueFullError, DeadlineExceededError) as e:
+        raise pool_error_to_http(e)
+    except UnknownVoiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"TTS Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/google-tts")
 async def generate_google_speech(request: TTSRequest):
-    if not google_tts_service:
-        raise HTTPException(status_code=503, detail="Google TTS Service not available (Check credentials)")
-    
+    ensure_engines_started()
+    require_text(request.text)
+    # Google can fall back to its own MP3/Opus encoders, so every format is available
+    spec = output_spec(request, "mp3", set(MEDIA_TYPES))
+    # Coqui can stand in for Google once it is up and can encode the requested format
+    fallback_ready = TTS_FALLBACK and coqui_engine.is_ready and spec.format in supported_formats()
+    if not google_engine.is_ready and not fallback_ready:
+        require_engine(google_engine, "Google TTS Service not available (Check credentials)")
+
+    if request.stream:
+        sentences = split_sentences(request.text)
+        cached = cached_response(
+            "google", f"{GOOGLE_TTS_MODEL}/{spec._replace(format='mp3').cache_tag()}", request.voice,
+            request.text, "mp3", "audio/mpeg",
+        )
+        if cached is not None:
+            return cached
+        coqui_stream = lambda: (coqui_stream_chunks(sentences, spec), "audio/wav")
+        if not google_engine.is_ready:
+            return await start_stream(*coqui_stream(), "Google TTS")
+        chunks = google_stream_chunks(sentences, request.voice, spec)
+        return await start_stream(
+            chunks, "audio/mpeg", "Google TTS",
+            fallback=coqui_stream if fallback_ready else None, fallback_after=google_router.hedge_delay,
+        )
+
+    primary = lambda timeout: google_tts_service.synthesize_processed_async(
+        request.text, request.voice, spec, timeout
+    )
+    fallback = (lambda: synthesize_coqui(request.text, spec)) if fallback_ready else None
     try:
-        filename = f"google_{uuid.uuid4()}.mp3"
-        filepath = os.path.join(AUDIO_DIR, filename)
-        
-        google_tts_service.generate_audio(request.text, filepath, request.voice)
-        
-        return FileResponse(filepath, media_type="audio/mpeg", filename=filename)
+        return await synthesize_cached(
+            "google", f"{GOOGLE_TTS_MODEL}/{spec.cache_tag()}", request.voice, request.text,
+            spec.format, spec.media_type,
+            (lambda: google_router.route(primary, fallback)) if google_engine.is_ready
+            else (lambda: fallback_only(fallback)),
+        )
+    except (QueueFullError, DeadlineExceededError, CircuitOpenError) as e:
+        raise pool_error_to_http(e)
     except Exception as e:
         print(f"Google TTS Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -168,31 +669,77 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+# bcrypt gets its own small pool so login bursts can't starve the shared threadpool.
+# New hashes use BCRYPT_ROUNDS, or the highest cost that hashes within
+# BCRYPT_TARGET_MS on this machine (calibrated at startup).
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+    max_workers=int(os.getenv("BCRYPT_WORKERS", "2")),
+    max_queue=int(os.getenv("BCRYPT_QUEUE_SIZE", "32")),
+    observer=(lambda op, seconds: bcrypt_seconds.observe(seconds, op)) if METRICS_ENABLED else None,
+)
+
+def calibrate_bcrypt_cost() -> int:
+    """Blocking; prefork.py calls it once before forking so every worker agrees on the cost."""
+    rounds = password_hasher.calibrate(
+        float(os.getenv("BCRYPT_TARGET_MS", "250")),
+        int(os.getenv("BCRYPT_MIN_ROUNDS", "12")),  # values below 12 are raised to 12
+    )
+    print(f"✅ bcrypt cost calibrated to {rounds} rounds")
+    return rounds
+
+@app.on_event("startup")
+async def calibrate_password_hashing():
+    if os.getenv("BCRYPT_ROUNDS"):
+        return
+    await run_in_threadpool(calibrate_bcrypt_cost)
+
+@app.on_event("shutdown")
+def shutdown_password_hashing():
+    password_hasher.shutdown(wait=False)
+
+def hasher_busy_to_http(e: HasherBusyError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def find_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
 @app.post("/api/register")
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await find_user_by_email(db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HasherBusyError as e:
+        raise hasher_busy_to_http(e)
     new_user = models.User(
         email=user.email,
         password_hash=hashed_password,
         name=user.name
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     
     # Return a token immediately upon registration for convenience
     access_token = create_access_token(data={"sub": new_user.email, "id": new_user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.password_hash):
-        raise HTTPException(status_code=401, detail="Incorrect email or password")
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    db_user = await find_user_by_email(db, user.email)
+    try:
+        if not db_user or not await password_hasher.verify(user.password, db_user.password_hash):
+            raise HTTPException(status_code=401, detail="Incorrect email or password")
+        # The password is known-good here, so an outdated work factor can be upgraded in place
+        new_hash = await password_hasher.rehash_if_outdated(user.password, db_user.password_hash)
+    except HasherBusyError as e:
+        raise hasher_busy_to_http(e)
+    if new_hash:
+        db_user.password_hash = new_hash
+        await db.commit()
     
     access_token = create_access_token(data={"sub": db_user.email, "id": db_user.id})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -202,11 +749,31 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 
-def get_current_user(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)):
-    """Decode the Bearer JWT token and return the DB user."""
+# Verified token -> user principal, so protected reads skip the users lookup
+# (set AUTH_CACHE_TTL_SECONDS=0 to disable)
+user_cache = UserCache(
+    max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60")),
+)
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def invalidate_cached_user(mapper, connection, target):
+    """Account changes made through the ORM take effect on the user's next request."""
+    user_cache.invalidate_user(target.id)
+
+@app.get("/api/auth/stats")
+def auth_stats():
+    return {"user_cache": user_cache.stats(), "password_hashing": password_hasher.stats()}
+
+async def get_current_user(authorization: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    """Decode the Bearer JWT token and return the user principal."""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     token = authorization.split(" ", 1)[1]
+    cached = user_cache.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("id")
@@ -214,10 +781,12 @@ def get_current_user(authorization: Optional[str] = Header(None), db: Session =
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    principal = UserPrincipal.from_user(user)
+    user_cache.put(token, principal, payload.get("exp"))
+    return principal
 
 # --- Interview Endpoints ---
 
@@ -233,60 +802,198 @@ class InterviewCreate(BaseModel):
     questions: List[QuestionIn] = []
     analytics_scores: Optional[dict] = None  # e.g. {"Communication": 80, "Technical": 75}
 
+# Write-behind saves (INTERVIEW_WRITE_BEHIND=1): acknowledge with 202 and an id
+# and let one writer thread group saves into shared transactions. This helps on
+# SQLite, where concurrent commits otherwise queue on the database write lock,
+# but acknowledged saves are lost if the process dies before they are written,
+# so it is off unless enabled.
+INTERVIEW_WRITE_BEHIND = os.getenv("INTERVIEW_WRITE_BEHIND", "0") == "1"
+interview_writer = InterviewWriter(
+    SessionLocal,
+    max_batch=int(os.getenv("INTERVIEW_WRITE_BATCH", "64")),
+    max_wait_ms=float(os.getenv("INTERVIEW_WRITE_WAIT_MS", "50")),
+    max_queue=int(os.getenv("INTERVIEW_WRITE_QUEUE_SIZE", "1000")),
+) if INTERVIEW_WRITE_BEHIND else None
+
+@app.on_event("shutdown")
+async def flush_interview_writes():
+    if interview_writer is not None:
+        await run_in_threadpool(interview_writer.close)
+
+async def wait_for_own_writes(user_id: str):
+    """Read-your-writes: let this user's queued saves land before reading their history."""
+    if interview_writer is not None:
+        await interview_writer.wait_for_user(user_id)
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 200
+
 @app.post("/api/interviews")
-def save_interview(
+async def save_interview(
     data: InterviewCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
-    """Save a completed interview session and its Q&A to the database."""
-    session = models.InterviewSession(
-        user_id=current_user.id,
-        job_category=data.job_category,
-        overall_score=data.overall_score,
-        completed_at=datetime.datetime.utcnow()
-    )
-    db.add(session)
-    db.flush()  # get session.id before adding children
-
-    for q in data.questions:
-        question = models.QuestionHistory(
-            session_id=session.id,
-            question_asked=q.question_asked,
-            user_answer=q.user_answer,
-            ai_feedback=q.ai_feedback,
-            score=q.score
+    """
+    Save a completed interview session and its Q&A to the database.
+
+    Clients may send an Idempotency-Key header; retrying with the same key
+    returns the original interview's id instead of saving a duplicate. In
+    write-behind mode the save is acknowledged with 202 and its id before it
+    is written.
+    """
+    if idempotency_key is not None:
+        if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+        existing = interview_writer.pending_id(current_user.id, idempotency_key) if interview_writer else None
+        existing = existing or await db.run_sync(
+            interview_store.find_by_idempotency_key, current_user.id, idempotency_key
+        )
+        if existing:
+            return {"id": existing, "message": "Interview already saved"}
+
+    if interview_writer is not None:
+        try:
+            session_id = interview_writer.submit(current_user.id, data, idempotency_key)
+        except WriterBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        response.status_code = 202
+        return {"id": session_id, "message": "Interview accepted"}
+
+    try:
+        session_id = await db.run_sync(
+            interview_store.save_interview, current_user.id, data, idempotency_key=idempotency_key
         )
-        db.add(question)
-
-    # Save per-category analytics scores
-    if data.analytics_scores:
-        for category, score in data.analytics_scores.items():
-            if score is not None:
-                analytics = models.AnalyticsScore(
-                    session_id=session.id,
-                    category=category,
-                    score=int(score)
-                )
-                db.add(analytics)
-
-    db.commit()
-    db.refresh(session)
-    return {"id": session.id, "message": "Interview saved successfully"}
+        await db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key won the race
+        await db.rollback()
+        if idempotency_key is None:
+            raise
+        existing = await db.run_sync(interview_store.find_by_idempotency_key, current_user.id, idempotency_key)
+        if not existing:
+            raise
+        return {"id": existing, "message": "Interview already saved"}
+    return {"id": session_id, "message": "Interview saved successfully"}
+
+class InterviewImport(InterviewCreate):
+    # Original timestamps, so offline sessions and migrated history keep their dates
+    started_at: Optional[datetime.datetime] = None
+    completed_at: Optional[datetime.datetime] = None
+
+MAX_IMPORT_ITEMS = 1000
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "100"))
+
+@app.post("/api/interviews/batch")
+async def import_interviews(
+    items: List[dict],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """
+    Save many completed interviews (offline clients, migrations).
+
+    Items are validated individually and written IMPORT_BATCH_SIZE at a time,
+    one transaction per batch. If a batch fails, its items are retried one by
+    one so a single bad item doesn't sink its neighbours. The response has one
+    result per input item, in order.
+    """
+    if len(items) > MAX_IMPORT_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_IMPORT_ITEMS} interviews per request")
+
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, InterviewImport.model_validate(item)))
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "error", "detail": e.errors(include_url=False)}
+
+    for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+        batch = valid[start:start + IMPORT_BATCH_SIZE]
+        try:
+            ids = await db.run_sync(
+                interview_store.save_interviews, current_user.id, [interview for _, interview in batch]
+            )
+            await db.commit()
+            for (index, _), session_id in zip(batch, ids):
+                results[index] = {"index": index, "status": "created", "id": session_id}
+        except Exception as batch_error:
+            await db.rollback()
+            print(f"Interview import batch failed, retrying items individually: {batch_error}")
+            for index, interview in batch:
+                try:
+                    session_id = (await db.run_sync(interview_store.save_interviews, current_user.id, [interview]))[0]
+                    await db.commit()
+                    results[index] = {"index": index, "status": "created", "id": session_id}
+                except Exception as e:
+                    await db.rollback()
+                    results[index] = {"index": index, "status": "error", "detail": str(e)}
+
+    created = sum(1 for r in results if r["status"] == "created")
+    return {"created": created, "failed": len(items) - created, "results": results}
+
+# History and dashboard responses are validated by the user's data version
+# (bumped in the same transaction as every save), so a refocused tab whose data
+# hasn't changed gets a 304 after a single indexed lookup. `view` covers
+# whatever else shapes the body (query, config).
+def cache_validators(user_id: str, version: int, last_modified, *view) -> dict:
+    headers = {
+        "ETag": version_etag(user_id, version, *view),
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
 
 @app.get("/api/interviews")
-def get_interviews(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+async def get_interviews(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
-    """Return all interview sessions for the current user, newest first."""
-    sessions = (
-        db.query(models.InterviewSession)
-        .filter(models.InterviewSession.user_id == current_user.id)
-        .order_by(models.InterviewSession.started_at.desc())
-        .all()
+    """
+    Return a page of interview sessions for the current user, newest first.
+
+    Pages are keyset-paginated on (started_at, id), served by the
+    (user_id, started_at, id) index, so latency doesn't grow with history.
+    When more rows exist the X-Next-Cursor header carries the cursor for the
+    next page. Responses carry an ETag and Last-Modified; conditional requests
+    for unchanged history get 304.
+    """
+    try:
+        position = decode_cursor(cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await wait_for_own_writes(current_user.id)
+    version, last_modified = await db.run_sync(progress.data_version, current_user.id)
+    headers = cache_validators(current_user.id, version, last_modified, "interviews", limit, cursor)
+    if not_modified(request.headers, headers["ETag"], last_modified):
+        return Response(status_code=304, headers=headers)
+
+    query = select(models.InterviewSession).where(models.InterviewSession.user_id == current_user.id)
+    if position:
+        started_at, last_id = position
+        query = query.where(or_(
+            models.InterviewSession.started_at < started_at,
+            and_(models.InterviewSession.started_at == started_at, models.InterviewSession.id < last_id),
+        ))
+    result = await db.execute(
+        query
+        .order_by(models.InterviewSession.started_at.desc(), models.InterviewSession.id.desc())
+        .limit(limit + 1)
     )
-    return [
+    sessions = result.scalars().all()
+
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(sessions[-1].started_at, sessions[-1].id)
+
+    return json_response([
         {
             "id": s.id,
             "job_category": s.job_category,
@@ -295,31 +1002,40 @@ def get_interviews(
             "completed_at": s.completed_at.isoformat() if s.completed_at else None,
         }
         for s in sessions
-    ]
+    ], request.headers, headers)
+
+RECENT_INTERVIEWS = 6
+PROGRESS_CHART_POINTS = int(os.getenv("PROGRESS_CHART_POINTS", "50"))
 
 @app.get("/api/dashboard")
-def get_dashboard(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+async def get_dashboard(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
-    """Return aggregated stats for the Dashboard."""
-    sessions = (
-        db.query(models.InterviewSession)
-        .filter(
+    """Return aggregated stats for the Dashboard (304 when unchanged, see cache_validators)."""
+    await wait_for_own_writes(current_user.id)
+    # Totals come from the precomputed rollup row; only bounded slices are read here
+    rollup = await db.run_sync(progress.get_progress, current_user.id)
+    headers = cache_validators(
+        current_user.id, rollup.data_version or 0, rollup.date_recorded,
+        "dashboard", RECENT_INTERVIEWS, PROGRESS_CHART_POINTS,
+    )
+    if not_modified(request.headers, headers["ETag"], rollup.date_recorded):
+        return Response(status_code=304, headers=headers)
+
+    result = await db.execute(
+        select(models.InterviewSession)
+        .where(
             models.InterviewSession.user_id == current_user.id,
             models.InterviewSession.overall_score.isnot(None)
         )
-        .order_by(models.InterviewSession.started_at.asc())
-        .all()
+        .order_by(models.InterviewSession.started_at.desc())
+        .limit(max(RECENT_INTERVIEWS, PROGRESS_CHART_POINTS))
     )
-
-    total_interviews = len(sessions)
-    highest_score = max((s.overall_score for s in sessions), default=0)
-    scores = [s.overall_score for s in sessions if s.overall_score is not None]
-    avg_score = round(sum(scores) / len(scores)) if scores else 0
+    latest = result.scalars().all()
 
     # Recent interviews (last 6, newest first) for the history list
-    recent = sorted(sessions, key=lambda s: s.started_at, reverse=True)[:6]
     recent_interviews = [
         {
             "id": s.id,
@@ -327,59 +1043,103 @@ def get_dashboard(
             "date": s.started_at.strftime("%b %d, %Y") if s.started_at else "",
             "score": s.overall_score,
         }
-        for s in recent
+        for s in latest[:RECENT_INTERVIEWS]
     ]
 
-    # Progress chart data — one point per interview in chronological order
+    # Progress chart data — one point per interview in chronological order,
+    # limited to the most recent PROGRESS_CHART_POINTS interviews
     progress_data = [
         {
             "date": s.started_at.strftime("%b %d") if s.started_at else "",
             "score": s.overall_score,
         }
-        for s in sessions
+        for s in reversed(latest[:PROGRESS_CHART_POINTS])
     ]
 
-    return {
-        "total_interviews": total_interviews,
-        "highest_score": highest_score,
-        "avg_score": avg_score,
+    return json_response({
+        "total_interviews": rollup.total_interviews,
+        "highest_score": rollup.highest_score or 0,
+        "avg_score": round(rollup.rolling_average_score) if rollup.total_interviews else 0,
+        "most_improved_category": rollup.most_improved_category,
         "recent_interviews": recent_interviews,
         "progress_data": progress_data,
-    }
+    }, request.headers, headers)
+
+# --- Admin Endpoints ---
+# Hidden (404) unless ADMIN_TOKEN is set; callers send it in X-Admin-Token.
+# With prefork.py each worker has its own state, so these act on whichever
+# worker answers.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+class ProfilingSettings(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = None  # fraction of requests profiled, 0..1
+    slow_ms: Optional[float] = None  # requests at least this slow are always profiled; 0 disables
+
+@app.get("/api/admin/profiling", dependencies=[Depends(require_admin)])
+def profiling_status():
+    return {**profiler.stats(), "profiles": profiler.profiles()}
+
+@app.post("/api/admin/profiling", dependencies=[Depends(require_admin)])
+def configure_profiling(settings: ProfilingSettings):
+    if settings.sample_rate is not None and not 0 <= settings.sample_rate <= 1:
+        raise HTTPException(status_code=400, detail="sample_rate must be between 0 and 1")
+    if settings.slow_ms is not None and settings.slow_ms < 0:
+        raise HTTPException(status_code=400, detail="slow_ms must not be negative")
+    profiler.configure(enabled=settings.enabled, sample_rate=settings.sample_rate, slow_ms=settings.slow_ms)
+    return profiler.stats()
+
+def folded_download(stacks, filename: str) -> Response:
+    # Folded stacks: `flamegraph.pl profile.folded > profile.svg`, or open in speedscope
+    return Response(
+        content=collapsed(stacks),
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/api/admin/profiling/collapsed", dependencies=[Depends(require_admin)])
+def download_profiles(route: Optional[str] = None):
+    """All retained profiles merged into one, optionally only those for `route` (e.g. /api/dashboard)."""
+    return folded_download(profiler.merged(route), "profiles.folded")
+
+@app.get("/api/admin/profiling/{profile_id}", dependencies=[Depends(require_admin)])
+def download_profile(profile_id: int):
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return folded_download(profile.stacks, f"profile-{profile_id}.folded")
 
 # --- Static File Serving (Place at the end) ---
-from fastapi.staticfiles import StaticFiles
+from static_site import StaticSite
 
 # Check if static directory exists (deployed mode)
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 if os.path.exists(STATIC_DIR):
-    app.mount("/assets", StaticFiles(directory=os.path.join(STATIC_DIR, "assets")), name="assets")
+    # Indexed and compressed once here (before prefork.py forks), then served from memory
+    static_site = StaticSite(STATIC_DIR)
+    print(f"✅ Serving static files: {static_site.stats()}")
 
     # Serve Root (Index)
     @app.get("/")
-    async def serve_root():
-        return FileResponse(os.path.join(STATIC_DIR, "index.html"))
+    async def serve_root(request: Request):
+        return static_site.respond("/", request.headers)
 
-    # Catch-all for SPA (must be after API routes)
-    # Note: We use a path parameter to catch everything
+    # Catch-all for SPA (must be after API routes): files from the build,
+    # index.html for client-side routes
     @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        # Allow API routes (defined above) to take precedence automatically.
-        
-        # Check if file exists in static root (e.g. favicon.ico)
-        file_path = os.path.join(STATIC_DIR, full_path)
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-             return FileResponse(file_path)
-        
-        # Otherwise serve index.html for client-side routing
-        return FileResponse(os.path.join(STATIC_DIR, "index.html"))
+    async def serve_spa(full_path: str, request: Request):
+        return static_site.respond(full_path, request.headers)
 else:
     # If no static files, route root to health check
     @app.get("/")
     def read_root_fallback():
         return {"status": "ok", "service": "AQIA Backend (No Static Served)"}
 
-if __name__ == "__main__":
-    import uvicorn
-    port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+# `python main.py` runs a single process (see the top of this file). For several
+# workers sharing one copy of the Coqui model, run prefork.py.
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 import datetime
 import uuid
@@ -28,16 +28,23 @@ class InterviewSession(Base):
     overall_score = Column(Integer, nullable=True) # Final score 0-100
     started_at = Column(DateTime, default=datetime.datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+    idempotency_key = Column(String, nullable=True)  # Client-supplied, so retried saves aren't duplicated
     
     user = relationship("User", back_populates="interviews")
     questions = relationship("QuestionHistory", back_populates="session")
     analytics = relationship("AnalyticsScore", back_populates="session")
 
+    # Serves the per-user history listing (keyset pagination) and dashboard queries
+    __table_args__ = (
+        Index("ix_interview_sessions_user_started", "user_id", "started_at", "id"),
+        Index("ux_interview_sessions_user_idempotency", "user_id", "idempotency_key", unique=True),
+    )
+
 class QuestionHistory(Base):
     __tablename__ = "question_history"
     
     id = Column(String, primary_key=True, default=generate_uuid, index=True)
-    session_id = Column(String, ForeignKey("interview_sessions.id"))
+    session_id = Column(String, ForeignKey("interview_sessions.id"), index=True)
     question_asked = Column(Text, nullable=False)
     user_answer = Column(Text, nullable=True)
     ai_feedback = Column(Text, nullable=True)
@@ -49,7 +56,7 @@ class AnalyticsScore(Base):
     __tablename__ = "analytics_scores"
     
     id = Column(String, primary_key=True, default=generate_uuid, index=True)
-    session_id = Column(String, ForeignKey("interview_sessions.id"))
+    session_id = Column(String, ForeignKey("interview_sessions.id"), index=True)
     category = Column(String, nullable=False) # e.g., "Communication", "Technical Accuracy"
     score = Column(Integer, nullable=False)
     
@@ -59,10 +66,12 @@ class ProgressTracking(Base):
     __tablename__ = "progress_tracking"
     
     id = Column(String, primary_key=True, default=generate_uuid, index=True)
-    user_id = Column(String, ForeignKey("users.id"))
-    date_recorded = Column(DateTime, default=datetime.datetime.utcnow)
-    rolling_average_score = Column(Float, nullable=False)
-    total_interviews = Column(Integer, nullable=False)
+    user_id = Column(String, ForeignKey("users.id"), index=True, unique=True)  # One rollup row per user
+    date_recorded = Column(DateTime, default=datetime.datetime.utcnow)  # Last time the rollup changed
+    rolling_average_score = Column(Float, nullable=False)  # Average over scored interviews
+    total_interviews = Column(Integer, nullable=False)  # Number of scored interviews
     most_improved_category = Column(String, nullable=True)
+    highest_score = Column(Integer, nullable=True)
+    data_version = Column(Integer, nullable=True)  # Bumped on every change to the user's interviews (HTTP ETags)
     
     user = relationship("User", back_populates="progress")
@@ -0,0 +1,24 @@
+import base64
+import datetime
+from typing import Optional, Tuple
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(started_at: datetime.datetime, row_id: str) -> str:
+    """Opaque keyset cursor for the (started_at, id) position of the last row on a page."""
+    raw = f"{started_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime.datetime, str]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        started_at, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|", 1)
+        return datetime.datetime.fromisoformat(started_at), row_id
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,122 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from auth_utils import get_password_hash, verify_password, hash_rounds, calibrate_bcrypt_rounds
+
+# Calibration never picks a cost below this, however slow the machine
+MIN_CALIBRATED_ROUNDS = 12
+
+
+class HasherBusyError(Exception):
+    """Raised when every hashing slot is taken; carries a Retry-After hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    bcrypt on its own small thread pool.
+
+    bcrypt releases the GIL, so a few threads hash in parallel, but a burst of
+    logins must not occupy the threadpool every other endpoint shares. At most
+    `max_workers + max_queue` operations are admitted at once; the rest are
+    rejected with HasherBusyError so the caller can answer 503 + Retry-After.
+
+    New hashes use `rounds`, which `calibrate()` can set from a latency target.
+    A stored hash with a lower work factor is transparently rehashed on login;
+    stronger ones (e.g. from a faster machine) are left alone.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2, max_queue: int = 32, observer=None):
+        self.rounds = rounds
+        # observer(op, seconds) is called after every hash/verify, queueing included
+        self.observer = observer
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._timings = {"hash": [0, 0.0], "verify": [0, 0.0]}  # op -> [count, total seconds]
+
+    def calibrate(self, target_ms: float, min_rounds: int = MIN_CALIBRATED_ROUNDS, max_rounds: int = 16) -> int:
+        """
+        Pick the highest work factor that hashes within `target_ms`, but at least
+        MIN_CALIBRATED_ROUNDS. Blocking; call off the event loop.
+        """
+        min_rounds = max(min_rounds, MIN_CALIBRATED_ROUNDS)
+        self.rounds = calibrate_bcrypt_rounds(target_ms, min_rounds, max(max_rounds, min_rounds))
+        return self.rounds
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether the stored hash is weaker than the current work factor."""
+        rounds = hash_rounds(hashed_password)
+        return rounds is None or rounds < self.rounds
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, password, hashed_password)
+
+    async def rehash_if_outdated(self, password: str, hashed_password: str) -> Optional[str]:
+        """New hash at the current work factor, or None when `hashed_password` is already at least as strong."""
+        if not self.needs_rehash(hashed_password):
+            return None
+        new_hash = await self.hash(password)
+        with self._lock:
+            self.rehashed += 1
+        return new_hash
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def retry_after(self) -> int:
+        count, total = self._timings["hash"]
+        per_op = total / count if count else 0.25
+        waves = max(1, self._in_flight - self.max_workers + 1) / self.max_workers
+        return max(1, math.ceil(waves * per_op))
+
+    async def _run(self, op: str, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise HasherBusyError(self.retry_after())
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self._executor.submit(fn, *args))
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+                self._timings[op][0] += 1
+                self._timings[op][1] += elapsed
+            if self.observer is not None:
+                self.observer(op, elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "rounds": self.rounds,
+                "workers": self.max_workers,
+                "in_flight": self._in_flight,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+            }
+            for op, (count, total) in self._timings.items():
+                stats[f"{op}_count"] = count
+                stats[f"{op}_avg_ms"] = round(total / count * 1000, 1) if count else 0.0
+            return stats
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,254 @@
+"""
+Prefork launcher: load Coqui once, then fork HTTP workers that share it.
+
+`python main.py` serves every request from one process. Running N uvicorn
+workers instead would load N copies of the model and the torch runtime. This
+launcher loads the model (and any --voices) in the parent, binds the listening
+socket, and forks N workers that accept on it. Forked workers see the parent's
+weights copy-on-write: the tensor data is never written during inference, so
+those pages stay shared and each extra worker costs its own activations and
+interpreter state rather than another copy of the model. gc.freeze() before
+forking keeps the cyclic GC from touching the parent's objects, which would
+otherwise copy their pages one by one.
+
+Each worker runs the shared model in-process (COQUI_EXECUTOR=thread, one
+synthesis at a time) with its own torch thread pool, sized so the workers
+together use the machine's cores:
+
+    python prefork.py --workers 4                # 4 workers x (cores / 4) torch threads
+    python prefork.py --workers 4 --threads 2 --voices ljspeech vctk
+
+PREFORK_WORKERS, COQUI_TORCH_THREADS, HOST and PORT set the same defaults.
+The parent never runs inference: OpenMP thread pools started before a fork
+are not usable in the children, so warmup happens in each worker. The ONNX
+inference mode is not supported here because ONNX Runtime sessions start
+their thread pools at load time.
+
+Per-process state that would misbehave across workers is adjusted:
+
+- Interview write-behind (INTERVIEW_WRITE_BEHIND) is forced off. Each worker
+  would queue saves in its own memory, so a user's next request, served by a
+  different worker, couldn't wait for them, and a crash would lose every
+  worker's queue.
+- The audio cache budget (TTS_CACHE_MAX_MB) is split evenly: worker i keeps
+  its own index in TTS_CACHE_DIR/worker-i with 1/N of the budget, so the
+  workers together stay within it and never evict each other's files. A
+  restarted worker takes over its predecessor's directory. A clip cached by
+  one worker is a miss on the others.
+- The auth cache (AUTH_CACHE_TTL_SECONDS) is capped at
+  PREFORK_AUTH_CACHE_TTL_SECONDS. An account change invalidates the cached
+  principal only in the worker that made it, so the others keep serving the
+  old one until their entry expires.
+
+Throughput vs. workers: bench_workers.py starts this launcher at each worker
+count, drives it with concurrent uncached /tts requests and records requests
+per second, latency percentiles and the workers' proportional memory (PSS),
+which shows the shared weights counted once rather than per worker. Measure on
+the deployment hardware with a fixed total core budget:
+
+    python bench_workers.py --workers 1 2 4 8 --concurrency 16 --out workers.json
+
+The Coqui curve (rps, p50/p95 latency, PSS/RSS per worker count) has not
+been measured yet: it needs a multi-core host with torch and the model, and
+until it exists no worker count is recommended over another. Expect the gain
+to stop once workers x torch threads reach the core count, since inference
+is CPU-bound.
+
+--fake-rtf runs the workers on FakeCoquiTTS instead (no torch needed). The
+fake sleeps instead of using the CPU, so it only checks that requests spread
+across the workers; its numbers say nothing about inference throughput.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+# Every worker runs the preloaded model in-process; must be set before main is imported
+os.environ["COQUI_EXECUTOR"] = "thread"
+
+# A worker that dies within MIN_WORKER_LIFETIME_SECONDS of starting is restarted
+# only after RESTART_BACKOFF_SECONDS, so a crash on startup doesn't spin
+MIN_WORKER_LIFETIME_SECONDS = 5.0
+RESTART_BACKOFF_SECONDS = 1.0
+
+# Longest a worker may keep serving a principal another worker has invalidated
+PREFORK_AUTH_CACHE_TTL_SECONDS = 5.0
+
+
+def default_threads(workers: int) -> int:
+    return int(os.getenv("COQUI_TORCH_THREADS", "0")) or max(1, (os.cpu_count() or 1) // workers)
+
+
+def preload(main, threads: int, voices: list, fake_rtf: float = 0.0):
+    """Load the Coqui models in the parent, or mark the engine failed for every worker."""
+    from tts_service import TTSService
+    from voice_registry import resolve_voice
+
+    if fake_rtf:
+        from fake_coqui_tts import FakeCoquiTTS
+        main.tts_service = FakeCoquiTTS(rtf=fake_rtf)
+        print(f"✅ Using FakeCoquiTTS (rtf {fake_rtf:g}) instead of Coqui")
+        return
+
+    if os.getenv("COQUI_INFERENCE_MODE", "default") == "onnx":
+        raise SystemExit("prefork.py does not support COQUI_INFERENCE_MODE=onnx")
+    try:
+        # No idle unloading in the parent: the reaper thread wouldn't survive the fork
+        service = TTSService(threads=threads, idle_seconds=0)
+        for voice in voices:
+            model_name = resolve_voice(voice).model_name
+            service.models.get(model_name)
+            # Keep preloaded models shared; a worker reloading one would get a private copy
+            service.models.pinned.add(model_name)
+        main.tts_service = service
+        print(f"✅ Preloaded Coqui models: {', '.join(service.models.loaded())}")
+    except Exception as e:
+        print(f"❌ Failed to preload Coqui TTS: {e}")
+        main.coqui_engine.failed(e)
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def use_worker_cache(main, slot: int, workers: int):
+    """Give worker `slot` its own cache directory and 1/`workers` of the cache budget."""
+    from audio_cache import AudioCache
+
+    shared = main.audio_cache
+    if shared is None:
+        return
+    main.audio_cache = AudioCache(
+        cache_dir=os.path.join(shared.cache_dir, f"worker-{slot}"),
+        max_bytes=shared.max_bytes // workers,
+        max_age_seconds=shared.max_age_seconds,
+    )
+
+
+def run_worker(main, sock: socket.socket, threads: int, interop_threads: int, slot: int, workers: int):
+    """Body of a forked worker; never returns."""
+    import uvicorn
+    import database
+    import tts_service
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Pooled connections from the parent's schema sync must not be shared across processes
+    database.dispose_after_fork()
+    use_worker_cache(main, slot, workers)
+
+    if tts_service.torch is not None:
+        tts_service.configure_threads(threads, interop_threads)
+    if getattr(main.tts_service, "models", None) is not None:
+        registry = main.tts_service.models
+        registry.idle_seconds = tts_service.MODEL_IDLE_SECONDS or None
+        registry.start_reaper()
+
+    config = uvicorn.Config(main.app, log_level=os.getenv("LOG_LEVEL", "info"))
+    uvicorn.Server(config).run(sockets=[sock])
+    os._exit(0)
+
+
+def spawn(main, sock: socket.socket, threads: int, interop_threads: int, slot: int, workers: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(main, sock, threads, interop_threads, slot, workers)
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(1)
+    print(f"ℹ️  Started worker {pid} (slot {slot})")
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PREFORK_WORKERS", "2")))
+    parser.add_argument("--threads", type=int, default=0, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--interop-threads", type=int, default=int(os.getenv("COQUI_TORCH_INTEROP_THREADS", "1")))
+    parser.add_argument("--voices", nargs="*", default=[], help="extra Coqui voices to load before forking")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--fake-rtf", type=float, default=0.0,
+                        help="serve from FakeCoquiTTS with this real-time factor (benchmarks only)")
+    args = parser.parse_args()
+    threads = args.threads or default_threads(args.workers)
+
+    if os.getenv("INTERVIEW_WRITE_BEHIND") == "1":
+        print("⚠️  INTERVIEW_WRITE_BEHIND is not supported with prefork workers; saving synchronously")
+    os.environ["INTERVIEW_WRITE_BEHIND"] = "0"
+    auth_ttl = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    if args.workers > 1 and auth_ttl > PREFORK_AUTH_CACHE_TTL_SECONDS:
+        print(f"ℹ️  AUTH_CACHE_TTL_SECONDS capped at {PREFORK_AUTH_CACHE_TTL_SECONDS:g}s across prefork workers")
+        os.environ["AUTH_CACHE_TTL_SECONDS"] = str(PREFORK_AUTH_CACHE_TTL_SECONDS)
+
+    import uvicorn  # noqa: F401 - fail here rather than in every worker
+    import main as app_main  # Schema sync and module-level setup happen once, here
+
+    if not os.getenv("BCRYPT_ROUNDS"):
+        # Workers calibrating separately could each pick a different cost and
+        # keep rehashing each other's password hashes on login
+        os.environ["BCRYPT_ROUNDS"] = str(app_main.calibrate_bcrypt_cost())
+    if os.getenv("TTS_PRELOAD", "1") == "1":
+        preload(app_main, threads, args.voices, args.fake_rtf)
+    sock = bind(args.host, args.port)
+    print(f"🔄 Forking {args.workers} workers x {threads} torch threads on {args.host}:{args.port}")
+
+    # Everything allocated so far is shared with the workers; keep the GC off it
+    gc.collect()
+    gc.freeze()
+
+    def start(slot: int):
+        pid = spawn(app_main, sock, threads, args.interop_threads, slot, args.workers)
+        workers[pid] = (slot, time.monotonic())
+
+    workers = {}  # pid -> (slot, start time)
+    for slot in range(args.workers):
+        start(slot)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        worker = workers.pop(pid, None)
+        if worker is None or stopping:
+            continue
+        slot, started = worker
+        print(f"⚠️  Worker {pid} exited ({os.waitstatus_to_exitcode(status)}), restarting")
+        if time.monotonic() - started < MIN_WORKER_LIFETIME_SECONDS:
+            time.sleep(RESTART_BACKOFF_SECONDS)
+        start(slot)
+
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Optional
+
+# Innermost Python frames of a thread that is parked waiting for work or I/O.
+# Samples ending in one of these are dropped so profiles show work, not waiting.
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),  # concurrent.futures worker blocked on its queue
+    ("core.py", "_connection_worker_thread"),  # aiosqlite connection thread, likewise
+}
+
+
+class Profile:
+    """Samples taken while one request was in flight, as collapsed stacks."""
+
+    def __init__(self, profile_id: int, method: str, route: str, status: int,
+                 started_at: float, duration_ms: float, reason: str, stacks: Counter, interval_ms: float):
+        self.id = profile_id
+        self.method = method
+        self.route = route
+        self.status = status
+        self.started_at = started_at
+        self.duration_ms = duration_ms
+        self.reason = reason
+        self.stacks = stacks
+        self.interval_ms = interval_ms
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "route": self.route,
+            "status": self.status,
+            "started_at": round(self.started_at, 3),
+            "duration_ms": round(self.duration_ms, 1),
+            "reason": self.reason,
+            "samples": sum(self.stacks.values()),
+            "interval_ms": self.interval_ms,
+        }
+
+
+def collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's folded format (`root;...;leaf count`), read by flamegraph.pl, speedscope and inferno."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+class RequestProfiler:
+    """
+    Wall-clock sampling profiler for HTTP requests.
+
+    While enabled, a background thread snapshots every thread's Python stack
+    each `interval_ms` into a ring covering the last `window_seconds`. Requests
+    only record when they start and finish; one that took at least `slow_ms`,
+    or falls in the `sample_rate` fraction, keeps the samples taken during it
+    as a profile, and the last `keep` profiles are retained. The cost is the
+    sampler's periodic stack walk, independent of request rate, and nothing
+    at all while disabled.
+
+    Samples cover the whole process, so a profile taken under concurrent load
+    includes other requests' work. Coqui inference shows up only when it runs
+    in-process (COQUI_EXECUTOR=thread); with the process pool it is time spent
+    waiting on the worker.
+    """
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.0, slow_ms: float = 0.0,
+                 interval_ms: float = 10.0, keep: int = 50, window_seconds: float = 60.0):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.interval_ms = interval_ms
+        self.window_seconds = window_seconds
+        self.enabled = False
+
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max(1, int(window_seconds * 1000 / interval_ms)))  # (perf_counter, stacks)
+        self._profiles = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self._labels = {}  # code object -> frame label
+        self._stop = threading.Event()
+        self._thread = None
+        self.ticks = 0
+        self.sampling_seconds = 0.0
+
+        if enabled:
+            self.configure(enabled=True)
+
+    def configure(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None,
+                  slow_ms: Optional[float] = None):
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+        if enabled is None or enabled == self.enabled:
+            return
+        self.enabled = enabled
+        if enabled:
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), name="profiler-sampler", daemon=True)
+            self._thread.start()
+        else:
+            self._stop.set()
+            with self._lock:
+                self._samples.clear()
+
+    def _run(self, stop: threading.Event):
+        interval = self.interval_ms / 1000
+        while not stop.wait(interval):
+            started = time.perf_counter()
+            stacks = self._sample()
+            with self._lock:
+                self._samples.append((started, stacks))
+            self.ticks += 1
+            self.sampling_seconds += time.perf_counter() - started
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self) -> list:
+        """One collapsed stack per busy thread, rooted at the thread's name."""
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            code = frame.f_code
+            if ident == own or (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            stacks.append(";".join(reversed(labels)))
+        return stacks
+
+    def finish(self, started: float, method: str, route: str, status: int) -> Optional[Profile]:
+        """Called when a request that began at perf_counter() `started` completes; keeps its profile if chosen."""
+        ended = time.perf_counter()
+        duration_ms = (ended - started) * 1000
+        if self.slow_ms and duration_ms >= self.slow_ms:
+            reason = "slow"
+        elif self.sample_rate and random.random() < self.sample_rate:
+            reason = "sampled"
+        else:
+            return None
+
+        stacks = Counter()
+        with self._lock:
+            for taken, sample in reversed(self._samples):
+                if taken < started:
+                    break
+                if taken <= ended:
+                    stacks.update(sample)
+            profile = Profile(next(self._ids), method, route, status, time.time() - (ended - started),
+                              duration_ms, reason, stacks, self.interval_ms)
+            self._profiles.append(profile)
+        return profile
+
+    def profiles(self) -> list:
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._profiles)]
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    def merged(self, route: Optional[str] = None) -> Counter:
+        """Stacks of every retained profile (optionally one route's), for a single flame graph."""
+        stacks = Counter()
+        with self._lock:
+            for profile in self._profiles:
+                if route is None or profile.route == route:
+                    stacks.update(profile.stacks)
+        return stacks
+
+    def stats(self) -> dict:
+        with self._lock:
+            retained = len(self._profiles)
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "interval_ms": self.interval_ms,
+            "window_seconds": self.window_seconds,
+            "retained": retained,
+            "max_retained": self._profiles.maxlen,
+            "avg_sample_us": round(self.sampling_seconds / self.ticks * 1e6, 1) if self.ticks else 0.0,
+        }
+
+
+class ProfilingMiddleware:
+    """
+    Plain ASGI middleware handing each finished request to a RequestProfiler,
+    labelled like RequestMetricsMiddleware with the route template. When the
+    profiler is disabled this is a single attribute check per request.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.profiler.finish(started, scope["method"], route, status)
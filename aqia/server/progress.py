@@ -0,0 +1,147 @@
+import datetime
+from sqlalchemy import func, case, update
+from sqlalchemy.orm import Session
+import models
+
+
+def _aggregate(db: Session, user_id: str):
+    """(count, max, avg) over the user's scored interviews, in one query."""
+    return (
+        db.query(
+            func.count(models.InterviewSession.id),
+            func.max(models.InterviewSession.overall_score),
+            func.avg(models.InterviewSession.overall_score),
+        )
+        .filter(
+            models.InterviewSession.user_id == user_id,
+            models.InterviewSession.overall_score.isnot(None),
+        )
+        .one()
+    )
+
+
+def _totals(db: Session, user_id: str) -> dict:
+    """Rollup totals computed from the user's full history."""
+    total, highest, average = _aggregate(db, user_id)
+    return {"total_interviews": total or 0, "highest_score": highest, "rolling_average_score": float(average or 0)}
+
+
+def _insert_if_absent(db: Session):
+    """INSERT ... ON CONFLICT (user_id) DO NOTHING into the rollup table."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(models.ProgressTracking).on_conflict_do_nothing(index_elements=["user_id"])
+
+
+def _find(db: Session, user_id: str):
+    return db.query(models.ProgressTracking).filter(models.ProgressTracking.user_id == user_id).first()
+
+
+def backfill_progress(db: Session, user_id: str) -> bool:
+    """
+    Create a user's rollup row from their full history with one aggregate query.
+    Returns False, leaving the row alone, when a concurrent save created it first.
+    """
+    result = db.execute(_insert_if_absent(db).values(
+        user_id=user_id, most_improved_category=None, data_version=1, **_totals(db, user_id)
+    ))
+    return result.rowcount > 0
+
+
+def refresh_progress(db: Session, user_id: str):
+    """Recompute the rollup totals from scratch, e.g. after a bulk import."""
+    pt = models.ProgressTracking
+    if _find(db, user_id) is None and backfill_progress(db, user_id):
+        return
+    db.execute(
+        update(pt)
+        .where(pt.user_id == user_id)
+        .values(date_recorded=datetime.datetime.utcnow(), data_version=_next_version(), **_totals(db, user_id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _next_version():
+    return func.coalesce(models.ProgressTracking.data_version, 0) + 1
+
+
+def data_version(db: Session, user_id: str):
+    """(version, last change) of the user's interview data; (0, None) before their first save."""
+    pt = models.ProgressTracking
+    row = db.query(pt.data_version, pt.date_recorded).filter(pt.user_id == user_id).first()
+    return (row[0] or 0, row[1]) if row else (0, None)
+
+
+def get_progress(db: Session, user_id: str) -> models.ProgressTracking:
+    """
+    The user's rollup. History saved before rollups existed gets one computed on
+    the fly and not stored (version 0, like data_version()), so reads never write;
+    the user's next save creates the row.
+    """
+    progress = _find(db, user_id)
+    if progress is None:
+        progress = models.ProgressTracking(
+            user_id=user_id, most_improved_category=None, data_version=0, **_totals(db, user_id)
+        )
+    return progress
+
+
+def most_improved_category(db: Session, user_id: str, session_id: str, category_scores: dict):
+    """
+    Category whose score in this session rose the most over the user's earlier
+    average for it, or None if nothing improved.
+    """
+    if not category_scores:
+        return None
+    previous = dict(
+        db.query(models.AnalyticsScore.category, func.avg(models.AnalyticsScore.score))
+        .join(models.InterviewSession, models.AnalyticsScore.session_id == models.InterviewSession.id)
+        .filter(
+            models.InterviewSession.user_id == user_id,
+            models.AnalyticsScore.session_id != session_id,
+            models.AnalyticsScore.category.in_(list(category_scores)),
+        )
+        .group_by(models.AnalyticsScore.category)
+        .all()
+    )
+    best, best_gain = None, 0.0
+    for category, score in category_scores.items():
+        if category in previous and score - previous[category] > best_gain:
+            best, best_gain = category, score - previous[category]
+    return best
+
+
+def record_interview(db: Session, user_id: str, session_id: str, overall_score, category_scores: dict):
+    """
+    Fold a just-flushed interview into the user's rollup row, inside the caller's
+    transaction. Counters are updated in SQL so concurrent saves don't lose updates.
+    """
+    pt = models.ProgressTracking
+    values = {"date_recorded": datetime.datetime.utcnow(), "data_version": _next_version()}
+
+    # A new row's aggregate already includes the session we were just given
+    created = _find(db, user_id) is None and backfill_progress(db, user_id)
+    if not created and overall_score is not None:
+        values.update(
+            rolling_average_score=(pt.rolling_average_score * pt.total_interviews + overall_score)
+            / (pt.total_interviews + 1),
+            total_interviews=pt.total_interviews + 1,
+            highest_score=case(
+                (pt.highest_score.is_(None), overall_score),
+                (pt.highest_score < overall_score, overall_score),
+                else_=pt.highest_score,
+            ),
+        )
+
+    improved = most_improved_category(db, user_id, session_id, category_scores)
+    if improved:
+        values["most_improved_category"] = improved
+
+    db.execute(
+        update(pt)
+        .where(pt.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+
+class _Flight:
+    __slots__ = ("task", "waiters", "followers")
+
+    def __init__(self):
+        self.task = None
+        self.waiters = 0
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls.
+
+    The first `run(key, fn)` for a key starts `fn()`; calls with the same key
+    that arrive before it finishes wait for that result instead of starting
+    their own. A caller that gives up (e.g. its client disconnected) only
+    stops waiting; the shared call is cancelled once nobody is waiting for it.
+    Results are not kept after the call finishes, which is the audio cache's job.
+    """
+
+    def __init__(self):
+        self._flights = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0  # Work followers would otherwise have redone
+
+    async def run(self, key, fn):
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.ensure_future(self._lead(key, flight, fn))
+            self._flights[key] = flight
+            self.leaders += 1
+        else:
+            flight.followers += 1
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def in_flight(self, key) -> bool:
+        return key in self._flights
+
+    async def _lead(self, key, flight: _Flight, fn):
+        started = time.monotonic()
+        try:
+            return await fn()
+        finally:
+            self._forget(key, flight)
+            self.saved_seconds += (time.monotonic() - started) * flight.followers
+
+    def _forget(self, key, flight: _Flight):
+        # A cancelled flight may already have been replaced by a newer one
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
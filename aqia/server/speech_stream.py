@@ -0,0 +1,70 @@
+import asyncio
+import re
+from collections import deque
+
+# Sentence boundary: terminal punctuation (optionally followed by a closing quote/bracket) then whitespace
+_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+_CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+
+def split_sentences(text: str, min_chars: int = 20, max_chars: int = 300) -> list:
+    """
+    Split text into sentence-sized chunks for incremental synthesis.
+
+    Fragments shorter than `min_chars` are merged into their neighbour so we
+    don't pay per-call overhead for "Okay." on its own, and sentences longer than
+    `max_chars` are split again at clause punctuation.
+    """
+    chunks = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        part = ""
+        for clause in _CLAUSE_END.split(sentence):
+            if part and len(part) + len(clause) + 1 > max_chars:
+                chunks.append(part)
+                part = clause
+            else:
+                part = f"{part} {clause}".strip()
+        if part:
+            chunks.append(part)
+
+    merged = []
+    for chunk in chunks:
+        if merged and (len(merged[-1]) < min_chars or len(chunk) < min_chars):
+            merged[-1] = f"{merged[-1]} {chunk}"
+        else:
+            merged.append(chunk)
+    return merged
+
+
+async def pipelined(items: list, synthesize, lookahead: int = 1):
+    """
+    Yield `await synthesize(item)` for each item in order, keeping up to
+    `lookahead` later items synthesizing while the current one is being sent.
+    Outstanding work is cancelled if the consumer stops early (e.g. the client
+    disconnects).
+    """
+    pending = deque()
+    upcoming = iter(items)
+
+    def schedule_next():
+        item = next(upcoming, None)
+        if item is not None:
+            pending.append(asyncio.ensure_future(synthesize(item)))
+
+    try:
+        for _ in range(lookahead + 1):
+            schedule_next()
+        while pending:
+            result = await pending.popleft()
+            schedule_next()
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
@@ -0,0 +1,145 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import NamedTuple, Optional
+
+from fastapi.responses import FileResponse, Response
+
+from http_caching import accepted_encodings, etag_matches
+
+# Worth compressing; images, fonts and audio are already compressed
+COMPRESSIBLE = {".html", ".js", ".mjs", ".css", ".svg", ".json", ".map", ".txt", ".xml", ".webmanifest", ".wasm"}
+MIN_COMPRESS_BYTES = 1024
+
+# Vite names bundled files e.g. assets/index-BvX3c9aQ.js; a new build means a new name
+HASHED_ASSET = re.compile(r"(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[a-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred first when the client accepts both
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+class Variant(NamedTuple):
+    etag: str
+    body: Optional[bytes]  # held in memory, or None to stream `path` from disk
+    path: Optional[str]
+
+
+class StaticFile(NamedTuple):
+    media_type: str
+    cache_control: str
+    variants: dict  # content-coding ("identity", "gzip", "br") -> Variant
+
+
+def _etag(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+class StaticSite:
+    """
+    The built frontend, indexed once at startup.
+
+    Every file is hashed for a strong ETag. Compressible files get gzip and
+    (with the optional `brotli` package) br variants: `.gz`/`.br` files left
+    next to them by the build are used as they are, otherwise the file is
+    compressed here and kept in memory. index.html is held in memory as well;
+    other originals are streamed from disk. Requests are then answered from the
+    manifest without touching the filesystem for lookups. Hashed Vite assets
+    are cacheable forever; everything else revalidates with its ETag.
+
+    Files added to the directory after startup are not served.
+    """
+
+    def __init__(self, root: str, index: str = "index.html"):
+        self.root = root
+        self.index = index
+        self.files = {}  # URL path relative to root -> StaticFile
+        self.memory_bytes = 0
+        brotli = _brotli()
+
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                rel = os.path.relpath(path, root).replace(os.sep, "/")
+                base, ext = os.path.splitext(rel)
+                if ext in (".gz", ".br") and os.path.exists(os.path.join(root, base)):
+                    continue  # precompressed sibling, picked up with its original
+                self.files[rel] = self._load(rel, path, brotli)
+
+        if index not in self.files:
+            raise FileNotFoundError(os.path.join(root, index))
+
+    def _load(self, rel: str, path: str, brotli) -> StaticFile:
+        with open(path, "rb") as f:
+            data = f.read()
+        ext = os.path.splitext(rel)[1].lower()
+        media_type = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type in ("application/javascript", "image/svg+xml"):
+            media_type += "; charset=utf-8"
+
+        keep = rel == self.index
+        variants = {"identity": Variant(_etag(data), data if keep else None, path)}
+        if ext in COMPRESSIBLE and len(data) >= MIN_COMPRESS_BYTES:
+            compressors = {"gzip": lambda d: gzip.compress(d, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressors["br"] = lambda d: brotli.compress(d, quality=11)
+            for coding, suffix in ENCODINGS:
+                if os.path.exists(path + suffix):
+                    with open(path + suffix, "rb") as f:
+                        variants[coding] = Variant(_etag(f.read()), None, path + suffix)
+                elif coding in compressors:
+                    compressed = compressors[coding](data)
+                    if len(compressed) < len(data):
+                        variants[coding] = Variant(_etag(compressed), compressed, None)
+
+        for variant in variants.values():
+            if variant.body is not None:
+                self.memory_bytes += len(variant.body)
+        cache_control = IMMUTABLE if HASHED_ASSET.search(rel) else REVALIDATE
+        return StaticFile(media_type, cache_control, variants)
+
+    def lookup(self, url_path: str) -> Optional[StaticFile]:
+        """The file for `url_path`; unknown paths get index.html (client-side routes), except under assets/."""
+        rel = url_path.lstrip("/") or self.index
+        entry = self.files.get(rel)
+        if entry is None and not rel.startswith("assets/"):
+            entry = self.files[self.index]
+        return entry
+
+    def respond(self, url_path: str, headers) -> Response:
+        entry = self.lookup(url_path)
+        if entry is None:
+            return Response(status_code=404)
+
+        accepted = accepted_encodings(headers.get("accept-encoding"))
+        coding = next((c for c, _ in ENCODINGS if c in entry.variants and c in accepted), "identity")
+        variant = entry.variants[coding]
+        response_headers = {"ETag": variant.etag, "Cache-Control": entry.cache_control}
+        if len(entry.variants) > 1:
+            response_headers["Vary"] = "Accept-Encoding"
+
+        if etag_matches(headers.get("if-none-match"), variant.etag):
+            return Response(status_code=304, headers=response_headers)
+        if coding != "identity":
+            response_headers["Content-Encoding"] = coding
+        if variant.body is not None:
+            return Response(content=variant.body, media_type=entry.media_type, headers=response_headers)
+        return FileResponse(variant.path, media_type=entry.media_type, headers=response_headers)
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self.files),
+            "compressed": sum(len(entry.variants) > 1 for entry in self.files.values()),
+            "memory_bytes": self.memory_bytes,
+        }
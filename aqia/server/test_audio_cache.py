@@ -0,0 +1,82 @@
+import os
+from audio_cache import AudioCache
+
+def test_key_normalizes_whitespace_but_not_voice():
+    a = AudioCache.make_key("coqui", "vits", None, "Hello   there\n")
+    b = AudioCache.make_key("coqui", "vits", None, " Hello there")
+    c = AudioCache.make_key("google", "mp3", "en-US-Neural2-F", "Hello there")
+    d = AudioCache.make_key("google", "mp3", "en-US-Neural2-C", "Hello there")
+    assert a == b
+    assert c != d
+
+def test_hit_miss_and_atomic_put(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1024)
+    key = AudioCache.make_key("coqui", "vits", None, "hi")
+    assert cache.get(key, "wav") is None
+
+    path = cache.put_bytes(key, "wav", b"RIFF1234")
+    assert cache.get(key, "wav") == path
+    with open(path, "rb") as f:
+        assert f.read() == b"RIFF1234"
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+def test_lru_eviction_respects_recent_use(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=20)
+    cache.put_bytes("a", "wav", b"x" * 8)
+    cache.put_bytes("b", "wav", b"x" * 8)
+    cache.get("a", "wav")  # "b" is now least recently used
+    cache.put_bytes("c", "wav", b"x" * 8)
+
+    assert cache.get("b", "wav") is None
+    assert cache.get("a", "wav") is not None
+    assert cache.get("c", "wav") is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_index_is_rebuilt_on_restart(tmp_path):
+    AudioCache(str(tmp_path), max_bytes=1024).put_bytes("k", "mp3", b"ID3")
+    assert AudioCache(str(tmp_path), max_bytes=1024).get("k", "mp3") is not None
+
+def test_entries_written_by_another_process_are_picked_up(tmp_path):
+    ours = AudioCache(str(tmp_path), max_bytes=1024)
+    theirs = AudioCache(str(tmp_path), max_bytes=1024)
+    key = AudioCache.make_key("coqui", "vits", None, "shared")
+    path = theirs.put_bytes(key, "wav", b"RIFF1234")
+    assert ours.get(key, "wav") == path
+    assert ours.stats()["bytes"] == 8
+
+def test_picked_up_entries_count_against_the_budget(tmp_path):
+    ours = AudioCache(str(tmp_path), max_bytes=20)
+    ours.put_bytes("a", "wav", b"x" * 8)
+    ours.put_bytes("b", "wav", b"x" * 8)
+    AudioCache(str(tmp_path), max_bytes=1024).put_bytes("c", "wav", b"x" * 8)
+
+    assert ours.get("c", "wav") is not None
+    assert ours.stats()["bytes"] <= 20
+    assert ours.get("a", "wav") is None  # least recently used makes room
+    assert ours.stats()["evictions"] == 1
+
+def test_file_removed_after_lookup_is_a_miss(tmp_path, monkeypatch):
+    cache = AudioCache(str(tmp_path), max_bytes=1024)
+    key = AudioCache.make_key("coqui", "vits", None, "hi")
+    path = cache.put_bytes(key, "wav", b"RIFF1234")
+    assert cache.get_bytes(key, "wav") == b"RIFF1234"
+
+    # Evicted by a concurrent put between get() handing out the path and the read
+    get = cache.get
+    def get_then_evict(*args):
+        found = get(*args)
+        os.remove(path)
+        return found
+    monkeypatch.setattr(cache, "get", get_then_evict)
+
+    assert cache.get_bytes(key, "wav") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (0, 1, 1)
+
+def test_subdirectories_are_not_indexed(tmp_path):
+    (tmp_path / "worker-0").mkdir()
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    assert cache.stats()["entries"] == 0
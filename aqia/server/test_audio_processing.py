@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from audio_processing import (
+    OutputSpec, resample, trim_silence, normalize_loudness, render, supported_formats, target_sample_rate
+)
+
+def tone(seconds=0.5, rate=22050, amplitude=0.1):
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def test_resample_preserves_duration():
+    wav = tone(rate=22050)
+    out = resample(wav, 22050, 16000)
+    assert out.dtype == np.float32
+    assert abs(out.size - 8000) <= 1
+
+def test_trim_silence_keeps_only_a_short_pad():
+    silence = np.zeros(22050, dtype=np.float32)
+    wav = np.concatenate([silence, tone(), silence])
+    trimmed = trim_silence(wav, 22050, pad_ms=40)
+    assert trimmed.size < tone().size + 2 * int(22050 * 0.05)
+
+def test_normalize_never_exceeds_peak_limit():
+    loud = normalize_loudness(tone(amplitude=0.01), target_dbfs=0.0, peak_dbfs=-1.0)
+    assert np.max(np.abs(loud)) <= 10 ** (-1 / 20) + 1e-6
+
+def test_opus_rounds_up_to_a_supported_rate():
+    assert target_sample_rate(OutputSpec(format="opus"), 22050) == 24000
+    assert target_sample_rate(OutputSpec(format="wav", sample_rate=16000), 22050) == 16000
+
+def test_render_wav_header_reflects_requested_rate():
+    data = render(tone(), 22050, OutputSpec(format="wav", sample_rate=16000))
+    assert data[:4] == b"RIFF"
+    assert int.from_bytes(data[24:28], "little") == 16000
+
+@pytest.mark.skipif("opus" not in supported_formats(), reason="libsndfile without Opus")
+def test_opus_is_much_smaller_than_wav():
+    wav_bytes = render(tone(seconds=2.0), 22050, OutputSpec(format="wav"))
+    opus_bytes = render(tone(seconds=2.0), 22050, OutputSpec(format="opus", bitrate_kbps=32))
+    assert opus_bytes[:4] == b"OggS"
+    assert len(opus_bytes) < len(wav_bytes) / 4
@@ -0,0 +1,20 @@
+import io
+import struct
+import wave
+import numpy as np
+from audio_utils import encode_wav, wav_header
+
+def test_encode_wav_round_trips_through_wave_module():
+    wav = np.array([0.0, 0.5, -0.5, 1.5, -1.5], dtype=np.float32)
+    with wave.open(io.BytesIO(encode_wav(wav, 22050))) as f:
+        assert f.getframerate() == 22050
+        assert f.getnchannels() == 1 and f.getsampwidth() == 2
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+    assert samples.tolist() == [0, 16383, -16383, 32767, -32767]
+
+def test_stream_header_has_open_ended_sizes():
+    header = wav_header(22050)
+    assert len(header) == 44
+    assert header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+    assert struct.unpack("<I", header[24:28])[0] == 22050
+    assert struct.unpack("<I", header[40:44])[0] == 0xFFFFFFFF
@@ -0,0 +1,37 @@
+import datetime
+import gzip
+import json
+
+from http_caching import etag_matches, http_date, json_response, not_modified, version_etag
+
+def test_version_etag_is_weak_and_changes_with_its_parts():
+    etag = version_etag("u1", 3, "dashboard")
+    assert etag.startswith('W/"')
+    assert etag == version_etag("u1", 3, "dashboard")
+    assert etag != version_etag("u1", 4, "dashboard")
+    assert etag != version_etag("u2", 3, "dashboard")  # same version, different user
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches(f'"other", {etag}', etag)
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    changed = datetime.datetime(2025, 3, 1, 12, 0, 0, 500000)
+    etag = version_etag("u1", 1)
+    since = http_date(changed)
+    assert since == "Sat, 01 Mar 2025 12:00:00 GMT"
+    assert not_modified({"if-modified-since": since}, etag, changed)
+    assert not not_modified({"if-modified-since": "Sat, 01 Mar 2025 11:59:59 GMT"}, etag, changed)
+    assert not not_modified({"if-none-match": '"stale"', "if-modified-since": since}, etag, changed)
+    assert not not_modified({"if-modified-since": "garbage"}, etag, changed)
+    assert not not_modified({}, etag, changed)
+
+def test_json_response_is_compact_and_gzips_large_bodies():
+    small = json_response({"a": [1, 2]}, {"accept-encoding": "gzip"}, {"Vary": "Authorization"})
+    assert small.body == b'{"a":[1,2]}'
+    assert "content-encoding" not in small.headers
+
+    payload = [{"id": str(i), "job_category": "Backend", "overall_score": i} for i in range(100)]
+    large = json_response(payload, {"accept-encoding": "gzip, br"}, {"Vary": "Authorization"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["vary"] == "Authorization, Accept-Encoding"
+    assert json.loads(gzip.decompress(large.body)) == payload
+    assert "content-encoding" not in json_response(payload, {}).headers
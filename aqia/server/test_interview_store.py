@@ -0,0 +1,49 @@
+import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+import models
+import progress
+import interview_store
+
+class Question(BaseModel):
+    question_asked: str
+    user_answer: Optional[str] = None
+    ai_feedback: Optional[str] = None
+    score: Optional[int] = None
+
+class Interview(BaseModel):
+    job_category: str = "Backend"
+    overall_score: Optional[int] = None
+    questions: List[Question] = []
+    analytics_scores: Optional[dict] = None
+    started_at: Optional[datetime.datetime] = None
+
+def test_save_interview_writes_children_and_rollup(db):
+    interview = Interview(
+        overall_score=70,
+        questions=[Question(question_asked="Q1"), Question(question_asked="Q2", score=5)],
+        analytics_scores={"Communication": 80, "Technical": None},
+    )
+    session_id = interview_store.save_interview(db, "u1", interview)
+    db.commit()
+
+    assert db.query(models.QuestionHistory).filter_by(session_id=session_id).count() == 2
+    assert [a.category for a in db.query(models.AnalyticsScore).filter_by(session_id=session_id)] == ["Communication"]
+    assert progress.get_progress(db, "u1").total_interviews == 1
+
+def test_bulk_save_keeps_timestamps_and_refreshes_rollup(db):
+    interview_store.save_interview(db, "u1", Interview(overall_score=50))
+    db.commit()
+
+    old = datetime.datetime(2025, 1, 2, 3, 4, 5)
+    ids = interview_store.save_interviews(db, "u1", [
+        Interview(overall_score=90, started_at=old, questions=[Question(question_asked="Q")]),
+        Interview(overall_score=None),
+    ])
+    db.commit()
+
+    assert len(ids) == 2
+    assert db.get(models.InterviewSession, ids[0]).started_at == old
+    rollup = progress.get_progress(db, "u1")
+    db.refresh(rollup)
+    assert (rollup.total_interviews, rollup.highest_score) == (2, 90)
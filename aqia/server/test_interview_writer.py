@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from pydantic import BaseModel
+from typing import List, Optional
+import models
+import progress
+from interview_writer import InterviewWriter, WriterBusyError
+
+class Interview(BaseModel):
+    job_category: str = "Backend"
+    overall_score: Optional[int] = None
+    questions: List[dict] = []
+    analytics_scores: Optional[dict] = None
+
+def test_groups_saves_into_shared_transactions(session_factory):
+    writer = InterviewWriter(session_factory, max_batch=10, max_wait_ms=200)
+    ids = [writer.submit("u1", Interview(overall_score=score)) for score in (40, 60, 80)]
+    writer.close()
+
+    with session_factory() as db:
+        assert {s.id for s in db.query(models.InterviewSession)} == set(ids)
+        assert progress.get_progress(db, "u1").total_interviews == 3
+    stats = writer.stats()
+    assert stats["written"] == 3 and stats["queued"] == 0
+    assert stats["transactions"] < 3
+
+def test_idempotency_key_deduplicates_queued_saves(session_factory):
+    writer = InterviewWriter(session_factory, max_wait_ms=200)
+    first = writer.submit("u1", Interview(), idempotency_key="k1")
+    assert writer.submit("u1", Interview(), idempotency_key="k1") == first
+    writer.close()
+
+    with session_factory() as db:
+        assert db.query(models.InterviewSession).count() == 1
+    assert writer.stats()["deduplicated"] == 1
+
+def test_bad_save_does_not_sink_its_group(session_factory):
+    writer = InterviewWriter(session_factory, max_batch=10, max_wait_ms=200)
+    good = writer.submit("u1", Interview(overall_score=70))
+    writer.submit("u1", Interview.model_construct(job_category=None, questions=[]))  # NOT NULL violation
+    writer.close()
+
+    with session_factory() as db:
+        assert [s.id for s in db.query(models.InterviewSession)] == [good]
+    assert writer.stats()["failed"] == 1
+
+def test_wait_for_user_sees_own_writes(session_factory):
+    writer = InterviewWriter(session_factory, max_wait_ms=100)
+
+    async def scenario():
+        session_id = writer.submit("u1", Interview())
+        await writer.wait_for_user("u1")
+        with session_factory() as db:
+            return db.get(models.InterviewSession, session_id)
+
+    assert asyncio.run(scenario()) is not None
+    writer.close()
+
+def test_rejects_when_queue_is_full(session_factory):
+    writer = InterviewWriter(session_factory, max_wait_ms=500, max_queue=1)
+    writer.submit("u1", Interview())
+    with pytest.raises(WriterBusyError) as exc:
+        writer.submit("u1", Interview())
+    assert exc.value.retry_after >= 1
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit("u1", Interview())
+
+def test_key_already_stored_resolves_to_the_stored_interview(session_factory):
+    import interview_store
+    with session_factory() as db:
+        stored = interview_store.save_interview(db, "u1", Interview(), idempotency_key="k1")
+        db.commit()
+
+    writer = InterviewWriter(session_factory, max_wait_ms=10)
+    acknowledged = writer.submit("u1", Interview(), idempotency_key="k1")
+    future = writer._pending[acknowledged].future
+    writer.close()
+
+    assert future.result() == stored
+    assert writer.stats()["failed"] == 0
+    with session_factory() as db:
+        assert db.query(models.InterviewSession).count() == 1
@@ -1,5 +1,7 @@
+import pytest
 from fastapi.testclient import TestClient
 from main import app
+import models
 import os
 from unittest.mock import MagicMock
 
@@ -33,3 +35,135 @@ def test_google_tts_invalid_input():
     """Verify validation"""
     response = client.post("/google-tts", json={}) # Missing text
     assert response.status_code == 422
+
+def test_readiness_reports_each_engine():
+    """/api/ready answers immediately, even while the engines are still loading"""
+    response = client.get("/api/ready")
+    assert response.status_code in [200, 503]
+    assert set(response.json()["engines"]) == {"google", "coqui"}
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_rejects_empty_text(monkeypatch, stream):
+    import main
+    monkeypatch.setattr(main, "require_engine", lambda state, detail: None)
+    monkeypatch.setattr(main, "ensure_engines_started", lambda: None)
+    for path in ("/tts", "/google-tts"):
+        response = client.post(path, json={"text": "   ", "stream": stream})
+        assert response.status_code == 400, path
+        assert response.json()["detail"] == "Text must not be empty"
+
+def test_streamed_sentences_are_cached(monkeypatch, tmp_path):
+    import asyncio
+    import main
+    from audio_cache import AudioCache
+    from audio_processing import OutputSpec
+    from audio_utils import encode_wav
+    import numpy as np
+
+    calls = []
+
+    async def synthesize_coqui(text, spec, voice=None):
+        calls.append(text)
+        return encode_wav(np.full(100, 0.1, dtype=np.float32), 16000)
+
+    monkeypatch.setattr(main, "synthesize_coqui", synthesize_coqui)
+    monkeypatch.setattr(main, "audio_cache", AudioCache(str(tmp_path), max_bytes=1 << 20))
+    sentences = ["The first sentence is here.", "And this is the second one."]
+
+    async def stream():
+        return b"".join([chunk async for chunk in main.coqui_stream_chunks(sentences, OutputSpec())])
+
+    first = asyncio.run(stream())
+    assert calls == sentences
+    assert first[:4] == b"RIFF" and len(first) == 44 + 2 * 200
+    assert asyncio.run(stream()) == first
+    assert calls == sentences  # second stream came from the cache
+
+@pytest.fixture
+def api(tmp_path):
+    """The app on a scratch database shared with a sync session factory, signed in as "u1"."""
+    import main
+    from database import async_database_url, get_async_db
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from user_cache import UserPrincipal
+
+    url = f"sqlite:///{tmp_path / 'api.db'}"
+    engine = create_engine(url)
+    models.Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(models.User(id="u1", email="a@b.co", password_hash="x"))
+        db.commit()
+    async_sessions = async_sessionmaker(create_async_engine(async_database_url(url)), expire_on_commit=False)
+
+    async def get_db():
+        async with async_sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = get_db
+    app.dependency_overrides[main.get_current_user] = lambda: UserPrincipal(id="u1", email="a@b.co")
+    yield factory
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+def saved_interviews(factory):
+    with factory() as db:
+        return [s.id for s in db.query(models.InterviewSession)]
+
+def test_save_interview_is_written_before_200_and_replays_by_key(api, monkeypatch):
+    import main
+    monkeypatch.setattr(main, "interview_writer", None)
+    first = client.post("/api/interviews", json={"job_category": "Backend"}, headers={"Idempotency-Key": "k1"})
+    assert first.status_code == 200
+    assert saved_interviews(api) == [first.json()["id"]]
+
+    replay = client.post("/api/interviews", json={"job_category": "Backend"}, headers={"Idempotency-Key": "k1"})
+    assert replay.status_code == 200
+    assert replay.json()["id"] == first.json()["id"]
+    assert saved_interviews(api) == [first.json()["id"]]
+
+def test_write_behind_acknowledges_with_202(api, monkeypatch):
+    import main
+    from interview_writer import InterviewWriter
+    writer = InterviewWriter(api, max_wait_ms=200)
+    monkeypatch.setattr(main, "interview_writer", writer)
+    first = client.post("/api/interviews", json={"job_category": "Backend"}, headers={"Idempotency-Key": "k1"})
+    assert first.status_code == 202
+    replay = client.post("/api/interviews", json={"job_category": "Backend"}, headers={"Idempotency-Key": "k1"})
+    assert replay.json()["id"] == first.json()["id"]  # still queued: answered from the writer
+
+    writer.close()
+    assert saved_interviews(api) == [first.json()["id"]]
+    replay = client.post("/api/interviews", json={"job_category": "Backend"}, headers={"Idempotency-Key": "k1"})
+    assert (replay.status_code, replay.json()["id"]) == (200, first.json()["id"])  # now from the database
+
+def test_full_write_queue_returns_503(api, monkeypatch):
+    import main
+    from interview_writer import InterviewWriter
+    writer = InterviewWriter(api, max_wait_ms=500, max_queue=1)
+    monkeypatch.setattr(main, "interview_writer", writer)
+    assert client.post("/api/interviews", json={"job_category": "Backend"}).status_code == 202
+    busy = client.post("/api/interviews", json={"job_category": "Backend"})
+    writer.close()
+    assert busy.status_code == 503
+    assert int(busy.headers["retry-after"]) >= 1
+
+def test_batch_import_reports_each_item(api):
+    response = client.post("/api/interviews/batch", json=[
+        {"job_category": "Backend", "overall_score": 70},
+        {"overall_score": "not a score"},
+        {"job_category": "Frontend", "started_at": "2024-01-02T03:04:05"},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [r["status"] for r in body["results"]] == ["created", "error", "created"]
+    assert sorted(saved_interviews(api)) == sorted(r["id"] for r in body["results"] if "id" in r)
+
+def test_async_database_url_maps_known_drivers_only():
+    from database import async_database_url
+    assert async_database_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+    assert async_database_url("postgresql+psycopg2://u@h/db") == "postgresql+asyncpg://u@h/db"
+    assert async_database_url("mysql://u@h/db") is None  # sync-only: get_async_db() reports it
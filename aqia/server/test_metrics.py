@@ -0,0 +1,53 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import MetricsRegistry, RequestMetricsMiddleware
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("engine",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, "coqui")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{engine="coqui",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{engine="coqui",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{engine="coqui",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{engine="coqui"} 4.05' in lines
+    assert 'latency_seconds_count{engine="coqui"} 4' in lines
+
+def test_counter_and_gauge():
+    registry = MetricsRegistry()
+    audio = registry.counter("audio_seconds_total", "Audio.", ("engine",))
+    audio.inc("google", amount=1.5)
+    audio.inc("google", amount=2)
+    depths = {"coqui": 3, "google": None}
+    registry.gauge("queue_depth", "Depth.", lambda: depths, ("queue",))
+
+    lines = registry.render().splitlines()
+    assert 'audio_seconds_total{engine="google"} 3.5' in lines
+    assert 'queue_depth{queue="coqui"} 3' in lines
+    # Queues that don't exist in this configuration are left out
+    assert not any(line.startswith('queue_depth{queue="google"}') for line in lines)
+
+def test_middleware_labels_requests_by_route_template():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("method", "route", "status"))
+    duration = registry.histogram("request_seconds", "Latency.", ("method", "route"))
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware, requests=requests, duration=duration)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+
+    lines = registry.render().splitlines()
+    assert 'requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in lines
+    assert 'requests_total{method="GET",route="unmatched",status="404"} 1' in lines
+    assert 'request_seconds_count{method="GET",route="/items/{item_id}"} 2' in lines
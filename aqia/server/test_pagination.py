@@ -0,0 +1,17 @@
+import datetime
+import pytest
+from pagination import encode_cursor, decode_cursor, InvalidCursorError
+
+def test_cursor_round_trip():
+    started_at = datetime.datetime(2026, 3, 1, 12, 30, 5, 123456)
+    cursor = encode_cursor(started_at, "abc-123")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (started_at, "abc-123")
+
+def test_missing_cursor_means_first_page():
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
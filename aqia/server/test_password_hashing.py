@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import pytest
+from auth_utils import get_password_hash, hash_rounds, calibrate_bcrypt_rounds
+from password_hashing import PasswordHasher, HasherBusyError
+
+def test_hash_rounds_reads_the_work_factor():
+    assert hash_rounds(get_password_hash("pw", rounds=4)) == 4
+    assert hash_rounds("not-a-bcrypt-hash") is None
+
+def test_calibration_stays_within_bounds():
+    assert calibrate_bcrypt_rounds(target_ms=0, min_rounds=4, max_rounds=6) == 4
+    assert calibrate_bcrypt_rounds(target_ms=60_000, min_rounds=4, max_rounds=6) == 6
+
+def test_hashes_and_verifies_off_the_event_loop():
+    hasher = PasswordHasher(rounds=4)
+
+    async def scenario():
+        hashed = await hasher.hash("secret")
+        return hashed, await hasher.verify("secret", hashed), await hasher.verify("wrong", hashed)
+
+    hashed, ok, bad = asyncio.run(scenario())
+    assert hash_rounds(hashed) == 4 and ok and not bad
+    stats = hasher.stats()
+    assert stats["hash_count"] == 1 and stats["verify_count"] == 2
+    hasher.shutdown()
+
+def test_rehashes_only_outdated_hashes():
+    hasher = PasswordHasher(rounds=5)
+    current = get_password_hash("pw", rounds=5)
+    outdated = get_password_hash("pw", rounds=4)
+
+    async def scenario():
+        return (await hasher.rehash_if_outdated("pw", current),
+                await hasher.rehash_if_outdated("pw", outdated))
+
+    unchanged, upgraded = asyncio.run(scenario())
+    assert unchanged is None
+    assert hash_rounds(upgraded) == 5
+    assert hasher.stats()["rehashed"] == 1
+    hasher.shutdown()
+
+def test_stronger_stored_hashes_are_left_alone():
+    hasher = PasswordHasher(rounds=4)
+    stronger = get_password_hash("pw", rounds=5)
+    assert not hasher.needs_rehash(stronger)
+    assert asyncio.run(hasher.rehash_if_outdated("pw", stronger)) is None
+    assert hasher.stats()["rehashed"] == 0
+    hasher.shutdown()
+
+def test_calibration_never_goes_below_the_floor(monkeypatch):
+    import password_hashing
+    seen = []
+    monkeypatch.setattr(password_hashing, "calibrate_bcrypt_rounds",
+                        lambda target_ms, min_rounds, max_rounds: seen.append(min_rounds) or min_rounds)
+    hasher = PasswordHasher(rounds=4)
+    assert hasher.calibrate(target_ms=1, min_rounds=10) == password_hashing.MIN_CALIBRATED_ROUNDS
+    assert seen == [password_hashing.MIN_CALIBRATED_ROUNDS]
+    hasher.shutdown()
+
+def test_rejects_when_all_slots_are_taken():
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(hasher._run("hash", release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HasherBusyError) as exc:
+            await hasher.hash("pw")
+        assert exc.value.retry_after >= 1
+        release.set()
+        await running
+
+    asyncio.run(scenario())
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
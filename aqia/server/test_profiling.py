@@ -0,0 +1,63 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from profiling import ProfilingMiddleware, RequestProfiler, collapsed
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def test_slow_requests_keep_the_samples_taken_while_they_ran():
+    profiler = RequestProfiler(enabled=True, slow_ms=50, interval_ms=2)
+    try:
+        started = time.perf_counter()
+        spin(0.1)
+        profile = profiler.finish(started, "GET", "/api/dashboard", 200)
+        assert profiler.finish(time.perf_counter(), "GET", "/api/dashboard", 200) is None  # fast, not sampled
+    finally:
+        profiler.configure(enabled=False)
+
+    assert profile.reason == "slow"
+    assert profiler.profiles() == [profile.summary()]
+    folded = collapsed(profile.stacks)
+    assert any(line.startswith("MainThread;") and "spin (test_profiling.py" in line for line in folded.splitlines())
+    assert profiler.get(profile.id) is profile
+    assert profiler.merged("/tts") == {}
+
+def test_ring_keeps_the_most_recent_profiles():
+    profiler = RequestProfiler(sample_rate=1.0, keep=2)
+    for route in ("/a", "/b", "/c"):
+        profiler.finish(time.perf_counter(), "GET", route, 200)
+    assert [p["route"] for p in profiler.profiles()] == ["/c", "/b"]
+
+def test_middleware_profiles_slow_routes():
+    profiler = RequestProfiler(slow_ms=30, interval_ms=2)
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    @app.get("/slow/{n}")
+    def slow(n: int):
+        spin(0.06)
+        return {"n": n}
+
+    @app.get("/fast")
+    def fast():
+        return {}
+
+    client = TestClient(app)
+    client.get("/slow/1")
+    assert profiler.profiles() == []  # disabled: nothing recorded
+
+    profiler.configure(enabled=True)
+    try:
+        client.get("/fast")
+        client.get("/slow/2")
+    finally:
+        profiler.configure(enabled=False)
+
+    [profile] = profiler.profiles()
+    assert (profile["route"], profile["status"], profile["reason"]) == ("/slow/{n}", 200, "slow")
+    assert any("slow (test_profiling.py" in stack for stack in profiler.merged("/slow/{n}"))
@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+import models
+import progress
+
+def save(db, score, categories=None):
+    session = models.InterviewSession(user_id="u1", job_category="Backend", overall_score=score)
+    db.add(session)
+    db.flush()
+    for category, value in (categories or {}).items():
+        db.add(models.AnalyticsScore(session_id=session.id, category=category, score=value))
+    progress.record_interview(db, "u1", session.id, score, categories or {})
+    db.commit()
+
+def test_rollup_tracks_count_max_and_average(db):
+    for score in (60, 90, None, 75):
+        save(db, score)
+    rollup = progress.get_progress(db, "u1")
+    db.refresh(rollup)
+    assert rollup.total_interviews == 3
+    assert rollup.highest_score == 90
+    assert rollup.rolling_average_score == pytest.approx(75.0)
+
+def test_backfill_covers_history_saved_before_rollups(db):
+    for score in (40, 80):
+        db.add(models.InterviewSession(user_id="u1", job_category="Backend", overall_score=score))
+    db.commit()
+    rollup = progress.get_progress(db, "u1")
+    assert (rollup.total_interviews, rollup.highest_score, rollup.rolling_average_score) == (2, 80, 60.0)
+    assert db.query(models.ProgressTracking).count() == 0  # computed for the read, not stored
+    save(db, 100)
+    rollup = progress.get_progress(db, "u1")
+    assert (rollup.total_interviews, rollup.highest_score) == (3, 100)
+
+def test_save_racing_a_backfill_still_counts(db):
+    save(db, 60)
+    assert progress.backfill_progress(db, "u1") is False  # the row exists: insert skipped
+    save(db, 80)
+    assert db.query(models.ProgressTracking).count() == 1
+    assert progress.get_progress(db, "u1").total_interviews == 2
+
+def test_most_improved_category(db):
+    save(db, 50, {"Communication": 50, "Technical": 70})
+    save(db, 70, {"Communication": 80, "Technical": 72})
+    rollup = progress.get_progress(db, "u1")
+    db.refresh(rollup)
+    assert rollup.most_improved_category == "Communication"
+
+def test_data_version_moves_with_every_write(db):
+    assert progress.data_version(db, "u1") == (0, None)
+    save(db, 70)
+    first, changed = progress.data_version(db, "u1")
+    save(db, None)  # unscored interviews change the history too
+    assert progress.data_version(db, "u1")[0] > first
+    progress.refresh_progress(db, "u1")
+    db.commit()
+    assert progress.data_version(db, "u1")[0] > first + 1
+    assert changed is not None
+
+def test_sync_schema_makes_rollups_unique(tmp_path):
+    from database import sync_schema
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    old, new = datetime.datetime(2024, 1, 1), datetime.datetime(2024, 6, 1)
+    with engine.begin() as conn:
+        # The index as it was before rollups were unique, and the duplicates it allowed
+        conn.execute(text("DROP INDEX ix_progress_tracking_user_id"))
+        conn.execute(text("CREATE INDEX ix_progress_tracking_user_id ON progress_tracking (user_id)"))
+        for row_id, recorded, total in (("a", old, 1), ("b", new, 2), ("c", old, 1)):
+            conn.execute(models.ProgressTracking.__table__.insert().values(
+                id=row_id, user_id="u1", date_recorded=recorded, total_interviews=total, rolling_average_score=50.0,
+            ))
+
+    sync_schema(models.Base.metadata, bind=engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, total_interviews FROM progress_tracking")).all()
+    assert rows == [("b", 2)]  # the most recently updated row is kept
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("progress_tracking")}
+    assert indexes["ix_progress_tracking_user_id"]["unique"]
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from single_flight import SingleFlight
+
+def counting(result=b"audio", delay=0.05, error=None):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+
+    fn.calls = calls
+    return fn
+
+def test_concurrent_duplicates_share_one_call():
+    flights = SingleFlight()
+    fn = counting()
+
+    async def scenario():
+        return await asyncio.gather(*(flights.run("k", fn) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [b"audio"] * 5
+    assert len(fn.calls) == 1
+    stats = flights.stats()
+    assert (stats["leaders"], stats["coalesced"], stats["in_flight"]) == (1, 4, 0)
+    assert stats["saved_seconds"] > 0
+
+def test_different_keys_and_later_calls_run_separately():
+    flights = SingleFlight()
+    fn = counting(delay=0)
+
+    async def scenario():
+        await asyncio.gather(flights.run("a", fn), flights.run("b", fn))
+        await flights.run("a", fn)
+
+    asyncio.run(scenario())
+    assert len(fn.calls) == 3 and flights.coalesced == 0
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+    fn = counting(error=RuntimeError("model failed"))
+
+    async def scenario():
+        return await asyncio.gather(*(flights.run("k", fn) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(fn.calls) == 1
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flights = SingleFlight()
+    fn = counting(delay=0.05)
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.run("k", fn))
+        follower = asyncio.ensure_future(flights.run("k", fn))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == b"audio"
+
+def test_call_is_cancelled_once_nobody_waits():
+    flights = SingleFlight()
+    fn = counting(delay=1.0)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(flights.run("k", fn))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not flights.in_flight("k")
+        return await flights.run("k", counting(delay=0))
+
+    assert asyncio.run(scenario()) == b"audio"
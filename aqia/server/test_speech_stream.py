@@ -0,0 +1,34 @@
+import asyncio
+from speech_stream import split_sentences, pipelined
+
+def test_split_sentences_merges_short_fragments():
+    text = "Okay. Tell me about a project you are proud of! What was your role in it?"
+    assert split_sentences(text) == [
+        "Okay. Tell me about a project you are proud of!",
+        "What was your role in it?",
+    ]
+
+def test_split_sentences_breaks_long_sentences_at_clauses():
+    text = ", ".join(["this clause is about forty characters long"] * 10) + "."
+    chunks = split_sentences(text, max_chars=100)
+    assert len(chunks) > 1
+    assert all(len(c) <= 100 for c in chunks)
+
+def test_pipelined_keeps_order_and_overlaps_next_item():
+    started = []
+
+    async def synthesize(item):
+        started.append(item)
+        await asyncio.sleep(0.01 if item == 0 else 0)
+        return item * 10
+
+    async def scenario():
+        results = []
+        async for result in pipelined([0, 1, 2], synthesize):
+            if not results:
+                # The next sentence was already in flight before the first was sent
+                assert 1 in started
+            results.append(result)
+        return results
+
+    assert asyncio.run(scenario()) == [0, 10, 20]
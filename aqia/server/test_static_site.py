@@ -0,0 +1,69 @@
+import gzip
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from http_caching import accepted_encodings
+from static_site import IMMUTABLE, REVALIDATE, StaticSite
+
+INDEX = "<!doctype html><html><body>" + "<div>AQIA</div>" * 200 + "</body></html>"
+SCRIPT = "console.log('hello');\n" * 200
+STYLE = "body { margin: 0 }\n" * 200
+
+def build(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text(INDEX)
+    (tmp_path / "assets" / "index-BvX3c9aQ.js").write_text(SCRIPT)
+    (tmp_path / "assets" / "index-Dk2mL0pQ.css").write_text(STYLE)
+    # Left by the build; served instead of compressing at startup
+    (tmp_path / "assets" / "index-Dk2mL0pQ.css.gz").write_bytes(gzip.compress(STYLE.encode(), mtime=0))
+    (tmp_path / "aqia.png").write_bytes(b"\x89PNG" + bytes(2000))
+
+    site = StaticSite(str(tmp_path))
+    app = FastAPI()
+
+    @app.get("/{full_path:path}")
+    async def serve(full_path: str, request: Request):
+        return site.respond(full_path, request.headers)
+
+    return site, TestClient(app)
+
+def test_hashed_assets_are_immutable_and_compressed(tmp_path):
+    site, client = build(tmp_path)
+    response = client.get("/assets/index-BvX3c9aQ.js", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == SCRIPT  # decoded by the client
+
+    identity = client.get("/assets/index-BvX3c9aQ.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] != response.headers["etag"]
+
+    css = client.get("/assets/index-Dk2mL0pQ.css", headers={"Accept-Encoding": "br, gzip"})
+    assert css.headers["content-encoding"] == "gzip" and css.text == STYLE
+    assert "assets/index-Dk2mL0pQ.css.gz" not in site.files
+
+def test_if_none_match_returns_304(tmp_path):
+    _, client = build(tmp_path)
+    first = client.get("/")
+    assert first.text == INDEX
+    assert first.headers["cache-control"] == REVALIDATE
+    again = client.get("/", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["etag"] == first.headers["etag"]
+    assert again.content == b""
+
+def test_client_routes_get_index_but_missing_assets_404(tmp_path):
+    _, client = build(tmp_path)
+    assert client.get("/dashboard/settings").text == INDEX
+    assert client.get("/assets/missing-12345678.js").status_code == 404
+    image = client.get("/aqia.png")
+    assert image.headers["content-type"] == "image/png"
+    assert "content-encoding" not in image.headers
+    assert image.headers["cache-control"] == REVALIDATE
+
+def test_accept_encoding_parsing():
+    assert accepted_encodings("gzip;q=0.5, br;q=0, deflate") == {"gzip", "deflate"}
+    assert accepted_encodings(None) == set()
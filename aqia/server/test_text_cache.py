@@ -0,0 +1,52 @@
+from array import array
+from text_cache import TokenCache
+
+class FakeTokenizer:
+    def __init__(self):
+        self.calls = []
+
+    def text_to_ids(self, text, language=None):
+        self.calls.append((text, language))
+        return [ord(c) for c in text]
+
+def test_repeated_sentences_skip_the_tokenizer():
+    tokenizer = TokenCache(max_bytes=1 << 20).wrap(FakeTokenizer())
+    calls = tokenizer.calls
+    assert tokenizer.text_to_ids("Tell me about yourself.") == [ord(c) for c in "Tell me about yourself."]
+    assert tokenizer.text_to_ids("Tell me  about yourself.") == [ord(c) for c in "Tell me about yourself."]
+    assert len(calls) == 1
+
+def test_language_is_part_of_the_key():
+    cache = TokenCache(max_bytes=1 << 20)
+    tokenizer = cache.wrap(FakeTokenizer())
+    tokenizer.text_to_ids("Hola", language="es")
+    tokenizer.text_to_ids("Hola", language="en")
+    assert len(tokenizer.calls) == 2
+    assert cache.stats()["misses"] == 2
+
+def test_evicts_least_recently_used_within_budget():
+    cache = TokenCache(max_bytes=1 << 20)
+    one_entry = TokenCache._size(("a" * 100, None), array("i", range(100)))
+    cache.max_bytes = one_entry * 2
+    tokenizer = cache.wrap(FakeTokenizer())
+    for text in ("a" * 100, "b" * 100, "a" * 100, "c" * 100):
+        tokenizer.text_to_ids(text)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    tokenizer.text_to_ids("a" * 100)  # Still cached: it was used more recently than "b"
+    assert len(tokenizer.calls) == 3
+
+def test_oversized_entries_are_not_cached():
+    cache = TokenCache(max_bytes=10)
+    tokenizer = cache.wrap(FakeTokenizer())
+    tokenizer.text_to_ids("long sentence")
+    tokenizer.text_to_ids("long sentence")
+    assert len(tokenizer.calls) == 2 and cache.stats()["entries"] == 0
+
+def test_namespaces_keep_tokenizers_apart():
+    cache = TokenCache(max_bytes=1 << 20)
+    first = cache.wrap(FakeTokenizer(), namespace="ljspeech")
+    second = cache.wrap(FakeTokenizer(), namespace="vctk")
+    first.text_to_ids("Hello")
+    second.text_to_ids("Hello")
+    assert len(first.calls) == len(second.calls) == 1
@@ -0,0 +1,80 @@
+import asyncio
+from tts_batcher import BatchScheduler
+
+def test_concurrent_requests_share_a_batch():
+    seen = []
+
+    async def run_batch(items):
+        seen.append(len(items))
+        return [text.upper() for (text,) in items]
+
+    batcher = BatchScheduler(run_batch, max_batch_size=8, max_wait_ms=50)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(t, t) for t in ["a", "b", "c"]))
+
+    assert asyncio.run(scenario()) == ["A", "B", "C"]
+    assert seen == [3]
+    assert batcher.stats()["avg_batch_size"] == 3
+
+def test_batches_respect_size_and_char_budget():
+    seen = []
+
+    async def run_batch(items):
+        seen.append([text for (text,) in items])
+        return [None] * len(items)
+
+    batcher = BatchScheduler(run_batch, max_batch_size=2, max_wait_ms=50, max_batch_chars=10)
+
+    async def scenario():
+        texts = ["aaaa", "bbbb", "cccccccc", "dd"]
+        await asyncio.gather(*(batcher.submit(t, t) for t in texts))
+
+    asyncio.run(scenario())
+    assert seen == [["aaaa", "bbbb"], ["cccccccc", "dd"]]
+
+def test_batch_failure_reaches_every_caller():
+    async def run_batch(items):
+        raise RuntimeError("model crashed")
+
+    batcher = BatchScheduler(run_batch, max_wait_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(batcher.submit("x", "x"), batcher.submit("y", "y"), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_item_exceptions_reach_only_their_caller():
+    async def run_batch(items):
+        return [ValueError(text) if text == "bad" else text.upper() for (text,) in items]
+
+    batcher = BatchScheduler(run_batch, max_wait_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(batcher.submit("ok", "ok"), batcher.submit("bad", "bad"), return_exceptions=True)
+
+    ok, bad = asyncio.run(scenario())
+    assert ok == "OK" and isinstance(bad, ValueError)
+
+def test_close_cancels_queued_and_in_flight_requests():
+    started = asyncio.Event()
+
+    async def run_batch(items):
+        started.set()
+        await asyncio.sleep(10)
+
+    batcher = BatchScheduler(run_batch, max_batch_size=1, max_wait_ms=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(batcher.submit("a", "a"))
+        second = asyncio.ensure_future(batcher.submit("b", "b"))
+        await started.wait()
+        await asyncio.sleep(0.01)
+        assert len(batcher._dispatches) == 2  # running batches stay referenced until done
+        batcher.close()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert not batcher._dispatches
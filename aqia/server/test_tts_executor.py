@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import pytest
+from tts_executor import SynthesisPool, QueueFullError, DeadlineExceededError
+
+def test_runs_job_off_the_event_loop():
+    pool = SynthesisPool("test", kind="thread", max_workers=1, max_queue=0)
+    loop_thread = threading.get_ident()
+    worker_thread = asyncio.run(pool.run(threading.get_ident))
+    assert worker_thread != loop_thread
+    assert pool.stats()["completed"] == 1
+    pool.shutdown()
+
+def test_rejects_when_queue_is_full():
+    pool = SynthesisPool("test", kind="thread", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(QueueFullError) as exc:
+            await pool.run(release.wait)
+        assert exc.value.retry_after >= 1
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+def test_deadline_frees_queued_slot():
+    pool = SynthesisPool("test", kind="thread", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(DeadlineExceededError):
+            await pool.run(release.wait, deadline=0.05)
+        await asyncio.sleep(0.01)
+        # The queued job was cancelled, so only the running one holds a slot
+        assert pool.in_flight == 1
+        release.set()
+        await running
+
+    asyncio.run(scenario())
+    pool.shutdown()
@@ -0,0 +1,124 @@
+import asyncio
+import grpc
+import pytest
+from tts_executor import DeadlineExceededError
+from tts_router import EngineRouter, CircuitBreaker, CircuitOpenError
+from fake_google_tts import FakeGoogleTTS
+from google_tts_service import GoogleTTSService, is_transient_error
+from audio_processing import OutputSpec
+
+class Transient(Exception):
+    pass
+
+def fake_engine(results, delay=0.0):
+    """Async engine that sleeps `delay`, then returns (or raises) the next entry of `results`."""
+    calls = []
+
+    async def call(*args):
+        calls.append(args)
+        await asyncio.sleep(delay)
+        result = results.pop(0) if len(results) > 1 else results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    call.calls = calls
+    return call
+
+def make_router(**kwargs):
+    kwargs.setdefault("backoff", 0.001)
+    kwargs.setdefault("retryable", lambda e: isinstance(e, (Transient, asyncio.TimeoutError)))
+    return EngineRouter(**kwargs)
+
+def test_retries_transient_failures():
+    router = make_router(attempts=3)
+    primary = fake_engine([Transient(), Transient(), b"google"])
+    result = asyncio.run(router.route(primary))
+    assert (result.audio, result.engine) == (b"google", "google")
+    assert len(primary.calls) == 3 and router.retries == 2
+
+def test_does_not_retry_permanent_failures():
+    router = make_router(attempts=3)
+    primary = fake_engine([ValueError("bad voice")])
+    with pytest.raises(ValueError):
+        asyncio.run(router.route(primary))
+    assert len(primary.calls) == 1
+    assert router.breaker.snapshot()["consecutive_failures"] == 0
+
+def test_attempt_timeout_becomes_deadline_error():
+    router = make_router(attempts=2, attempt_timeout=0.02)
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(router.route(fake_engine([b"late"], delay=1.0)))
+
+def test_fails_over_when_primary_fails():
+    router = make_router(attempts=1)
+    result = asyncio.run(router.route(fake_engine([Transient()]), fake_engine([b"coqui"])))
+    assert (result.audio, result.engine, result.hedged) == (b"coqui", "coqui", False)
+    assert router.failovers == 1
+
+def test_hedged_fallback_wins_against_slow_primary():
+    router = make_router(hedge_delay=0.02)
+    result = asyncio.run(router.route(fake_engine([b"google"], delay=1.0), fake_engine([b"coqui"])))
+    assert (result.engine, result.hedged) == ("coqui", True)
+    assert router.breaker.state == "closed"  # A slow-but-cancelled call isn't a failure
+
+def test_primary_still_wins_a_hedge_when_it_answers_first():
+    router = make_router(hedge_delay=0.01)
+    result = asyncio.run(router.route(fake_engine([b"google"], delay=0.03), fake_engine([b"coqui"], delay=1.0)))
+    assert (result.engine, result.hedged) == ("google", True)
+
+def test_hedge_where_both_fail_reports_a_real_error():
+    async def cancelled(*args):
+        await asyncio.sleep(0.03)
+        raise asyncio.CancelledError()
+
+    router = make_router(attempts=1, hedge_delay=0.01)
+    with pytest.raises(Transient):
+        asyncio.run(router.route(fake_engine([Transient()], delay=0.03), cancelled))
+    with pytest.raises(Transient):
+        asyncio.run(router.route(cancelled, fake_engine([Transient()])))
+    with pytest.raises(RuntimeError):
+        asyncio.run(router.route(cancelled, cancelled))
+
+def test_open_circuit_short_circuits_to_fallback():
+    router = make_router(attempts=1, breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60))
+    primary = fake_engine([Transient()])
+    fallback = fake_engine([b"coqui"])
+
+    async def scenario():
+        for _ in range(3):
+            await router.route(primary, fallback)
+        with pytest.raises(CircuitOpenError):
+            await router.route(primary)
+
+    asyncio.run(scenario())
+    assert len(primary.calls) == 2
+    assert router.short_circuited == 1
+    assert router.breaker.state == "open"
+
+def test_breaker_half_opens_after_reset():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] = 10.0
+    assert breaker.allow() and not breaker.allow()  # One trial call at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_routes_against_fake_google_grpc():
+    router = make_router(attempts=3, retryable=is_transient_error)
+
+    async def scenario():
+        async with FakeGoogleTTS() as fake:
+            service = GoogleTTSService(api_endpoint=fake.endpoint)
+            fake.fail_with.append(grpc.StatusCode.UNAVAILABLE)
+            result = await router.route(
+                lambda timeout: service.synthesize_processed_async("Hello there.", "en-US-Neural2-F",
+                                                                   OutputSpec("wav"), timeout)
+            )
+            return result, len(fake.requests)
+
+    result, requests = asyncio.run(scenario())
+    assert result.engine == "google" and result.audio[:4] == b"RIFF"
+    assert requests == 2 and router.retries == 1
@@ -0,0 +1,13 @@
+import types
+
+import numpy as np
+
+from tts_service import SENTENCE_GAP_SAMPLES, join_sentences
+
+def test_join_sentences_matches_single_synthesis_layout():
+    synthesizer = types.SimpleNamespace(tts_config=types.SimpleNamespace(audio={"do_trim_silence": False}))
+    first, second = np.ones(3, dtype=np.float32), np.full(2, 0.5, dtype=np.float32)
+    joined = join_sentences(synthesizer, [first, second])
+    gap = np.zeros(SENTENCE_GAP_SAMPLES, dtype=np.float32)
+    assert np.array_equal(joined, np.concatenate([first, gap, second, gap]))
+    assert join_sentences(synthesizer, []).size == 0
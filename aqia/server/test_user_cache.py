@@ -0,0 +1,46 @@
+import time
+from user_cache import UserCache, UserPrincipal
+
+alice = UserPrincipal(id="u1", email="alice@example.com", name="Alice")
+bob = UserPrincipal(id="u2", email="bob@example.com")
+
+def test_hit_and_miss_are_counted():
+    cache = UserCache(max_entries=10, ttl_seconds=60)
+    assert cache.get("t1") is None
+    cache.put("t1", alice)
+    assert cache.get("t1") == alice
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+def test_entries_expire_with_ttl_or_token():
+    cache = UserCache(ttl_seconds=0.05)
+    cache.put("t1", alice)
+    cache.put("expired", bob, token_expires_at=time.time() - 1)
+    assert cache.get("expired") is None
+    time.sleep(0.06)
+    assert cache.get("t1") is None
+    assert cache.stats()["entries"] == 0
+
+def test_evicts_least_recently_used():
+    cache = UserCache(max_entries=2, ttl_seconds=60)
+    cache.put("t1", alice)
+    cache.put("t2", bob)
+    cache.get("t1")
+    cache.put("t3", bob)
+    assert cache.get("t2") is None
+    assert cache.get("t1") == alice
+    assert cache.stats()["evictions"] == 1
+
+def test_invalidate_user_drops_all_their_tokens():
+    cache = UserCache(ttl_seconds=60)
+    cache.put("t1", alice)
+    cache.put("t2", alice)
+    cache.put("t3", bob)
+    cache.invalidate_user("u1")
+    assert cache.get("t1") is None and cache.get("t2") is None
+    assert cache.get("t3") == bob
+
+def test_disabled_when_ttl_is_zero():
+    cache = UserCache(ttl_seconds=0)
+    cache.put("t1", alice)
+    assert cache.get("t1") is None
@@ -0,0 +1,63 @@
+import time
+import pytest
+from voice_registry import MODEL_ALIASES, ModelRegistry, UnknownVoiceError, Voice, resolve_voice
+
+def registry(max_bytes=300, idle_seconds=None, pinned=()):
+    loads = []
+
+    def loader(name):
+        loads.append(name)
+        return f"model:{name}"
+
+    reg = ModelRegistry(loader, lambda model: 100, max_bytes=max_bytes, idle_seconds=idle_seconds, pinned=pinned)
+    reg.loads_seen = loads
+    return reg
+
+def test_resolve_voice():
+    assert resolve_voice("vctk:p225") == Voice(MODEL_ALIASES["vctk"], "p225")
+    assert resolve_voice("ljspeech") == Voice(MODEL_ALIASES["ljspeech"], None)
+    # Google voice names and missing voices fall back to the default Coqui voice
+    assert resolve_voice("en-US-Neural2-F") == resolve_voice(None) == Voice(MODEL_ALIASES["ljspeech"], None)
+    assert resolve_voice("vctk:p225").name == "vctk:p225"
+    with pytest.raises(UnknownVoiceError):
+        resolve_voice("nope:p225")
+
+def test_models_load_once_on_first_use():
+    reg = registry()
+    assert reg.get("a") == "model:a"
+    assert reg.get("a") == "model:a"
+    assert reg.loads_seen == ["a"]
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    reg = registry(max_bytes=200)
+    reg.get("a")
+    reg.get("b")
+    reg.get("a")
+    reg.get("c")  # Over budget: "b" was used least recently
+    assert reg.loaded() == ["a", "c"]
+    stats = reg.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 200
+
+def test_requested_model_is_kept_even_if_it_alone_exceeds_the_budget():
+    reg = registry(max_bytes=50)
+    reg.get("a")
+    assert reg.get("b") == "model:b"
+    assert reg.loaded() == ["b"]
+
+def test_idle_models_are_unloaded_except_pinned():
+    reg = registry(idle_seconds=0.05, pinned=["default"])
+    reg.get("default")
+    reg.get("other")
+    time.sleep(0.1)
+    reg.unload_idle()
+    assert reg.loaded() == ["default"]
+    assert reg.stats()["idle_unloads"] == 1
+    reg.get("other")
+    assert reg.loads_seen == ["default", "other", "other"]
+
+def test_budget_eviction_skips_pinned_models():
+    reg = registry(max_bytes=200, pinned=["default"])
+    for name in ("default", "a", "b"):
+        reg.get(name)
+    assert reg.loaded() == ["default", "b"]  # "a" went, although "default" was least recently used
+    assert reg.stats()["evictions"] == 1
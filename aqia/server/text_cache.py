@@ -0,0 +1,87 @@
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+from audio_cache import normalize_text
+
+# Rough per-entry bookkeeping cost (dict slot, OrderedDict links, key/array headers)
+_ENTRY_OVERHEAD = 200
+
+
+class TokenCache:
+    """
+    LRU cache of sentence -> model token ids, bounded by a memory budget.
+
+    Turning text into token ids (cleaning, number expansion, espeak
+    phonemization) costs a noticeable share of CPU synthesis time, and
+    interview prompts repeat the same sentences constantly. `wrap()` puts the
+    cache in front of a Coqui tokenizer's `text_to_ids`, so every synthesis
+    path skips preprocessing for sentences it has seen before. Ids are stored
+    as compact int arrays and counted against `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (normalized text, language, namespace) -> array of ids
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key, ids: array) -> int:
+        return sys.getsizeof(key[0]) + ids.itemsize * len(ids) + _ENTRY_OVERHEAD
+
+    def get_or_compute(self, text: str, language, compute, namespace=None) -> list:
+        key = (normalize_text(text), language, namespace)
+        with self._lock:
+            ids = self._entries.get(key)
+            if ids is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return ids.tolist()
+            self.misses += 1
+
+        result = compute()
+        ids = array("i", result)
+        size = self._size(key, ids)
+        if size > self.max_bytes:
+            return result
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = ids
+                self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_ids = self._entries.popitem(last=False)
+                self._bytes -= self._size(old_key, old_ids)
+                self.evictions += 1
+        return result
+
+    def wrap(self, tokenizer, namespace=None):
+        """
+        Memoize `tokenizer.text_to_ids(text, language=None)` through this cache.
+        Tokenizers sharing the cache need distinct namespaces.
+        """
+        text_to_ids = tokenizer.text_to_ids
+
+        def cached_text_to_ids(text, language=None):
+            return self.get_or_compute(text, language, lambda: text_to_ids(text, language=language), namespace)
+
+        tokenizer.text_to_ids = cached_text_to_ids
+        return tokenizer
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
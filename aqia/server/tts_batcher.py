@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Optional
+
+
+class _Item:
+    __slots__ = ("text", "args", "future")
+
+    def __init__(self, text: str, args: tuple, future: asyncio.Future):
+        self.text = text
+        self.args = args
+        self.future = future
+
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching for synthesis requests.
+
+    Requests submitted within `max_wait_ms` of the first queued one are grouped
+    until the batch reaches `max_batch_size` items or `max_batch_chars` characters
+    of text (a cheap proxy for the token budget). Each batch is handed to
+    `run_batch(list_of_args)`, an async callable returning one result (or
+    exception) per item, and the results are routed back to the individual
+    callers.
+    """
+
+    def __init__(self, run_batch, max_batch_size: int = 8, max_wait_ms: float = 20.0,
+                 max_batch_chars: int = 2000):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_chars = max_batch_chars
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._carry: Optional[_Item] = None
+        self._collector: Optional[asyncio.Task] = None
+        # The loop only keeps weak references to tasks; hold in-flight batches here
+        self._dispatches = set()
+
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = Counter()
+        self._busy_seconds = 0.0
+        self._started = time.monotonic()
+
+    async def submit(self, text: str, *args):
+        """Queue one request and wait for its share of the batch result."""
+        loop = asyncio.get_running_loop()
+        if self._collector is None or self._collector.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._carry = None
+            self._collector = loop.create_task(self._collect())
+        future = loop.create_future()
+        await self._queue.put(_Item(text, args, future))
+        return await future
+
+    async def _next_item(self, timeout: Optional[float]) -> _Item:
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        if timeout is None:
+            return await self._queue.get()
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._next_item(None)
+            batch = [first]
+            chars = len(first.text)
+            window_ends = loop.time() + self.max_wait
+
+            try:
+                while len(batch) < self.max_batch_size:
+                    remaining = window_ends - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await self._next_item(remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if chars + len(item.text) > self.max_batch_chars:
+                        # Over budget: this item opens the next batch instead
+                        self._carry = item
+                        break
+                    batch.append(item)
+                    chars += len(item.text)
+            except asyncio.CancelledError:
+                _cancel(batch)
+                raise
+
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: list):
+        started = time.monotonic()
+        try:
+            results = await self.run_batch([item.args for item in batch])
+        except asyncio.CancelledError:
+            _cancel(batch)
+            raise
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        finally:
+            self._busy_seconds += time.monotonic() - started
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] += 1
+
+        for item, result in zip(batch, results):
+            if item.future.done():
+                continue
+            # A run_batch may fail single items by returning their exception
+            if isinstance(result, Exception):
+                item.future.set_exception(result)
+            else:
+                item.future.set_result(result)
+
+    def close(self):
+        """Cancel batching: queued and in-flight requests get CancelledError."""
+        if self._collector is not None:
+            self._collector.cancel()
+        for task in list(self._dispatches):
+            task.cancel()
+        pending = [self._carry] if self._carry is not None else []
+        self._carry = None
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        _cancel(pending)
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a batch to pick them up."""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return queued + (self._carry is not None)
+
+    def stats(self) -> dict:
+        uptime = time.monotonic() - self._started
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_chars": self.max_batch_chars,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            # Items completed per second of inference time, and per second of uptime
+            "items_per_busy_second": round(self.items / self._busy_seconds, 3) if self._busy_seconds else 0.0,
+            "items_per_second": round(self.items / uptime, 3) if uptime else 0.0,
+        }
+
+
+def _cancel(items: list):
+    for item in items:
+        item.future.cancel()
@@ -0,0 +1,139 @@
+import asyncio
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional
+
+
+# Sentinel so callers can pass deadline=None to mean "no deadline"
+DEFAULT_DEADLINE = object()
+
+
+class QueueFullError(Exception):
+    """Raised when a synthesis pool has no free slot; carries a Retry-After hint in seconds."""
+
+    def __init__(self, pool_name: str, retry_after: int):
+        super().__init__(f"{pool_name} synthesis queue is full")
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a synthesis job does not finish within its deadline."""
+
+
+class SynthesisPool:
+    """
+    Runs blocking synthesis calls off the event loop.
+
+    `kind="thread"` suits I/O-bound engines (Google gRPC); `kind="process"` gives
+    CPU-bound engines (Coqui) their own interpreter so inference never holds the
+    server's GIL. At most `max_workers + max_queue` jobs are admitted at once;
+    anything beyond that is rejected immediately with QueueFullError so callers
+    can answer 503 + Retry-After instead of piling up behind the model.
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 1, max_queue: int = 8,
+                 deadline: Optional[float] = 30.0, initializer=None, initargs=()):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.deadline = deadline
+
+        if kind == "process":
+            # spawn: forking a process that has already touched torch can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs,
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=f"tts-{name}",
+                initializer=initializer,
+                initargs=initargs,
+            )
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._avg_job_seconds = 1.0
+
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def retry_after(self) -> int:
+        """Rough estimate of how long until a slot frees up."""
+        waves = max(1, self._in_flight - self.max_workers + 1) / self.max_workers
+        return max(1, math.ceil(waves * self._avg_job_seconds))
+
+    def _release(self, started: float, cf):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._in_flight -= 1
+            if not cf.cancelled():
+                self.completed += 1
+                # Exponential moving average of job time for Retry-After hints
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+
+    async def run(self, fn, *args, deadline=DEFAULT_DEADLINE):
+        """
+        Run `fn(*args)` in the pool, enforcing admission control and a deadline.
+        `deadline` defaults to the pool's; None waits as long as it takes.
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise QueueFullError(self.name, self.retry_after())
+            self._in_flight += 1
+
+        started = time.monotonic()
+        try:
+            cf = self._executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        # The slot is released when the job itself finishes, not when the caller
+        # gives up, so abandoned-but-running jobs still count against capacity.
+        cf.add_done_callback(lambda f: self._release(started, f))
+
+        timeout = self.deadline if deadline is DEFAULT_DEADLINE else deadline
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(cf), timeout)
+        except asyncio.TimeoutError:
+            # wait_for cancels the wrapped future, which cancels the job if it is still queued
+            with self._lock:
+                self.timed_out += 1
+            raise DeadlineExceededError(f"{self.name} synthesis exceeded {timeout}s deadline")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.max_workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.max_workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_job_seconds": round(self._avg_job_seconds, 3),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,261 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from tts_executor import QueueFullError, DeadlineExceededError
+
+
+class CircuitOpenError(Exception):
+    """Raised when the primary engine's circuit is open and there is no fallback."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} TTS is temporarily unavailable")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Stops calling an engine that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are refused for `reset_seconds`. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == "open" and self._clock() - self._opened_at >= self.reset_seconds:
+            self._state = "half_open"
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now. In half-open state only one trial call is allowed."""
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.opened += 1
+                self._state = "open"
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+    def record_abandoned(self):
+        """The call was cancelled before it told us anything; let another trial through."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def retry_after(self) -> int:
+        with self._lock:
+            if self._state != "open":
+                return 1
+            return max(1, math.ceil(self.reset_seconds - (self._clock() - self._opened_at)))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+            }
+
+
+class RouteResult(NamedTuple):
+    audio: bytes
+    engine: str  # Which engine produced `audio`
+    hedged: bool = False  # Whether a fallback request was fired alongside the primary
+
+
+class EngineRouter:
+    """
+    Routes synthesis to a primary engine (Google) with a local fallback (Coqui).
+
+    Primary calls get `attempts` tries, each bounded by `attempt_timeout`
+    (passed to the call so it can set the RPC deadline), with jittered
+    exponential backoff, all within `deadline` seconds. Only failures that
+    `retryable(e)` accepts are retried or count against the circuit breaker.
+
+    With a fallback available, `route()` fails over when the primary fails, is
+    over `max_in_flight`, or its circuit is open. If the primary hasn't
+    answered within `hedge_delay` seconds a fallback request is fired as well
+    and whichever succeeds first wins; the other is cancelled.
+    """
+
+    def __init__(self, primary_name: str = "google", fallback_name: str = "coqui",
+                 breaker: Optional[CircuitBreaker] = None, attempts: int = 3,
+                 attempt_timeout: float = 5.0, deadline: float = 30.0, backoff: float = 0.2,
+                 hedge_delay: Optional[float] = None, max_in_flight: Optional[int] = None,
+                 retryable=lambda e: True):
+        self.primary_name = primary_name
+        self.fallback_name = fallback_name
+        self.breaker = breaker or CircuitBreaker()
+        self.attempts = max(1, attempts)
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.backoff = backoff
+        self.hedge_delay = hedge_delay
+        self.max_in_flight = max_in_flight
+        self.retryable = retryable
+
+        self._in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.primary_failures = 0
+        self.rejected = 0
+        self.short_circuited = 0
+        self.failovers = 0
+        self.hedged = 0
+        self.wins = {primary_name: 0, fallback_name: 0}
+
+    async def call_primary(self, call):
+        """
+        Run `call(timeout)` against the primary with retries, the deadline and
+        the circuit breaker, but no fallback.
+        """
+        if self.max_in_flight is not None and self._in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise QueueFullError(self.primary_name, 1)
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.primary_name, self.breaker.retry_after())
+
+        self._in_flight += 1
+        try:
+            result = await self._with_retries(call)
+        except asyncio.CancelledError:
+            self.breaker.record_abandoned()
+            raise
+        except Exception as e:
+            self.primary_failures += 1
+            if self.retryable(e) or isinstance(e, DeadlineExceededError):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_abandoned()
+            raise
+        finally:
+            self._in_flight -= 1
+        self.breaker.record_success()
+        return result
+
+    async def _with_retries(self, call):
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + self.deadline
+        for attempt in range(self.attempts):
+            remaining = give_up_at - loop.time()
+            if remaining <= 0:
+                break
+            timeout = min(self.attempt_timeout, remaining)
+            try:
+                return await asyncio.wait_for(call(timeout), timeout)
+            except Exception as e:
+                if not self.retryable(e) or attempt == self.attempts - 1:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise DeadlineExceededError(f"{self.primary_name} TTS exceeded {timeout:.1f}s deadline")
+                    raise
+            # Full jitter keeps a burst of failed requests from retrying in lockstep
+            pause = random.uniform(0, self.backoff * 2 ** attempt)
+            if loop.time() + pause >= give_up_at:
+                break
+            self.retries += 1
+            await asyncio.sleep(pause)
+        raise DeadlineExceededError(f"{self.primary_name} TTS exceeded {self.deadline:.1f}s deadline")
+
+    async def route(self, primary, fallback=None) -> RouteResult:
+        """
+        Synthesize with `primary(timeout)`, falling back to (or hedging with)
+        `fallback()` when it is given. Both return encoded audio bytes.
+        """
+        self.calls += 1
+        if fallback is None:
+            return self._won(RouteResult(await self.call_primary(primary), self.primary_name))
+
+        primary_task = asyncio.ensure_future(self.call_primary(primary))
+        fallback_task = None
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.hedge_delay)
+            if not done:
+                self.hedged += 1
+                fallback_task = asyncio.ensure_future(fallback())
+                pending = {primary_task, fallback_task}
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if not task.cancelled() and task.exception() is None:
+                            engine = self.primary_name if task is primary_task else self.fallback_name
+                            return self._won(RouteResult(task.result(), engine, hedged=True))
+                # Both failed; report the primary's error, unless it was only cancelled
+                for task in (primary_task, fallback_task):
+                    if not task.cancelled():
+                        raise task.exception()
+                raise RuntimeError(f"{self.primary_name} and {self.fallback_name} TTS were both cancelled")
+
+            error = primary_task.exception()
+            if error is None:
+                return self._won(RouteResult(primary_task.result(), self.primary_name))
+            if isinstance(error, CircuitOpenError):
+                self.short_circuited += 1
+            elif isinstance(error, QueueFullError):
+                pass  # Counted as rejected
+            else:
+                self.failovers += 1
+                print(f"{self.primary_name} TTS failed, falling back to {self.fallback_name}: {error}")
+            return self._won(RouteResult(await fallback(), self.fallback_name))
+        finally:
+            for task in (primary_task, fallback_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def _won(self, result: RouteResult) -> RouteResult:
+        self.wins[result.engine] += 1
+        return result
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "in_flight": self._in_flight,
+            "retries": self.retries,
+            "primary_failures": self.primary_failures,
+            "rejected": self.rejected,
+            "short_circuited": self.short_circuited,
+            "failovers": self.failovers,
+            "hedged": self.hedged,
+            "wins": dict(self.wins),
+            "circuit": self.breaker.snapshot(),
+        }
@@ -1,18 +1,410 @@
 import os
-import torch
-from TTS.api import TTS
+import threading
+import time
+import numpy as np
+from audio_processing import OutputSpec, render
+from text_cache import TokenCache
+from voice_registry import ModelRegistry, UnknownVoiceError, Voice, resolve_voice
+
+# torch, transformers and Coqui are imported lazily (see configure_runtime) so that
+# importing this module - and therefore main.py - stays fast.
+torch = None
+_runtime_configured = False
+
+WARMUP_TEXT = "Hello, let's get started."
+
+# Memory budget for cached sentence -> token ids (set COQUI_TEXT_CACHE_MB=0 to disable)
+TEXT_CACHE_MB = float(os.getenv("COQUI_TEXT_CACHE_MB", "16"))
+
+# CPU inference backends (COQUI_INFERENCE_MODE). compare_inference.py measures
+# their real-time factor and similarity to the default model.
+#   default   - full-precision PyTorch
+#   quantized - dynamic int8 quantization of the model's Linear/LSTM/GRU layers
+#   onnx      - the model exported to ONNX and run by ONNX Runtime
+INFERENCE_MODES = ("default", "quantized", "onnx")
+# Exported ONNX models are cached in COQUI_ONNX_DIR, one file per model.
+# COQUI_ONNX_PATH is accepted as an alias (the name the mode was announced under).
+ONNX_MODEL_DIR = os.getenv("COQUI_ONNX_DIR") or os.getenv("COQUI_ONNX_PATH") or "models"
+# Loaded models are kept within this budget, least recently used unloaded first;
+# models unused for COQUI_MODEL_IDLE_SECONDS are unloaded too (0 keeps them)
+MODEL_MEMORY_MB = float(os.getenv("COQUI_MODEL_MEMORY_MB", "1024"))
+MODEL_IDLE_SECONDS = float(os.getenv("COQUI_MODEL_IDLE_SECONDS", "900"))
+# Coqui's own synthesizer pads each sentence with this many samples of silence
+SENTENCE_GAP_SAMPLES = 10000
+
+def configure_runtime():
+    """One-time environment setup needed before the Coqui model can load."""
+    global torch, _runtime_configured
+    if _runtime_configured:
+        return
+    import torch as _torch
+    torch = _torch
+
+    # Monkey patch for coqui-tts compatibility with newer transformers
+    import transformers.pytorch_utils as pu
+    if not hasattr(pu, "isin_mps_friendly"):
+        def isin_mps_friendly():
+            return False
+        pu.isin_mps_friendly = isin_mps_friendly
+
+    # 1. Set Coqui TOS Agreement
+    os.environ["COQUI_TOS_AGREED"] = "1"
+
+    # 2. Fix eSpeak Path (if not in system PATH)
+    espeak_lib = None
+    espeak_path = r"C:\Program Files\eSpeak NG\espeak-ng.exe"
+    if os.path.exists(espeak_path):
+        print(f"ℹ️  Found eSpeak at default location: {espeak_path}")
+        os.environ["PHONEMIZER_ESPEAK_PATH"] = espeak_path
+
+        # Also try to set the library path if possible, though phonemizer usually needs the executable
+        # Some versions of phonemizer/coqui might look for the dll
+        candidate = r"C:\Program Files\eSpeak NG\libespeak-ng.dll"
+        if os.path.exists(candidate):
+            espeak_lib = candidate
+            os.environ["PHONEMIZER_ESPEAK_LIBRARY"] = espeak_lib
+
+    # Force phonemizer to use the espeak backend
+    try:
+        from phonemizer.backend import EspeakBackend
+        if espeak_lib:
+            EspeakBackend.set_library(espeak_lib)
+            print("✅ EspeakBackend library set successfully.")
+        else:
+            print("ℹ️  EspeakBackend using default system library (Linux/Mac).")
+    except Exception as e:
+        print(f"⚠️  Failed to set EspeakBackend library (Non-critical if using system default): {e}")
+
+    _runtime_configured = True
+
+def onnx_path(model_name: str) -> str:
+    return os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "--") + ".onnx")
+
+def configure_threads(threads: int = 0, interop_threads: int = 0):
+    """
+    Pin torch's intra-op (and, if still possible, inter-op) thread pools; 0
+    keeps torch's default. Several workers each using every core just
+    thrash, so process workers get a share of the machine each.
+    """
+    if threads > 0:
+        torch.set_num_threads(threads)
+    if interop_threads > 0:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            # Can only be set before the first inter-op parallel work in this process
+            pass
 
 class TTSService:
-    def __init__(self):
+    """
+    Coqui synthesis for every configured voice. Models are loaded on first use
+    through a ModelRegistry that keeps them within COQUI_MODEL_MEMORY_MB,
+    unloading the least recently used (and, after COQUI_MODEL_IDLE_SECONDS,
+    idle) ones. The default voice's model is loaded up front and never
+    unloaded for idleness. Methods take a `voice` (see voice_registry) and use
+    the default voice when it is None.
+    """
+
+    def __init__(self, inference_mode: str = None, threads: int = None, interop_threads: int = None,
+                 max_model_mb: float = None, idle_seconds: float = None):
+        configure_runtime()
+
+        self.inference_mode = inference_mode or os.getenv("COQUI_INFERENCE_MODE", "default")
+        if self.inference_mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown Coqui inference mode: {self.inference_mode}")
+        self.threads = threads if threads is not None else int(os.getenv("COQUI_TORCH_THREADS", "0"))
+        self.interop_threads = (
+            interop_threads if interop_threads is not None else int(os.getenv("COQUI_TORCH_INTEROP_THREADS", "0"))
+        )
+        configure_threads(self.threads, self.interop_threads)
+
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"🔄 Initializing Coqui TTS on {self.device}...")
-        # Using a fast, decent quality model. 
-        # 'tts_models/en/ljspeech/vits' is a good balance.
-        # Or 'tts_models/en/vctk/vits' for multi-speaker.
-        # Let's use a standard one for now.
-        self.tts = TTS("tts_models/en/ljspeech/vits").to(self.device)
-        print("✅ Coqui TTS Initialized.")
-
-    def generate_audio(self, text: str, output_path: str):
-        self.tts.tts_to_file(text=text, file_path=output_path)
+        if self.inference_mode != "default" and self.device != "cpu":
+            raise ValueError(f"Coqui inference mode '{self.inference_mode}' is CPU-only")
+
+        # Recurring sentences skip text cleaning and espeak phonemization
+        self.text_cache = TokenCache(int(TEXT_CACHE_MB * 1024 * 1024)) if TEXT_CACHE_MB > 0 else None
+
+        self.default_voice = resolve_voice(None)
+        max_model_mb = max_model_mb if max_model_mb is not None else MODEL_MEMORY_MB
+        idle_seconds = idle_seconds if idle_seconds is not None else MODEL_IDLE_SECONDS
+        self.models = ModelRegistry(
+            self._load_model, model_bytes,
+            max_bytes=int(max_model_mb * 1024 * 1024),
+            idle_seconds=idle_seconds or None,
+            pinned=[self.default_voice.model_name],
+        )
+        self.models.get(self.default_voice.model_name)
+        if idle_seconds:
+            self.models.start_reaper()
+
+    def _load_model(self, model_name: str):
+        from TTS.api import TTS
+
+        print(f"🔄 Loading Coqui model {model_name} on {self.device}...")
+        tts = TTS(model_name).to(self.device)
+        model = tts.synthesizer.tts_model
+        if self.inference_mode == "quantized":
+            self._quantize(model)
+        elif self.inference_mode == "onnx":
+            self._load_onnx(model, onnx_path(model_name))
+
+        tokenizer = getattr(model, "tokenizer", None)
+        if self.text_cache is not None and tokenizer is not None:
+            # Models phonemize differently, so each gets its own slice of the cache
+            self.text_cache.wrap(tokenizer, namespace=model_name)
+        print(f"✅ Coqui model {model_name} loaded.")
+        return tts
+
+    def _quantize(self, model):
+        """
+        Dynamic int8 quantization: weights are stored as int8 and activations
+        quantized on the fly. PyTorch only does this for Linear and recurrent
+        layers; VITS's convolutions stay in float32, which bounds the speedup.
+        """
+        quantizable = (torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU)
+        count = sum(isinstance(m, quantizable) for m in model.modules())
+        torch.quantization.quantize_dynamic(model, set(quantizable), dtype=torch.qint8, inplace=True)
+        print(f"✅ Coqui model quantized to int8 ({count} layers)")
+
+    def _load_onnx(self, model, path: str):
+        """Export the model to ONNX once (cached under COQUI_ONNX_DIR) and open an ONNX Runtime session."""
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("COQUI_INFERENCE_MODE=onnx needs the onnx and onnxruntime packages")
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            print(f"🔄 Exporting Coqui model to {path}...")
+            model.export_onnx(output_path=path, verbose=False)
+
+        options = ort.SessionOptions()
+        if self.threads > 0:
+            options.intra_op_num_threads = self.threads
+        if self.interop_threads > 0:
+            options.inter_op_num_threads = self.interop_threads
+        # Vits.inference_onnx() runs whatever session is attached here
+        model.onnx_sess = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        print(f"✅ Coqui model running on ONNX Runtime ({path})")
+
+    def _model(self, voice: Voice = None):
+        """The loaded TTS object and speaker name for `voice`."""
+        voice = voice or self.default_voice
+        tts = self.models.get(voice.model_name)
+        if not tts.is_multi_speaker:
+            if voice.speaker:
+                raise UnknownVoiceError(f"{voice.model_name} has a single speaker")
+            return tts, None
+        speakers = tts.speakers
+        if voice.speaker is None:
+            return tts, speakers[0]
+        if voice.speaker not in speakers:
+            raise UnknownVoiceError(f"Unknown speaker {voice.speaker} for {voice.model_name}")
+        return tts, voice.speaker
+
+    @staticmethod
+    def _speaker_id(tts, speaker):
+        return None if speaker is None else tts.synthesizer.tts_model.speaker_manager.name_to_id[speaker]
+
+    @property
+    def tts(self):
+        """The default voice's TTS object."""
+        return self._model()[0]
+
+    def generate_audio(self, text: str, output_path: str, voice: Voice = None):
+        tts, speaker = self._model(voice)
+        tts.tts_to_file(text=text, speaker=speaker, file_path=output_path)
         return output_path
+
+    def warmup(self) -> float:
+        """Synthesize a short dummy utterance so the first real request doesn't pay for lazy init."""
+        started = time.perf_counter()
+        self.synthesize(WARMUP_TEXT)
+        return time.perf_counter() - started
+
+    def preprocessing_stats(self):
+        return self.text_cache.stats() if self.text_cache else None
+
+    def model_stats(self):
+        return self.models.stats()
+
+    @property
+    def sample_rate(self) -> int:
+        return self.sample_rate_for(None)
+
+    def sample_rate_for(self, voice: Voice = None) -> int:
+        return self._model(voice)[0].synthesizer.output_sample_rate
+
+    def synthesize(self, text: str, voice: Voice = None) -> np.ndarray:
+        """Synthesize `text` and return the float32 waveform without touching disk."""
+        tts, speaker = self._model(voice)
+        started = time.perf_counter()
+        if self.inference_mode == "onnx":
+            wav = self._synthesize_onnx(tts, text, self._speaker_id(tts, speaker))
+        else:
+            with torch.inference_mode():
+                wav = np.asarray(tts.tts(text=text, speaker=speaker), dtype=np.float32)
+        record_usage(time.perf_counter() - started, wav.size / tts.synthesizer.output_sample_rate)
+        return wav
+
+    def _synthesize_onnx(self, tts, text: str, speaker_id=None) -> np.ndarray:
+        # Mirrors Coqui's Synthesizer.tts(): one forward pass per sentence
+        synthesizer = tts.synthesizer
+        model = synthesizer.tts_model
+        sentences = []
+        for sentence in synthesizer.split_into_sentences(text):
+            ids = np.asarray([model.tokenizer.text_to_ids(sentence)], dtype=np.int64)
+            sentences.append(np.squeeze(model.inference_onnx(ids, speaker_id=speaker_id)).astype(np.float32))
+        return join_sentences(synthesizer, sentences)
+
+    def synthesize_encoded(self, text: str, spec: OutputSpec = OutputSpec(), voice: Voice = None) -> bytes:
+        """Synthesize `text`, post-process it and return the encoded audio file."""
+        return render(self.synthesize(text, voice), self.sample_rate_for(voice), spec)
+
+    def synthesize_batch(self, texts: list, voice: Voice = None) -> list:
+        """
+        Synthesize several utterances of one voice in one padded VITS forward
+        pass and return one float32 waveform per text. Each text is split into
+        sentences that become rows of the batch and are joined back like
+        synthesize() does, so the audio doesn't depend on whether the text was
+        batched. Falls back to one call per text if the batched pass fails.
+        """
+        if len(texts) == 1 or self.inference_mode == "onnx":
+            return [self.synthesize(text, voice) for text in texts]
+
+        tts, speaker = self._model(voice)
+        synthesizer = tts.synthesizer
+        model = synthesizer.tts_model
+        try:
+            # Row ranges of each text's sentences within the batch
+            sentences, spans = [], []
+            for text in texts:
+                split = synthesizer.split_into_sentences(text)
+                spans.append((len(sentences), len(sentences) + len(split)))
+                sentences.extend(split)
+            if not sentences:
+                return [np.zeros(0, dtype=np.float32) for _ in texts]
+
+            token_ids = [model.tokenizer.text_to_ids(sentence) for sentence in sentences]
+            lengths = torch.tensor([len(ids) for ids in token_ids], dtype=torch.long)
+            padded = torch.zeros(len(token_ids), int(lengths.max()), dtype=torch.long)
+            for row, ids in enumerate(token_ids):
+                padded[row, : len(ids)] = torch.tensor(ids, dtype=torch.long)
+
+            started = time.perf_counter()
+            aux_input = {"x_lengths": lengths.to(self.device)}
+            if speaker is not None:
+                speaker_ids = torch.full((len(sentences),), self._speaker_id(tts, speaker), dtype=torch.long)
+                aux_input["speaker_ids"] = speaker_ids.to(self.device)
+            with torch.inference_mode():
+                outputs = model.inference(padded.to(self.device), aux_input=aux_input)
+
+            # y_mask marks the valid spectrogram frames of each item; every frame
+            # becomes hop_length samples in the decoded waveform.
+            hop_length = model.config.audio.hop_length
+            frame_counts = outputs["y_mask"].sum(dim=(1, 2)).long().tolist()
+            waveforms = outputs["model_outputs"]
+            rows = [
+                waveforms[row, 0, : frame_counts[row] * hop_length].cpu().numpy()
+                for row in range(len(sentences))
+            ]
+            wavs = [join_sentences(synthesizer, rows[start:end]) for start, end in spans]
+            record_usage(time.perf_counter() - started,
+                         sum(w.size for w in wavs) / synthesizer.output_sample_rate)
+            return wavs
+        except Exception as e:
+            print(f"⚠️  Batched Coqui inference failed, falling back to sequential: {e}")
+            return [self.synthesize(text, voice) for text in texts]
+
+    def synthesize_batch_encoded(self, texts: list, specs: list, voices: list = None) -> list:
+        """
+        Encoded audio for each (text, spec, voice). Items are batched per voice;
+        if a voice can't be served (say, an unknown speaker) its items get the
+        exception in place of a result, and the other voices are unaffected.
+        """
+        voices = voices or [None] * len(texts)
+        groups = {}
+        for index, voice in enumerate(voices):
+            groups.setdefault(voice, []).append(index)
+
+        results = [None] * len(texts)
+        for voice, indices in groups.items():
+            try:
+                rate = self.sample_rate_for(voice)
+                wavs = self.synthesize_batch([texts[i] for i in indices], voice)
+                for i, wav in zip(indices, wavs):
+                    results[i] = render(wav, rate, specs[i])
+            except UnknownVoiceError as e:
+                for i in indices:
+                    results[i] = e
+        return results
+
+def join_sentences(synthesizer, waveforms: list) -> np.ndarray:
+    """
+    Per-sentence waveforms assembled as Coqui's Synthesizer.tts() does: silence
+    trimmed when the model's audio config asks for it, each sentence followed
+    by a SENTENCE_GAP_SAMPLES pause.
+    """
+    audio_config = synthesizer.tts_config.audio
+    trim = "do_trim_silence" in audio_config and audio_config["do_trim_silence"]
+    if trim:
+        from TTS.tts.utils.synthesis import trim_silence
+    gap = np.zeros(SENTENCE_GAP_SAMPLES, dtype=np.float32)
+    pieces = []
+    for wav in waveforms:
+        wav = np.asarray(wav, dtype=np.float32)
+        if trim:
+            wav = np.asarray(trim_silence(wav, synthesizer.tts_model.ap), dtype=np.float32)
+        pieces.append(wav)
+        pieces.append(gap)
+    return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+
+
+def model_bytes(tts) -> int:
+    """
+    Approximate resident size of a loaded Coqui model: its tensors (including
+    int8-packed quantized weights) plus the ONNX graph when one is attached.
+    """
+    size = 0
+    modules = [tts.synthesizer.tts_model, getattr(tts.synthesizer, "vocoder_model", None)]
+    for module in filter(None, modules):
+        for value in module.state_dict().values():
+            tensors = value if isinstance(value, (tuple, list)) else (value,)
+            size += sum(t.numel() * t.element_size() for t in tensors if torch.is_tensor(t))
+        if getattr(module, "onnx_sess", None) is not None:
+            path = onnx_path(tts.model_name)
+            size += os.path.getsize(path) if os.path.exists(path) else 0
+    return size
+
+# --- Inference accounting ---
+# Synthesis methods report model time and audio produced through record_usage();
+# measure_call() collects them per call and hands them back with the result,
+# which works the same whether the service runs in a thread or a worker process.
+_usage = threading.local()
+
+def record_usage(inference_seconds: float, audio_seconds: float):
+    totals = getattr(_usage, "totals", None)
+    if totals is not None:
+        totals[0] += inference_seconds
+        totals[1] += audio_seconds
+
+def measure_call(service, method: str, *args):
+    """service.method(*args) -> (result, inference seconds, audio seconds)."""
+    _usage.totals = [0.0, 0.0]
+    try:
+        result = getattr(service, method)(*args)
+        return result, _usage.totals[0], _usage.totals[1]
+    finally:
+        _usage.totals = None
+
+# --- Process pool worker support ---
+# When Coqui runs in a process pool each worker owns its own model instance.
+_worker_service = None
+
+def init_worker(threads: int = None):
+    global _worker_service
+    _worker_service = TTSService(threads=threads)
+
+def call_worker(method: str, *args):
+    return measure_call(_worker_service, method, *args)
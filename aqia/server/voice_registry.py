@@ -0,0 +1,172 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+# Coqui models that can be requested by alias. COQUI_MODELS="alias=model_name,..."
+# adds or overrides entries.
+MODEL_ALIASES = {
+    "ljspeech": "tts_models/en/ljspeech/vits",
+    "vctk": "tts_models/en/vctk/vits",  # Multi-speaker: request "vctk:p225", "vctk:p243", ...
+}
+for _entry in filter(None, os.getenv("COQUI_MODELS", "").split(",")):
+    _alias, _, _model = _entry.partition("=")
+    MODEL_ALIASES[_alias.strip()] = _model.strip()
+
+DEFAULT_VOICE = os.getenv("COQUI_DEFAULT_VOICE", "ljspeech")
+
+
+class UnknownVoiceError(ValueError):
+    pass
+
+
+class Voice(NamedTuple):
+    """A Coqui model plus, for multi-speaker models, the speaker to use."""
+    model_name: str
+    speaker: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        alias = next((a for a, m in MODEL_ALIASES.items() if m == self.model_name), self.model_name)
+        return f"{alias}:{self.speaker}" if self.speaker else alias
+
+
+def resolve_voice(voice: Optional[str]) -> Voice:
+    """
+    Map a TTSRequest.voice to a Coqui model and speaker. Coqui voices are
+    "<alias>" or "<alias>:<speaker>"; anything else (such as a Google voice
+    name sent to /tts, or no voice at all) gets the default voice.
+    """
+    alias, _, speaker = (voice or "").partition(":")
+    if alias not in MODEL_ALIASES:
+        if ":" in (voice or ""):
+            raise UnknownVoiceError(f"Unknown Coqui voice: {voice}")
+        alias, _, speaker = DEFAULT_VOICE.partition(":")
+    return Voice(MODEL_ALIASES[alias], speaker or None)
+
+
+class _Loaded:
+    __slots__ = ("model", "size", "last_used")
+
+    def __init__(self, model, size: int):
+        self.model = model
+        self.size = size
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """
+    Loads models on first use and keeps them within a memory budget.
+
+    `loader(name)` returns a loaded model and `sizer(model)` its approximate
+    resident size in bytes. When loading a model pushes the total over
+    `max_bytes`, least-recently-used models are unloaded first (the model
+    just requested is always kept). Models unused for `idle_seconds` are
+    unloaded as well. `pinned` models, such as the default voice, are never
+    unloaded, so a budget smaller than them is exceeded rather than enforced.
+    Callers that still hold a model keep it alive until they finish with it.
+    """
+
+    def __init__(self, loader, sizer, max_bytes: int, idle_seconds: Optional[float] = None, pinned=()):
+        self.loader = loader
+        self.sizer = sizer
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self.pinned = set(pinned)
+
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._models = OrderedDict()  # name -> _Loaded
+        self._total_bytes = 0
+        self._reaper = None
+
+        self.loads = 0
+        self.evictions = 0
+        self.idle_unloads = 0
+
+    def get(self, name: str):
+        self.unload_idle()
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+                entry.last_used = time.monotonic()
+                return entry.model
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Load outside the registry lock so other models stay usable meanwhile,
+        # but only once per model even if several callers ask at the same time
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(name)
+                if entry is not None:
+                    return entry.model
+            model = self.loader(name)
+            size = self.sizer(model)
+            with self._lock:
+                self._models[name] = _Loaded(model, size)
+                self._total_bytes += size
+                self.loads += 1
+                evicted = self._evict_over_budget(keep=name)
+            if evicted:
+                gc.collect()
+            return model
+
+    def _evict_over_budget(self, keep: str) -> int:
+        evicted = 0
+        for name in list(self._models):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if name != keep and name not in self.pinned:
+                self._drop(name)
+                evicted += 1
+        self.evictions += evicted
+        return evicted
+
+    def _drop(self, name: str):
+        entry = self._models.pop(name)
+        self._total_bytes -= entry.size
+        print(f"ℹ️  Unloaded Coqui model {name} ({entry.size / 1e6:.0f} MB)")
+
+    def unload_idle(self):
+        if not self.idle_seconds:
+            return
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [name for name, entry in self._models.items()
+                    if entry.last_used < cutoff and name not in self.pinned]
+            for name in idle:
+                self._drop(name)
+            self.idle_unloads += len(idle)
+        if idle:
+            gc.collect()
+
+    def start_reaper(self):
+        """Check for idle models in the background, so they go even without new requests."""
+        if self._reaper is not None or not self.idle_seconds:
+            return
+
+        def reap():
+            while True:
+                time.sleep(max(self.idle_seconds / 2, 1.0))
+                self.unload_idle()
+
+        self._reaper = threading.Thread(target=reap, name="model-reaper", daemon=True)
+        self._reaper.start()
+
+    def loaded(self) -> list:
+        with self._lock:
+            return list(self._models)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": {name: entry.size for name, entry in self._models.items()},
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "idle_unloads": self.idle_unloads,
+            }
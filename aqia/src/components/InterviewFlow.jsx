@@ -6,6 +6,30 @@ import SpeechService from '../utils/speech';
 // import VoiceOutput from './VoiceOutput'; // Replaced by Left Transcript Box
 // import MicInput from './MicInput'; // Replaced by Inline Controls
 
+const SAVE_ATTEMPTS = 3;
+const MAX_RETRY_DELAY_MS = 5000;
+
+// crypto.randomUUID() only exists in secure contexts (HTTPS or localhost)
+const newIdempotencyKey = () => {
+  if (globalThis.crypto?.randomUUID) return crypto.randomUUID();
+  if (globalThis.crypto?.getRandomValues) {
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+};
+
+// Honour the server's Retry-After (seconds or an HTTP date), else back off exponentially with jitter
+const retryDelayMs = (res, attempt) => {
+  const retryAfter = res?.headers.get('Retry-After');
+  let delay = 500 * 2 ** attempt * (0.5 + Math.random());
+  if (retryAfter) {
+    const seconds = Number(retryAfter);
+    delay = Number.isNaN(seconds) ? Date.parse(retryAfter) - Date.now() : seconds * 1000;
+  }
+  return Math.min(Math.max(delay || 0, 0), MAX_RETRY_DELAY_MS);
+};
+
 const InterviewFlow = ({ appData }) => {
   const apiKey = appData?.apiKey || sessionStorage.getItem('user_api_key');
   const domain = appData?.domain || sessionStorage.getItem('user_domain');
@@ -295,14 +319,25 @@ const InterviewFlow = ({ appData }) => {
               'Behavioral': parsed.score.behavioral ?? null,
             } : null,
           };
-          await fetch(`${baseUrl}/api/interviews`, {
+          // Same key on every retry, so the server never stores this interview twice
+          const idempotencyKey = newIdempotencyKey();
+          const save = () => fetch(`${baseUrl}/api/interviews`, {
             method: 'POST',
             headers: {
               'Content-Type': 'application/json',
+              'Idempotency-Key': idempotencyKey,
               ...(token ? { Authorization: `Bearer ${token}` } : {}),
             },
             body: JSON.stringify(payload),
           });
+          let res = null;
+          for (let attempt = 0; attempt < SAVE_ATTEMPTS; attempt++) {
+            if (attempt > 0) {
+              await new Promise(resolve => setTimeout(resolve, retryDelayMs(res, attempt - 1)));
+            }
+            res = await save().catch(() => null);
+            if (res && res.status < 500) break;
+          }
         } catch (saveErr) {
           console.warn('Could not save interview to DB (non-critical):', saveErr);
         }
@@ -11,6 +11,10 @@ class SpeechService {
     // AbortController for in-flight TTS fetch
     this._fetchController = null;
 
+    // Web Audio context used while playing a streamed WAV response
+    this._audioContext = null;
+    this._endStream = null;
+
     // Web Speech API for backup/live transcript
     const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
     if (SpeechRecognition) {
@@ -57,31 +61,20 @@ class SpeechService {
   }
 
   async _speakViaBackend(text) {
-    const TIMEOUT_MS = 5000;
+    // The server fails over (and hedges) from Google to its local Coqui engine
+    // itself, so a second client-side attempt would only add latency.
+    const TIMEOUT_MS = 10000;
 
-    // 1. Try Google TTS First
     try {
-        console.log("Attempting Google TTS...");
+        console.log("Attempting backend TTS...");
         await this._fetchAudio(text, '/google-tts', {
             voice: 'en-US-Neural2-F'
         }, TIMEOUT_MS);
-        return;
-    } catch (googleError) {
-        if (this._stopped) throw new Error('stopped');
-        console.warn("Google TTS failed, falling back to Local Coqui TTS:", googleError);
-    }
-
-    // 2. Fallback to Local Coqui TTS
-    try {
-        console.log("Attempting Local Coqui TTS...");
-        await this._fetchAudio(text, '/tts', {}, TIMEOUT_MS);
-        return;
-    } catch (localError) {
+    } catch (backendError) {
         if (this._stopped) throw new Error('stopped');
-        console.warn("Local TTS failed:", localError);
+        console.warn("Backend TTS failed:", backendError);
+        throw new Error("All backend TTS failed");
     }
-
-    throw new Error("All backend TTS failed");
   }
 
   async _fetchAudio(text, endpoint, extras, timeoutMs) {
@@ -94,12 +87,25 @@ class SpeechService {
       const response = await fetch(`${API_URL}${endpoint}`, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ text, ...extras }),
+          // Streamed responses arrive sentence by sentence, so playback can start early
+          body: JSON.stringify({ text, stream: true, ...extras }),
           signal: this._fetchController.signal
       });
       clearTimeout(timeoutId);
 
       if (!response.ok) throw new Error(`Backend Error ${response.status}`);
+      if (this._stopped) return;
+
+      const contentType = response.headers.get('Content-Type') || '';
+      if (response.body && contentType.startsWith('audio/wav')) {
+        await this._playPcmStream(response.body.getReader());
+        return;
+      }
+      if (response.body && contentType.startsWith('audio/mpeg') &&
+          window.MediaSource && MediaSource.isTypeSupported('audio/mpeg')) {
+        await this._playMediaSourceStream(response.body.getReader(), 'audio/mpeg');
+        return;
+      }
 
       const blob = await response.blob();
       if (this._stopped) return; // Don't play if already stopped
@@ -118,6 +124,98 @@ class SpeechService {
     }
   }
 
+  // Plays a streamed 16-bit mono WAV (header + raw PCM) by scheduling each
+  // received chunk back-to-back on a Web Audio timeline.
+  async _playPcmStream(reader) {
+    const ctx = new (window.AudioContext || window.webkitAudioContext)();
+    this._audioContext = ctx;
+    let sampleRate = 0;
+    let pending = new Uint8Array(0);
+    let playhead = 0;
+    let lastSource = null;
+
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done || this._stopped) break;
+
+        const joined = new Uint8Array(pending.length + value.length);
+        joined.set(pending);
+        joined.set(value, pending.length);
+        pending = joined;
+
+        if (!sampleRate) {
+          if (pending.length < 44) continue;
+          sampleRate = new DataView(pending.buffer).getUint32(24, true);
+          pending = pending.slice(44);
+        }
+
+        // Keep an odd trailing byte for the next chunk
+        const usable = pending.length - (pending.length % 2);
+        if (usable === 0) continue;
+        const samples = new Int16Array(pending.slice(0, usable).buffer);
+        pending = pending.slice(usable);
+
+        const buffer = ctx.createBuffer(1, samples.length, sampleRate);
+        const channel = buffer.getChannelData(0);
+        for (let i = 0; i < samples.length; i++) channel[i] = samples[i] / 32768;
+
+        const source = ctx.createBufferSource();
+        source.buffer = buffer;
+        source.connect(ctx.destination);
+        playhead = Math.max(playhead, ctx.currentTime);
+        source.start(playhead);
+        playhead += buffer.duration;
+        lastSource = source;
+      }
+
+      if (lastSource && !this._stopped) {
+        await new Promise(resolve => {
+          this._endStream = resolve;
+          lastSource.onended = resolve;
+        });
+      }
+    } finally {
+      this._endStream = null;
+      if (this._audioContext === ctx) this._audioContext = null;
+      if (ctx.state !== 'closed') ctx.close();
+    }
+  }
+
+  // Appends streamed MP3 frames to a MediaSource so playback starts with the first sentence.
+  async _playMediaSourceStream(reader, mimeType) {
+    const mediaSource = new MediaSource();
+    const url = URL.createObjectURL(mediaSource);
+    this.audioElement.src = url;
+    await new Promise(resolve => mediaSource.addEventListener('sourceopen', resolve, { once: true }));
+
+    const sourceBuffer = mediaSource.addSourceBuffer(mimeType);
+    const playback = new Promise((resolve, reject) => {
+      this.audioElement.onended = resolve;
+      this.audioElement.onerror = reject;
+    });
+
+    let started = false;
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done || this._stopped) break;
+        await new Promise(resolve => {
+          sourceBuffer.addEventListener('updateend', resolve, { once: true });
+          sourceBuffer.appendBuffer(value);
+        });
+        if (!started) {
+          started = true;
+          await this.audioElement.play();
+        }
+      }
+      if (mediaSource.readyState === 'open') mediaSource.endOfStream();
+      if (started && !this._stopped) await playback;
+    } finally {
+      URL.revokeObjectURL(url);
+    }
+  }
+
   _speakViaBrowser(text) {
     if (this._stopped) return Promise.resolve();
     return new Promise((resolve) => {
@@ -165,6 +263,15 @@ class SpeechService {
       this._fetchController.abort();
       this._fetchController = null;
     }
+    // Stop streamed Web Audio playback
+    if (this._audioContext) {
+      this._audioContext.close();
+      this._audioContext = null;
+    }
+    if (this._endStream) {
+      this._endStream();
+      this._endStream = null;
+    }
     // Stop audio playback immediately
     if (this.audioElement) {
       this.audioElement.pause();